@@ -0,0 +1,17 @@
+"""
+The HTTP status of an error of the Calendar API, without importing googleapiclient.
+
+The errors are those of googleapiclient (HttpError, with the response in resp),
+and those of the async engine (AsyncHttpError) and the fixture of --source (FixtureHttpError), with the status.
+googleapiclient is only imported when a connection to the API is made, to keep the start-up fast.
+"""
+
+
+def status_of(exception):
+    """
+    Returns the HTTP status of the error, or None if it is not an error of the API.
+    """
+    response = getattr(exception, 'resp', None)
+    if (response is not None):
+        return getattr(response, 'status', None)
+    return getattr(exception, 'status', None)
@@ -0,0 +1,110 @@
+"""
+Send event updates to the Calendar API in batches, instead of one HTTP request per event.
+
+The Calendar API accepts up to 50 calls in one batch request.
+Each call in a batch succeeds or fails on its own, so only the failed calls are retried.
+A batch of N calls counts as N calls against the quota, so it takes N tokens from the rate limiter.
+"""
+
+import api_errors
+import event_patch
+import rate_limiter
+
+MAX_BATCH_SIZE = 50  # the per-batch limit of the Calendar API
+MAX_RETRIES = 3
+
+RETRYABLE_STATUSES = [500, 502, 503, 504]
+
+
+def is_retryable(exception):
+    if (rate_limiter.is_quota_error(exception)):
+        return True
+    return api_errors.status_of(exception) in RETRYABLE_STATUSES
+
+
+def ignore_success(event):
+    pass
+
+
+def ignore_failure(event, exception):
+    pass
+
+
+class BatchUpdater:
+    """
+    Collects updates via add() and sends them in batches of up to batch_size.
+    Call flush() at the end, to send any remaining updates, and then close() (also when stopped halfway).
+
+    on_success(event) and on_failure(event, exception) are called once per event.
+    on_updated(event) is called as soon as an update succeeded (here: just before on_success).
+    """
+
+    def __init__(self, service, limiter, build_request=event_patch.build_patch_request,
+                 on_success=ignore_success, on_failure=ignore_failure,
+                 batch_size=MAX_BATCH_SIZE, max_retries=MAX_RETRIES, on_updated=ignore_success):
+        self.service = service
+        self.limiter = limiter
+        self.build_request = build_request
+        self.on_success = on_success
+        self.on_failure = on_failure
+        self.on_updated = on_updated
+        self.batch_size = min(batch_size, MAX_BATCH_SIZE)
+        self.max_retries = max_retries
+
+        self.pending = []  # list of (event, body)
+        self.succeeded = 0
+        self.failed = 0
+        self.batches_sent = 0
+
+    def add(self, event, body):
+        self.pending.append((event, body))
+        if (len(self.pending) >= self.batch_size):
+            self.flush()
+
+    def flush(self):
+        items = self.pending
+        self.pending = []
+
+        attempt = 0
+        while (any(items)):
+            failed = self._execute_batch(items)
+
+            items = []
+            for (item, exception) in failed:
+                if (attempt < self.max_retries and is_retryable(exception)):
+                    items.append(item)
+                else:
+                    self._fail(item[0], exception)
+
+            if (any(items)):
+                self.limiter.back_off(attempt)
+                attempt += 1
+
+    def close(self):
+        pass  # the batches are sent on the calling thread, so none are in flight
+
+    def _fail(self, event, exception):
+        self.failed += 1
+        self.on_failure(event, exception)
+
+    def _execute_batch(self, items):
+        failed = []
+
+        def callback(request_id, response, exception):
+            item = items[int(request_id)]
+            if (exception is not None):
+                failed.append((item, exception))
+            else:
+                self.succeeded += 1
+                self.on_updated(item[0])
+                self.on_success(item[0])
+
+        batch = self.service.new_batch_http_request(callback=callback)
+        for index, (event, body) in enumerate(items):
+            batch.add(self.build_request(self.service, event, body),
+                      request_id=str(index))
+
+        self.limiter.execute(batch, cost=len(items))
+        self.batches_sent += 1
+
+        return failed
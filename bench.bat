@@ -0,0 +1 @@
+poetry run python bench\bench_pipeline.py %*
@@ -0,0 +1,129 @@
+"""
+Benchmark the description cleaner on long descriptions (meeting notes, pasted emails),
+with URLs duplicated in braces several levels deep, against the cleaner as it was before it was optimized,
+and in a pool of worker processes (one per CPU).
+Also on lines of links followed by their duplicates the other way round, where removing one duplicate
+joins a link to the next.
+
+Usage: python bench/bench_description_cleaner.py [size of each description in KB ...]
+
+Example: python bench/bench_description_cleaner.py 1 16 64
+"""
+
+import os
+import random
+import sys
+
+import bench_utils
+
+import description_cleaner
+import parallel_cleaner
+
+DESCRIPTIONS = 200
+
+
+def fix_line_before(line):
+    parts = line.split(" ")
+
+    line_fixed = ""
+
+    prev_part = None
+    did_replace = False
+    for part in parts:
+        if (prev_part != None):
+            with_braces = "(" + prev_part + ")"
+            if (with_braces in part):
+                part = part.replace(with_braces, "")
+                line_fixed += part
+                prev_part = None
+                did_replace = True
+                continue
+            with_braces = "(mailto:" + prev_part + ")"
+            if (with_braces in part):
+                part = part.replace(with_braces, " ")
+                line_fixed += part
+                prev_part = None
+                did_replace = True
+                continue
+
+        if (len(line_fixed) > 0):
+            line_fixed += " "
+
+        line_fixed += part
+        prev_part = part
+
+    if (did_replace):
+        return line_fixed
+
+    return line
+
+
+def clean_description_before(desc):
+    return "\n".join(map(fix_line_before, desc.split("\n")))
+
+
+def nested_url(rng, depth):
+    url = f"https://example.com/meeting/{rng.randint(0, 10 ** 6)}?id={rng.randint(0, 10 ** 6)}"
+    return url + " " + "".join("(" + url + ")" for level in range(depth))
+
+
+def joined_duplicates(rng, size):
+    # n links, then their duplicates nested the other way round: removing each one joins a link to the next
+    links = []
+    length = 0
+    while (length < size):
+        links.append(f"https://example.com/meeting/{rng.randint(0, 10 ** 6)}?id={rng.randint(0, 10 ** 6)}")
+        length += 2 * len(links[-1]) + 3
+    return " ".join(links) + " " + "".join("(" + link + ")" for link in reversed(links))
+
+
+def generate_description(rng, size):
+    words = ['agenda', 'notes', 'please', 'review', 'the', 'minutes', 'of', 'call']
+    lines = []
+    length = 0
+    while (length < size):
+        kind = rng.random()
+        if (kind < 0.1):
+            line = nested_url(rng, rng.randint(1, 6))
+        elif (kind < 0.15):
+            email = f"person{rng.randint(0, 99)}@example.com"
+            line = f"E-mail: {email} (mailto:{email})"
+        else:
+            line = " ".join(rng.choice(words) for i in range(rng.randint(3, 20)))
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)
+
+
+def run(size_kb):
+    rng = random.Random(16)
+    descriptions = [generate_description(rng, size_kb * 1024)
+                    for i in range(DESCRIPTIONS)]
+
+    bench_utils.print_header(f"{DESCRIPTIONS} descriptions of {size_kb} KB")
+
+    bench_utils.measure('before', lambda: [clean_description_before(d) for d in descriptions],
+                        len(descriptions))
+    bench_utils.measure('clean_description', lambda: [description_cleaner.clean_description(d) for d in descriptions],
+                        len(descriptions))
+
+    joined = [joined_duplicates(rng, size_kb * 1024) for i in range(DESCRIPTIONS // 10)]
+    bench_utils.measure('joined duplicates',
+                        lambda: [description_cleaner.clean_description(d) for d in joined],
+                        len(joined))
+
+    processes = os.cpu_count() or 1
+    items = [(str(i), d) for (i, d) in enumerate(descriptions)]
+    bench_utils.measure(f"clean_in_processes ({processes})",
+                        lambda: list(parallel_cleaner.clean_in_processes(items, processes, chunk_size=10)),
+                        len(descriptions))
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1, 16, 64]
+    for size in sizes:
+        run(size)
+
+
+if __name__ == '__main__':
+    main()
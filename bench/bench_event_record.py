@@ -0,0 +1,70 @@
+"""
+Benchmark the per-event cost of the filter and the sort: parsing the dates of the raw events in each step,
+against normalizing each event once into a record.
+
+Usage: python bench/bench_event_record.py [number of events ...]
+
+Example: python bench/bench_event_record.py 10000 100000
+"""
+
+import sys
+
+import bench_utils
+import synthetic_events
+
+import date_utils
+import event_filter
+import event_record
+import todays
+
+YEAR = 2021
+MONTH = 3
+
+
+def is_multi_day(event):
+    start_date = date_utils.event_start_date(event)
+    end_date = date_utils.parse_year_month_day(event['end']['date'])
+    return (end_date - start_date).days > 1
+
+
+def passes_raw(event, date_context, max_date):
+    # the checks as they were before normalizing, each parsing the dates again
+    return (not 'recurrence' in event and
+            not 'recurringEventId' in event and
+            'date' in event['start'] and
+            not is_multi_day(event) and
+            date_utils.event_start_date(event).month == date_context.source_month_index and
+            date_utils.event_start_date(event) < date_utils.calculate_max_date(date_context, max_date))
+
+
+def run(count):
+    events = synthetic_events.generate_events(count, YEAR, MONTH)
+    date_context = date_utils.DateContext(
+        todays.TodayMock(YEAR, MONTH + 1), MONTH, YEAR)
+    events_filter = event_filter.EventFilter([], [], False,
+                                             lambda context: date_utils.calculate_max_date(context, False))
+
+    bench_utils.print_header(f"{count} synthetic events")
+
+    def raw_events():
+        filtered = [e for e in events if passes_raw(e, date_context, False)]
+        return sorted(filtered, key=date_utils.event_start_date)
+
+    bench_utils.measure('raw: filter + sort', raw_events, count)
+
+    def records():
+        filtered = [r for r in event_record.normalize_all(events)
+                    if events_filter.passes_record(r, date_context)]
+        return sorted(filtered, key=event_record.start_date_of)
+
+    bench_utils.measure('records: filter + sort', records, count)
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    for count in counts:
+        run(count)
+
+
+if __name__ == '__main__':
+    main()
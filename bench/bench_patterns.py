@@ -0,0 +1,61 @@
+"""
+Benchmark the matching of summaries against a blacklist: the compiled matcher against checking each entry in turn.
+
+Usage: python bench/bench_patterns.py [number of entries ...]
+
+Example: python bench/bench_patterns.py 10 100 1000
+"""
+
+import random
+import sys
+
+import bench_utils
+import synthetic_events
+
+import pattern_matcher
+
+EVENTS = 20000
+
+
+def matches_each_entry(summary, blacklist):
+    for black in blacklist:
+        if (black.startswith('^')):
+            if (summary.startswith(black[1:])):
+                return True
+        elif (black.startswith('=')):
+            if (summary == black[1:]):
+                return True
+        elif (black in summary):
+            return True
+    return False
+
+
+def generate_blacklist(count, seed=7):
+    rng = random.Random(seed)
+    kinds = ['', '^', '=']
+    return [rng.choice(kinds) + 'tag' + str(i) for i in range(count)]
+
+
+def run(entry_count):
+    summaries = [e['summary'].lower()
+                 for e in synthetic_events.generate_events(EVENTS)]
+    blacklist = generate_blacklist(entry_count)
+
+    bench_utils.print_header(f"blacklist of {entry_count} entries")
+
+    bench_utils.measure('each entry', lambda: [matches_each_entry(s, blacklist) for s in summaries],
+                        len(summaries))
+
+    matcher = pattern_matcher.compile_blacklist(blacklist)
+    bench_utils.measure('compiled', lambda: [matcher.matches(s) for s in summaries],
+                        len(summaries))
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [10, 100, 1000]
+    for count in counts:
+        run(count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark the stages of the pipeline over synthetic events, entirely offline.
+
+Usage: python bench/bench_pipeline.py [number of events ...]
+
+Example: python bench/bench_pipeline.py 10000 100000 1000000
+"""
+
+import sys
+
+import bench_utils
+import synthetic_events
+
+import date_format
+import date_utils
+import description_cleaner
+import event_filter
+import event_record
+import fixture_service
+import target_date_calculator
+import todays
+
+YEAR = 2021
+MONTH = 3
+BLACKLIST = ['done', '^k ', 'n/a', 'cancelled', '=gym']
+
+
+def run(count):
+    events = synthetic_events.generate_events(count, YEAR, MONTH)
+    date_context = date_utils.DateContext(
+        todays.TodayMock(YEAR, MONTH + 1), MONTH, YEAR)
+    events_filter = event_filter.EventFilter(BLACKLIST, [], False,
+                                      lambda context: date_utils.calculate_max_date(context, False))
+    service = fixture_service.FixtureService(events)
+    date_formatter = date_format.DateFormatter()
+
+    bench_utils.print_header(f"{count} synthetic events")
+
+    def fetch():
+        return list(service.events().list(maxResults=count).execute()['items'])
+
+    fetched = bench_utils.measure('fetch (fixture)', fetch, count)
+
+    records = bench_utils.measure('normalize', lambda: list(event_record.normalize_all(fetched)),
+                                  count)
+
+    filtered = bench_utils.measure('filter', lambda: [r for r in records if events_filter.passes_record(r, date_context)],
+                                   count)
+
+    sorted_records = bench_utils.measure('sort', lambda: sorted(filtered, key=event_record.start_date_of),
+                                         len(filtered))
+
+    def format_dates_babel():
+        from babel.dates import format_date
+
+        return [format_date(r.start_date, locale='en') for r in sorted_records]
+
+    bench_utils.measure('format_date (babel)', format_dates_babel,
+                        len(sorted_records))
+
+    bench_utils.measure('format_date (cached)', lambda: [date_formatter.format_date(r.start_date) for r in sorted_records],
+                        len(sorted_records))
+
+    def target_dates():
+        return [target_date_calculator.calculate_target_date(
+            date_context, r.start_date, r.is_pinned_to_day, None)
+            for r in sorted_records]
+
+    bench_utils.measure('calculate_target_date', target_dates,
+                        len(sorted_records))
+
+    bench_utils.measure('calculate_target_dates', lambda: target_date_calculator.calculate_target_dates(
+        date_context, [r.start_date for r in sorted_records], [r.is_pinned_to_day for r in sorted_records], None),
+        len(sorted_records))
+
+    descriptions = [r.event['description']
+                    for r in sorted_records if 'description' in r.event]
+    bench_utils.measure('clean_description', lambda: [description_cleaner.clean_description(d) for d in descriptions],
+                        len(descriptions))
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    for count in counts:
+        run(count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Benchmark the start-up time: the time to import gcal_move_it, and to show --help, as measured by python -X importtime.
+
+Usage: python bench/bench_startup.py [repeat]
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES_TO_REPORT = ['gcal_move_it', 'googleapiclient.errors', 'babel.dates', 'googleapiclient.discovery',
+                     'google_auth_oauthlib.flow']
+
+
+def import_times(args):
+    """
+    Returns the cumulative import time in microseconds of each top-level import, when running python with the args
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if (line.startswith('import time:') and line.count('|') == 2):
+            (self_time, cumulative, module) = line[len('import time:'):].split('|')
+            if (cumulative.strip().isdigit()):
+                times.setdefault(module.strip(), int(cumulative))
+    return times
+
+
+def run(name, args, repeat):
+    best = None
+    for i in range(repeat):
+        times = import_times(args)
+        best = times if best is None else {module: min(time, best.get(module, time))
+                                           for (module, time) in times.items()}
+    print()
+    print(name)
+    for module in MODULES_TO_REPORT:
+        time = best.get(module)
+        print(f"{module:<28} " + ('(not imported)' if time is None else f"{time / 1000:>10.1f} ms"))
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    run('import gcal_move_it', ['-c', 'import gcal_move_it'], repeat)
+    run('gcal_move_it.py --help', ['gcal_move_it.py', '--help'], repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+Helpers for the benchmarks: time a stage, and measure its peak memory.
+"""
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+# So the benchmarks can import the modules of gcal_move_it
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def measure(name, function, count, repeat=3):
+    """
+    Runs function() repeat times, and prints the best time, the throughput and the peak memory.
+    Returns the result of the last run.
+    """
+    best = None
+    for i in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    # Measure the memory separately, since tracing slows down the code
+    gc.collect()
+    tracemalloc.start()
+    function()
+    (current, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rate = count / best if best > 0 else float('inf')
+    print(f"{name:<28} {count:>9} {best * 1000:>10.1f} ms {rate:>14,.0f} /s {peak / 1024:>10,.0f} KiB")
+    return result
+
+
+def print_header(title):
+    print()
+    print(title)
+    print(f"{'stage':<28} {'events':>9} {'time':>13} {'throughput':>16} {'peak memory':>14}")
@@ -0,0 +1,28 @@
+"""
+Write synthetic events to a fixture file, for use with the option --source.
+
+Usage: python bench/generate_fixture.py <number of events> <fixture.jsonl> [year] [month]
+"""
+
+import sys
+
+import bench_utils
+import synthetic_events
+
+import fixture_service
+
+
+def main():
+    if (len(sys.argv) < 3):
+        print(__doc__)
+        sys.exit(2)
+
+    count = int(sys.argv[1])
+    year = int(sys.argv[3]) if len(sys.argv) > 3 else 2021
+    month = int(sys.argv[4]) if len(sys.argv) > 4 else 3
+    fixture_service.save_events(
+        sys.argv[2], synthetic_events.generate_events(count, year, month))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Generate synthetic calendar events, with a similar mix to a real calendar.
+"""
+
+import random
+
+from datetime import date, timedelta
+
+import date_utils
+
+WORDS = ['call', 'dentist', 'report', 'invoice', 'review', 'meeting', 'gym', 'birthday',
+         'groceries', 'taxes', 'plan', 'trip', 'book', 'fix', 'bike', 'garden', 'urgent', 'important']
+PREFIXES = ['', '', '', '', '[p] ', 'done ', 'k ', 'n/a ', 'cancelled ']
+URLS = ['https://www.example.com/some/long/path?with=query&and=more',
+        'http://one.nl/', 'https://docs.example.org/a/b/c/d/e/f']
+
+
+def description(rng):
+    kind = rng.random()
+    if (kind < 0.5):
+        return None
+    if (kind < 0.7):
+        return ' '.join(rng.choice(WORDS) for i in range(rng.randint(3, 30)))
+    # a description that was doubled up by the mobile app
+    url = rng.choice(URLS)
+    lines = ['notes: ' + rng.choice(WORDS),
+             url + ' (' + url + ')',
+             'E-mail: info@example.com (mailto:info@example.com)']
+    return '\n'.join(lines)
+
+
+def generate_event(rng, index, year, month):
+    days = date_utils.days_in_month(year, month)
+    start = date(year, month, rng.randint(1, days))
+    summary = rng.choice(PREFIXES) + ' '.join(rng.choice(WORDS)
+                                              for i in range(rng.randint(1, 4)))
+    event = {
+        'kind': 'calendar#event',
+        'etag': '"' + str(3000000000000000 + index) + '"',
+        'id': 'synthetic' + str(index),
+        'status': 'confirmed',
+        'summary': summary,
+        'start': {'date': start.isoformat()},
+        'end': {'date': (start + timedelta(days=1)).isoformat()},
+    }
+
+    kind = rng.random()
+    if (kind < 0.10):
+        event['start'] = {'dateTime': start.isoformat() + 'T10:00:00Z'}
+        event['end'] = {'dateTime': start.isoformat() + 'T11:00:00Z'}
+    elif (kind < 0.15):
+        event['end'] = {'date': (start + timedelta(days=3)).isoformat()}
+    elif (kind < 0.20):
+        event['recurrence'] = ['RRULE:FREQ=WEEKLY']
+    elif (kind < 0.25):
+        event['recurringEventId'] = 'recurring' + str(index)
+
+    desc = description(rng)
+    if (desc is not None):
+        event['description'] = desc
+    return event
+
+
+def generate_events(count, year=2021, month=3, seed=42):
+    rng = random.Random(seed)
+    return [generate_event(rng, i, year, month) for i in range(count)]
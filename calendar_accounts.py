@@ -0,0 +1,155 @@
+"""
+The calendars to process (option --calendars), and the account of each (its token file).
+
+--calendars is either a ; separated list of calendar ids, each optionally with the token file of its account:
+    primary;team@group.calendar.google.com=tokens/bob.pickle
+
+or a JSON file:
+    {"accounts": [
+        {"token": "token.pickle", "calendars": ["primary"]},
+        {"token": "tokens/bob.pickle", "qps": 5, "burst": 5, "calendars": ["team@group.calendar.google.com"]}
+    ]}
+
+The Calendar API quota is per user, so each account has its own rate limiter, shared by the calendars of that account.
+The calendars are processed concurrently. The output of each calendar is printed in turn, followed by a summary.
+"""
+
+import json
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+
+import thread_output
+
+DEFAULT_TOKEN_PATH = 'token.pickle'
+DEFAULT_CALENDAR_ID = 'primary'
+MAX_CONCURRENT_CALENDARS = 4
+
+
+class Account:
+    def __init__(self, token_path, calendar_ids, qps=None, burst=None):
+        self.token_path = token_path
+        self.calendar_ids = calendar_ids
+        self.qps = qps  # None means the value of the option --qps
+        self.burst = burst
+
+
+class CalendarConnection:
+    """
+    What is needed to process one calendar. The service, credentials and limiter are shared with the other calendars of the account.
+    """
+
+    def __init__(self, calendar_id, service, creds, limiter):
+        self.calendar_id = calendar_id
+        self.service = service
+        self.creds = creds
+        self.limiter = limiter
+
+
+class CalendarSummary:
+    def __init__(self, calendar_id, fetched=0, filtered=0, changed=0, succeeded=0, failed=0, error=None):
+        self.calendar_id = calendar_id
+        self.fetched = fetched
+        self.filtered = filtered
+        self.changed = changed  # events to be moved, or with a 'dirty' description
+        self.succeeded = succeeded
+        self.failed = failed
+        self.error = error
+
+
+def default_accounts():
+    return [Account(DEFAULT_TOKEN_PATH, [DEFAULT_CALENDAR_ID])]
+
+
+def parse_calendar_list(text):
+    """
+    Returns the accounts, in the order that each is first mentioned.
+    """
+    accounts = {}
+    for entry in filter(None, text.split(';')):
+        (calendar_id, separator, token_path) = entry.partition('=')
+        token_path = token_path if any(separator) else DEFAULT_TOKEN_PATH
+        accounts.setdefault(token_path, Account(
+            token_path, [])).calendar_ids.append(calendar_id.strip())
+    return list(accounts.values())
+
+
+def calendar_ids_of(account):
+    calendar_ids = account['calendars']
+    if (not isinstance(calendar_ids, list)):
+        raise ValueError(f"Expected a list of calendars, not {calendar_ids!r}")
+    return list(calendar_ids)
+
+
+def parse_config(config):
+    try:
+        return [Account(account.get('token', DEFAULT_TOKEN_PATH), calendar_ids_of(account),
+                        account.get('qps'), account.get('burst'))
+                for account in config['accounts']]
+    except (KeyError, TypeError, AttributeError) as error:
+        raise ValueError(f"Expected {{\"accounts\": [{{\"token\": ..., \"calendars\": [...]}}]}}: {error!r}")
+
+
+def load_config(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        return parse_config(json.load(file))
+
+
+def parse_calendars_option(value):
+    if (value.endswith('.json') or os.path.isfile(value)):
+        accounts = load_config(value)
+    else:
+        accounts = parse_calendar_list(value)
+    if (not any(calendar_id for account in accounts for calendar_id in account.calendar_ids)):
+        raise ValueError(f"No calendars in '{value}'")
+    return accounts
+
+
+def fan_out(items, process, max_workers=MAX_CONCURRENT_CALENDARS):
+    """
+    Runs process(item) for the items concurrently, and returns the results in the order of the items.
+    What each prints is held back, then printed in the order of the items.
+    """
+    with thread_output.installed() as output:
+        def process_capturing(item):
+            with output.capture() as buffer:
+                result = process(item)
+            return (result, buffer.getvalue())
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='calendar') as executor:
+            futures = [executor.submit(process_capturing, item)
+                       for item in items]
+            results = []
+            for future in futures:
+                (result, text) = future.result()
+                output.stream.write(text)
+                output.stream.flush()
+                results.append(result)
+    return results
+
+
+def summary_as_text(summaries, is_dry_run):
+    lines = [f"== Summary of {len(summaries)} calendars =="]
+    total = CalendarSummary('Total')
+    for summary in summaries:
+        lines.append(_summary_line(summary, is_dry_run))
+        total.fetched += summary.fetched
+        total.filtered += summary.filtered
+        total.changed += summary.changed
+        total.succeeded += summary.succeeded
+        total.failed += summary.failed
+    lines.append(_summary_line(total, is_dry_run))
+    errors = sum(1 for summary in summaries if summary.error is not None)
+    if (errors > 0):
+        lines.append(f"!! {errors} calendars could not be processed")
+    return '\n'.join(lines)
+
+
+def _summary_line(summary, is_dry_run):
+    if (summary.error is not None):
+        return f"{summary.calendar_id}: !! {summary.error}"
+    line = (f"{summary.calendar_id}: {summary.fetched} events, {summary.filtered} filtered, "
+            f"{summary.changed} to change")
+    if (not is_dry_run):
+        line += f", {summary.succeeded} updated, {summary.failed} failed"
+    return line
@@ -0,0 +1,38 @@
+"""
+Tables of the calendar, per year and month: the number of days, the weekday of the 1st,
+and the last day of the month for each weekday.
+
+Each table is calculated once, and then looked up. Only a few months are used by each run,
+so the memoization is bounded (least recently used tables are dropped).
+"""
+
+from calendar import monthrange
+from collections import namedtuple
+from functools import lru_cache
+
+MAX_CACHED_MONTHS = 256
+
+# last_days[weekday] is the last day of the month that falls on that weekday (0-6 ~ Mon-Sun)
+MonthTable = namedtuple('MonthTable', ['days', 'first_weekday', 'last_days'])
+
+
+@lru_cache(maxsize=MAX_CACHED_MONTHS)
+def month_table(year, month_index):
+    (first_weekday, days) = monthrange(year, month_index)
+    last_weekday = (first_weekday + days - 1) % 7
+    last_days = tuple(days - (last_weekday - weekday) % 7
+                      for weekday in range(7))
+    return MonthTable(days, first_weekday, last_days)
+
+
+def days_in_month(year, month_index):
+    return month_table(year, month_index).days
+
+
+def weekday(year, month_index, day):
+    # 0-6 ~ Mon-Sun
+    return (month_table(year, month_index).first_weekday + day - 1) % 7
+
+
+def last_day_of_weekday(year, month_index, weekday):
+    return month_table(year, month_index).last_days[weekday]
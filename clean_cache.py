@@ -0,0 +1,104 @@
+"""
+A persistent cache of the descriptions that are known to be clean, stored in SQLite, used via the option --clean-cache.
+
+A description is known by its hash, so an event is only cleaned again when its description has changed
+(or when the cleaning itself has changed, see description_cleaner.VERSION).
+
+The cache is bounded: when it has more than max_entries descriptions, the least recently used are dropped.
+
+The marks are committed every COMMIT_EVERY changes (and when the cache is closed),
+so a run that stops halfway keeps most of what it learned.
+
+The cache can be shared by the threads that process several calendars.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+
+import description_cleaner
+
+DEFAULT_PATH = 'clean_cache.sqlite'
+MAX_ENTRIES = 100000
+COMMIT_EVERY = 100
+
+
+def description_key(description):
+    text = f"{description_cleaner.VERSION}:{description}"
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class CleanCache:
+    def __init__(self, path=DEFAULT_PATH, max_entries=MAX_ENTRIES, clock=time.time, commit_every=COMMIT_EVERY):
+        self.max_entries = max_entries
+        self.clock = clock
+        self.commit_every = commit_every
+        self.uncommitted = 0
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS clean_descriptions (
+                key TEXT PRIMARY KEY,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS clean_descriptions_by_last_used ON clean_descriptions (last_used);
+        """)
+
+        self.lookups = 0
+        self.hits = 0
+
+    def is_clean(self, description):
+        key = description_key(description)
+        with self.lock:
+            self.lookups += 1
+            cursor = self.connection.execute('UPDATE clean_descriptions SET last_used = ? WHERE key = ?',
+                                             (self.clock(), key))
+            if (cursor.rowcount > 0):
+                self.hits += 1
+                self._changed()
+                return True
+        return False
+
+    def mark_clean(self, description):
+        key = description_key(description)
+        with self.lock:
+            self.connection.execute('INSERT OR REPLACE INTO clean_descriptions (key, last_used) VALUES (?, ?)',
+                                    (key, self.clock()))
+            self._changed()
+
+    def _changed(self):
+        self.uncommitted += 1
+        if (self.uncommitted >= self.commit_every):
+            self.connection.commit()
+            self.uncommitted = 0
+
+    def size(self):
+        with self.lock:
+            return self.connection.execute('SELECT COUNT(*) FROM clean_descriptions').fetchone()[0]
+
+    def evict(self):
+        """
+        Drops the least recently used descriptions, down to max_entries.
+        """
+        excess = self.size() - self.max_entries
+        if (excess > 0):
+            with self.lock:
+                self.connection.execute("""
+                    DELETE FROM clean_descriptions WHERE key IN (
+                        SELECT key FROM clean_descriptions ORDER BY last_used LIMIT ?)""", (excess,))
+
+    def close(self):
+        self.evict()
+        with self.lock:
+            self.connection.commit()
+            self.connection.close()
+
+    def hit_rate(self):
+        if (self.lookups == 0):
+            return 0.0
+        return self.hits / self.lookups
+
+    def stats_as_text(self):
+        return (f"{self.hits} of {self.lookups} descriptions were already known to be clean "
+                f"({self.hit_rate():.0%} hit rate)")
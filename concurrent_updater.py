@@ -0,0 +1,118 @@
+"""
+Send event updates from a bounded pool of worker threads, one HTTP request per event.
+
+httplib2 is not thread-safe, so each worker thread gets its own http object, made by make_http().
+
+The results are reported in the order that the events were added, when flush() is called,
+so the console output does not depend on which worker finishes first.
+Only on_updated(event) is called as soon as each update succeeds (on the worker thread), for the journal of the run.
+"""
+
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import batch_updater
+import event_patch
+
+MAX_IN_FLIGHT_PER_WORKER = 2
+
+
+class OrderedResults:
+    """
+    The results of the updates that were sent, as futures: reported in the order added, at flush().
+    Also used by the async engine.
+    """
+
+    def __init__(self, on_success, on_failure, on_updated):
+        self.on_success = on_success
+        self.on_failure = on_failure
+        self.on_updated = on_updated
+
+        self.pending = []  # list of (event, future), in the order added
+        self.succeeded = 0
+        self.failed = 0
+
+    def add(self, event, future):
+        future.add_done_callback(partial(self._done, event))
+        self.pending.append((event, future))
+
+    def _done(self, event, future):
+        # on the thread that completed the future
+        if (not future.cancelled() and future.exception() is None):
+            self.on_updated(event)
+
+    def flush(self):
+        for (event, future) in self.pending:
+            exception = future.exception()
+            if (exception is None):
+                self.succeeded += 1
+                self.on_success(event)
+            else:
+                self.failed += 1
+                self.on_failure(event, exception)
+        self.pending = []
+
+
+class ConcurrentUpdater:
+    """
+    Has the same interface as BatchUpdater: add() each update, then flush() at the end, and close().
+    """
+
+    def __init__(self, service, limiter, make_http, workers,
+                 build_request=event_patch.build_patch_request,
+                 on_success=batch_updater.ignore_success,
+                 on_failure=batch_updater.ignore_failure,
+                 on_updated=batch_updater.ignore_success):
+        self.service = service
+        self.limiter = limiter
+        self.make_http = make_http
+        self.build_request = build_request
+
+        self.executor = ThreadPoolExecutor(max_workers=workers,
+                                           thread_name_prefix='updater')
+        # bound the updates that wait for a worker, so the built requests do not pile up ahead of a slow API.
+        # The results are kept until flush() (without the responses), like the updates of a BatchUpdater.
+        self.in_flight = threading.BoundedSemaphore(
+            workers * MAX_IN_FLIGHT_PER_WORKER)
+        self.thread_local = threading.local()
+
+        self.results = OrderedResults(on_success, on_failure, on_updated)
+
+    @property
+    def succeeded(self):
+        return self.results.succeeded
+
+    @property
+    def failed(self):
+        return self.results.failed
+
+    def _http_for_this_thread(self):
+        if (not hasattr(self.thread_local, 'http')):
+            self.thread_local.http = self.make_http()
+        return self.thread_local.http
+
+    def _execute(self, request):
+        try:
+            self.limiter.execute(request, http=self._http_for_this_thread())
+        finally:
+            self.in_flight.release()
+
+    def add(self, event, body):
+        # The request is built here on the main thread, and only executed by a worker
+        request = self.build_request(self.service, event, body)
+
+        self.in_flight.acquire()
+        future = self.executor.submit(self._execute, request)
+        self.results.add(event, future)
+
+    def flush(self):
+        self.results.flush()
+
+    def close(self):
+        """
+        Waits for the updates in flight (and their on_updated), and drops the updates that were not sent yet.
+        Also when the run is stopped halfway, so that the updates that were sent are still journaled.
+        """
+        self.executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,35 @@
+"""
+Format the dates that are printed, in the locale of the option --locale.
+
+Babel's format_date looks up the locale and parses the pattern on every call, and a run prints a date for every event.
+Here the locale and the pattern are resolved once. A run prints only a few distinct dates (at most ~31 per month),
+so each formatted date is also memoized.
+"""
+
+from functools import lru_cache
+
+DEFAULT_LOCALE = 'en'
+MAX_CACHED_DATES = 1024
+
+
+class DateFormatter:
+    def __init__(self, locale=DEFAULT_LOCALE, format='medium'):
+        """
+        Raises ValueError if the locale is not known.
+        """
+        # Babel is slow to import, so it is only imported once dates are to be printed
+        from babel import Locale, UnknownLocaleError
+
+        try:
+            self.locale = Locale.parse(locale)
+        except (UnknownLocaleError, ValueError):
+            raise ValueError(f"Unknown locale '{locale}'")
+        self.pattern = self.locale.date_formats[format]
+        self.format_date = lru_cache(maxsize=MAX_CACHED_DATES)(self.format_date_uncached)
+
+    def format_date_uncached(self, date):
+        return self.pattern.apply(date, self.locale)
+
+    def day_name(self, weekday):
+        # 0-6 ~ Mon-Sun
+        return self.locale.days['format']['wide'][weekday]
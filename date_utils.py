@@ -1,23 +1,46 @@
 """
 Utils for processing date fields of events.
+
+The values derived from a DateContext (like the source year, or the max date) are calculated once per context.
 """
 
 import datetime
+import functools
 
-from calendar import monthrange
 from dateutil import relativedelta
 from datetime import date
 
+import calendar_tables
+
 
 class DateContext:
     # today is instance of TodayAuto or TodayMock
-    def __init__(self, today, source_month_index):
+    # source_year is optional: by default, the year is derived from today
+    def __init__(self, today, source_month_index, source_year=None):
         self.today = today
         self.source_month_index = source_month_index
+        self.source_year = source_year
+        self.derived = {}  # (function name, args) -> value, see derived_value
+
+
+def derived_value(function):
+    """
+    Caches the result of function(date_context, *args) on the date context.
+    """
+    @functools.wraps(function)
+    def cached(date_context, *args):
+        key = (function.__name__,) + args
+        try:
+            return date_context.derived[key]
+        except KeyError:
+            value = function(date_context, *args)
+            date_context.derived[key] = value
+            return value
+    return cached
 
 
 def days_in_month(year, month_index):
-    return monthrange(year, month_index)[1]
+    return calendar_tables.days_in_month(year, month_index)
 
 
 def event_start_date(event):
@@ -28,6 +51,7 @@ def parse_year_month_day(date_string):
     return datetime.datetime.strptime(date_string, '%Y-%m-%d').date()
 
 
+@derived_value
 def target_year(date_context):
     # If source is December, then target is following year:
     if (date_context.source_month_index == 12):
@@ -35,7 +59,11 @@ def target_year(date_context):
     return source_year(date_context)
 
 
+@derived_value
 def source_year(date_context):
+    if (date_context.source_year != None):
+        return date_context.source_year
+
     # If source is December, then is from previous year:
     if (date_context.source_month_index == 12):
         if (date_context.today.this_month() == 12):
@@ -44,12 +72,14 @@ def source_year(date_context):
     return date_context.today.this_year()
 
 
+@derived_value
 def days_source_month(date_context):
     daysInMonth = days_in_month(source_year(
         date_context), date_context.source_month_index)
     return daysInMonth
 
 
+@derived_value
 def target_month(date_context, target_date_option):
     if (target_date_option != None):
         return target_date_option
@@ -57,10 +87,12 @@ def target_month(date_context, target_date_option):
     return start_of_source_month(date_context) + relativedelta.relativedelta(months=1)
 
 
+@derived_value
 def start_of_source_month(date_context):
     return date(source_year(date_context), date_context.source_month_index, 1)
 
 
+@derived_value
 def calculate_max_date(date_context, is_move):
     # - only past events (not from today)
     startOfMonth = start_of_source_month(date_context)
@@ -5,50 +5,200 @@ Cause: the mobile version of Google Calendar cannot parse the 'markdown-like' te
 and so on edit, the URLs get 'doubled out' with braces.
 
 Subsequent edits between the browser and mobile Calendar cause further duplication.
+All levels of that duplication are removed in one call, so one run of 'clean' is enough.
 """
+import re
+
 NEW_LINE = "\n"
+VERSION = 2  # increment when the cleaning changes, so descriptions remembered as clean are checked again
+
+
+def remove_duplicates(part, prev_part, chain_has_space):
+    """
+    Returns the part without the duplicates of prev_part in braces, or None if it has none.
+    """
+    with_braces = "(" + prev_part + ")"
+    if (with_braces in part):
+        return part.replace(with_braces, "")
+    with_braces = "(mailto:" + prev_part + ")"
+    if (with_braces in part):
+        # A run of duplicates becomes one space (none, if the chain already left a space)
+        fixed = re.sub("(?:" + re.escape(with_braces) + ")+", " ", part)
+        if (chain_has_space and part.startswith(with_braces)):
+            fixed = fixed[1:]
+        return fixed
+    return None
+
+
+# A text without braces, or a text in braces
+FLAT_PART = re.compile(r"[^()]+|\(([^()]*)\)")
+
+
+class JoinedToken:
+    """
+    A part that the rest of a part was joined to, by removing a duplicate, and so must be checked again
+    against the part before it. It grows at the front, as those parts are joined to it in turn.
+
+    Without braces inside braces, a duplicate in the token is one of its texts in braces, so those are indexed,
+    and finding and removing a duplicate does not scan the whole token again. Otherwise it is a plain string.
+    """
+
+    def __init__(self, text):
+        self.parts = []  # of the token, in reverse order, since it grows at the front
+        self.groups = {}  # text in braces -> indexes of the parts that are that text in braces
+        self.length = 0
+        self.text = None  # the token, if it is kept as a plain string
+        self.prepend(text)
+
+    def prepend(self, text):
+        if (self.text is None):
+            matches = list(FLAT_PART.finditer(text))
+            if (sum(len(match.group(0)) for match in matches) == len(text)):
+                for match in reversed(matches):
+                    if (match.group(1) is not None):
+                        self.groups.setdefault(match.group(1), []).append(len(self.parts))
+                    self.parts.append(match.group(0))
+                self.length += len(text)
+                return
+            self.text = self.as_text()  # a brace without its pair
+        self.text = text + self.text
+
+    def has_group(self, content):
+        if (self.text is None):
+            return content in self.groups
+        return "(" + content + ")" in self.text
+
+    def remove_group(self, content):
+        if (self.text is None):
+            for index in self.groups.pop(content):
+                self.length -= len(self.parts[index])
+                self.parts[index] = ""
+        else:
+            self.text = self.text.replace("(" + content + ")", "")
+
+    def is_empty(self):
+        if (self.text is None):
+            return self.length == 0
+        return self.text == ""
 
+    def as_text(self):
+        if (self.text is None):
+            return "".join(reversed(self.parts))
+        return self.text
 
-def fix_line(line):
-    parts = line.split(" ")
-
-    line_fixed = ""
-
-    prev_part = None
-    did_replace = False
-    for part in parts:
-        if (prev_part != None):
-            with_braces = "(" + prev_part + ")"
-            if (with_braces in part):
-                part = part.replace(with_braces, "")
-                line_fixed += part
-                prev_part = None
-                did_replace = True
-                continue
-            with_braces = "(mailto:" + prev_part + ")"
-            if (with_braces in part):
-                part = part.replace(with_braces, " ")
-                line_fixed += part
-                prev_part = None
-                did_replace = True
-                continue
-
-        if (len(line_fixed) > 0):
-            line_fixed += " "
-
-        line_fixed += part
-        prev_part = part
+
+class LineCleaner:
+    """
+    Cleans a line in one pass over its parts (separated by spaces), keeping the cleaned parts on a stack.
+
+    Removing a duplicate joins the rest of its part to the part before it, which can then be a duplicate
+    of the part before that: 'a b (b)(a)' becomes 'a b(a)', and then 'ab'.
+    So the joined part is checked again against the parts below it on the stack, without cleaning the line again.
+    """
+
+    def __init__(self, line):
+        self.todo = list(reversed(line.split(" ")))  # the parts still to clean, the next one last
+        self.tokens = []  # the cleaned line, split on spaces
+        self.prev_part = None
+        self.chain_has_space = False  # whether the duplicates of prev_part already left a space
+        self.did_replace = False
+
+    def has_text(self):
+        return len(self.tokens) > 1 or (len(self.tokens) == 1 and self.tokens[0] != "")
+
+    def push(self, part):
+        if (self.has_text()):
+            self.tokens.append(part)
+        else:
+            self.tokens = [part]
+        self.prev_part = part
+        self.chain_has_space = False
+
+    def append(self, text):
+        # without a space before it
+        pieces = text.split(" ")
+        if (self.tokens):
+            self.tokens[-1] += pieces[0]
+            self.tokens.extend(pieces[1:])
+        else:
+            self.tokens = pieces
+
+    def join(self, fixed):
+        last = self.tokens.pop() if self.tokens else ""
+        if (" " in fixed):
+            # A run of email duplicates left a space, so the joined part is more than one part
+            self.todo.extend(reversed((last + fixed).split(" ")))
+            self.prev_part = self.tokens[-1] if self.tokens else None
+            self.chain_has_space = False
+            return
+
+        token = JoinedToken(fixed)
+        token.prepend(last)
+        while (self.tokens):
+            below = self.tokens[-1]
+            if (token.has_group(below)):
+                token.remove_group(below)
+                if (token.is_empty()):
+                    # The whole part was duplicates, so the next part can be another duplicate
+                    self.prev_part = below
+                    self.chain_has_space = False
+                    return
+                token.prepend(self.tokens.pop())
+            elif (token.has_group("mailto:" + below)):
+                # Cleaned again as a part, since a run of email duplicates leaves a space
+                self.todo.append(token.as_text())
+                self.prev_part = below
+                self.chain_has_space = False
+                return
+            else:
+                break
+        self.push(token.as_text())
+
+    def clean(self):
+        while (self.todo):
+            part = self.todo.pop()
+            if (self.prev_part is not None and '(' in part):
+                fixed = remove_duplicates(part, self.prev_part, self.chain_has_space)
+                if (fixed is not None):
+                    self.did_replace = True
+                    if (fixed == "" or fixed == " "):
+                        # The whole part was duplicates, so the next part can be another duplicate
+                        self.append(fixed)
+                        self.chain_has_space = self.chain_has_space or any(fixed)
+                    else:
+                        self.join(fixed)
+                    continue
+                if (self.chain_has_space):
+                    # The space left by the duplicates is an empty part before this one, so check against that
+                    self.todo.append(part)
+                    self.prev_part = self.tokens[-1]
+                    self.chain_has_space = False
+                    continue
+            self.push(part)
+        return " ".join(self.tokens)
+
+
+def clean_line(line):
+    # Every duplicate is in braces, so a line without braces is already clean
+    if ('(' not in line):
+        return line
+
+    cleaner = LineCleaner(line)
+    fixed = cleaner.clean()
 
     # Avoid updating when the only change is loss of whitespace:
-    if (did_replace):
-        return line_fixed  # some whitespace lost
+    if (cleaner.did_replace):
+        return fixed  # some whitespace lost
 
     return line
 
 
 def clean_description(desc):
+    if ('(' not in desc):
+        return desc
+
     lines = desc.split(NEW_LINE)
 
-    lines_fixed = map(fix_line, lines)
+    lines_fixed = map(clean_line, lines)
 
     return NEW_LINE.join(lines_fixed)
@@ -0,0 +1,124 @@
+"""
+Build the Calendar service from a cached discovery document, instead of fetching the document on every run.
+
+The discovery document describes the Calendar API. Fetching it over the network dominates the start-up of small jobs.
+
+The document is read from the persisted copy or from the copy shipped with gcal_move_it, whichever has the newer revision.
+Only if the file of that document was written more than MAX_AGE_DAYS ago (by its modification time), is the document
+fetched again and persisted. So a fetch that returns the same revision still counts as fresh.
+If that fetch fails (for example when offline), the older document is used anyway.
+
+The document is loaded once. The service is built once per set of credentials (and name),
+and reused for the lifetime of the process. httplib2 is not thread-safe, so threads that
+process different calendars each use a service of their own, with a different name.
+"""
+
+import datetime
+import json
+import os
+
+import httplib2
+
+from googleapiclient.discovery import build_from_document
+
+DISCOVERY_URI = 'https://www.googleapis.com/discovery/v1/apis/calendar/v3/rest'
+BUNDLED_PATH = os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), 'discovery', 'calendar.v3.json')
+DEFAULT_CACHE_PATH = os.path.join('.cache', 'calendar.v3.json')
+MAX_AGE_DAYS = 30
+
+_documents = {}
+_services = {}
+
+
+def is_valid_document(document):
+    try:
+        return (document['discoveryVersion'] == 'v1' and
+                document['name'] == 'calendar' and
+                document['version'] == 'v3' and
+                'patch' in document['resources']['events']['methods'])
+    except (KeyError, TypeError):
+        return False
+
+
+def revision_date(document):
+    try:
+        return datetime.datetime.strptime(document['revision'], '%Y%m%d').date()
+    except (KeyError, ValueError):
+        return datetime.date.min
+
+
+def written_date(path):
+    return datetime.date.fromtimestamp(os.path.getmtime(path))
+
+
+def read_document(path):
+    if (not os.path.exists(path)):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            document = json.load(file)
+    except ValueError:
+        return None
+    return document if is_valid_document(document) else None
+
+
+def write_document(path, document):
+    directory = os.path.dirname(path)
+    if (any(directory)):
+        os.makedirs(directory, exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump(document, file)
+    os.replace(temp_path, path)
+
+
+def fetch_document():
+    (response, content) = httplib2.Http(timeout=10).request(DISCOVERY_URI)
+    if (response.status != 200):
+        raise ValueError(
+            f"Could not fetch the discovery document: HTTP {response.status}")
+    return json.loads(content.decode('utf-8'))
+
+
+def newest(paths):
+    """
+    Returns (document, path) of the valid document with the newest revision, or (None, None).
+    """
+    found = [(read_document(path), path) for path in paths]
+    found = [(document, path) for (document, path) in found if document is not None]
+    if (not any(found)):
+        return (None, None)
+    return max(found, key=lambda item: revision_date(item[0]))
+
+
+def load_document(cache_path=DEFAULT_CACHE_PATH, fetch=fetch_document, today=None):
+    today = today or datetime.date.today()
+
+    (document, path) = newest([cache_path, BUNDLED_PATH])
+    if (document is not None and (today - written_date(path)).days <= MAX_AGE_DAYS):
+        return document
+
+    try:
+        fetched = fetch()
+    except (OSError, httplib2.HttpLib2Error, ValueError):
+        fetched = None  # offline: use the older document
+
+    if (fetched is not None and is_valid_document(fetched)):
+        write_document(cache_path, fetched)
+        return fetched
+
+    if (document is None):
+        raise ValueError(
+            'No discovery document for the Calendar API is available')
+    return document
+
+
+def build_service(creds, cache_path=DEFAULT_CACHE_PATH, name=None):
+    if (cache_path not in _documents):
+        _documents[cache_path] = load_document(cache_path)
+    key = (id(creds), name)
+    if (key not in _services):
+        _services[key] = build_from_document(
+            _documents[cache_path], credentials=creds)
+    return _services[key]
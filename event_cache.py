@@ -0,0 +1,125 @@
+"""
+A local cache of the events of a calendar, stored in SQLite and kept up to date via incremental sync.
+
+The first sync lists all of the events of the calendar, and stores the sync token that comes with the last page.
+Later syncs send that token, so only the events that changed since the previous sync are fetched.
+If the server no longer accepts the token (410 Gone), the cache for that calendar is cleared and fully synced again.
+
+The commands then read the events of the source month from the cache.
+
+The cache can be shared by the threads that process several calendars: one calendar is synced at a time.
+"""
+
+import json
+import sqlite3
+import threading
+
+import api_errors
+
+DEFAULT_PATH = 'events_cache.sqlite'
+
+
+def is_sync_token_expired(exception):
+    return api_errors.status_of(exception) == 410
+
+
+def start_of_event(event):
+    # All-day events have a date, timed events have a dateTime (the date part is enough to select a range)
+    start = event.get('start', {})
+    if ('date' in start):
+        return start['date']
+    return start.get('dateTime', '')[:10]
+
+
+class EventCache:
+    def __init__(self, path=DEFAULT_PATH):
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.RLock()
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS events (
+                calendar_id TEXT NOT NULL,
+                event_id TEXT NOT NULL,
+                start TEXT NOT NULL,
+                body TEXT NOT NULL,
+                PRIMARY KEY (calendar_id, event_id)
+            );
+            CREATE INDEX IF NOT EXISTS events_by_start ON events (calendar_id, start);
+            CREATE TABLE IF NOT EXISTS sync_tokens (
+                calendar_id TEXT PRIMARY KEY,
+                sync_token TEXT NOT NULL
+            );
+        """)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def sync_token(self, calendar_id):
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT sync_token FROM sync_tokens WHERE calendar_id = ?', (calendar_id,)).fetchone()
+        return row[0] if row else None
+
+    def sync(self, iterate_pages, calendar_id='primary'):
+        """
+        iterate_pages(**list_args) yields the pages of an events().list() call.
+
+        Returns the number of events that were added, changed or removed.
+        """
+        with self.lock:
+            return self._sync_or_resync(iterate_pages, calendar_id)
+
+    def _sync_or_resync(self, iterate_pages, calendar_id):
+        sync_token = self.sync_token(calendar_id)
+        try:
+            return self._sync(iterate_pages, calendar_id, sync_token)
+        except Exception as exception:
+            self.connection.rollback()
+            if (sync_token is None or not is_sync_token_expired(exception)):
+                raise
+
+        # The sync token has expired, so start again from scratch
+        return self._sync(iterate_pages, calendar_id, None)
+
+    def _sync(self, iterate_pages, calendar_id, sync_token):
+        list_args = {'calendarId': calendar_id, 'maxResults': 2500}
+        if (sync_token is None):
+            # a full sync: cannot use a time range, else no sync token is returned
+            self.connection.execute(
+                'DELETE FROM events WHERE calendar_id = ?', (calendar_id,))
+        else:
+            list_args['syncToken'] = sync_token
+
+        changed = 0
+        next_sync_token = None
+        for page in iterate_pages(**list_args):
+            for event in page.get('items', []):
+                self._store(calendar_id, event)
+                changed += 1
+            next_sync_token = page.get('nextSyncToken', next_sync_token)
+
+        if (next_sync_token is not None):
+            self.connection.execute('INSERT OR REPLACE INTO sync_tokens (calendar_id, sync_token) VALUES (?, ?)',
+                                    (calendar_id, next_sync_token))
+        self.connection.commit()
+        return changed
+
+    def _store(self, calendar_id, event):
+        if (event.get('status') == 'cancelled'):
+            self.connection.execute('DELETE FROM events WHERE calendar_id = ? AND event_id = ?',
+                                    (calendar_id, event['id']))
+            return
+
+        self.connection.execute('INSERT OR REPLACE INTO events (calendar_id, event_id, start, body) VALUES (?, ?, ?, ?)',
+                                (calendar_id, event['id'], start_of_event(event), json.dumps(event)))
+
+    def iterate_events(self, calendar_id, start_date, max_date):
+        """
+        Yields the events that start on or after start_date, and before max_date.
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                'SELECT body FROM events WHERE calendar_id = ? AND start >= ? AND start < ? ORDER BY start',
+                (calendar_id, start_date.isoformat(), max_date.isoformat())).fetchall()
+        for (body,) in rows:
+            yield json.loads(body)
@@ -0,0 +1,45 @@
+"""
+Fetch events from the Calendar API, following the page tokens.
+
+Events are yielded as each page arrives, so the caller can filter and process them
+while the next page is requested, and only one page is held in memory at a time.
+Each page request goes through the rate limiter.
+"""
+
+PAGE_SIZE = 1000  # the Calendar API allows up to 2500 events per page
+
+
+def iterate_pages(service, limiter, **list_args):
+    page_token = None
+    while True:
+        page = limiter.execute(service.events().list(pageToken=page_token,
+                                                     **list_args
+                                                     ))
+        yield page
+
+        page_token = page.get('nextPageToken')
+        if (page_token is None):
+            return
+
+
+def iterate_events(service, limiter, **list_args):
+    for page in iterate_pages(service, limiter, **list_args):
+        yield from page.get('items', [])
+
+
+class CountingIterator:
+    """
+    Wraps an iterable, counting the items that have passed through.
+    """
+
+    def __init__(self, iterable):
+        self.iterator = iter(iterable)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        item = next(self.iterator)
+        self.count += 1
+        return item
@@ -0,0 +1,87 @@
+"""
+Filter the events, before deciding which events to process.
+
+Events must be:
+- all-day, for 1 day
+- not a timed event (is all-day)
+- not recurring (except if was manually moved)
+- in the source month, and before the max date of that month
+
+Besides that, the optional black and white lists are applied to the summary,
+and the optional rules from the black and white list files are applied to their fields.
+The lists are compiled once, when the filter is created.
+
+The filter reads the normalized record of the event (see event_record), so the dates are not parsed again.
+"""
+
+import event_record
+import pattern_matcher
+import rule_file
+
+
+class EventFilter:
+    # max_date(date_context) returns the date before which events of that month must start
+    # blacklist_rules and whitelist_rules are the RuleSets loaded from files (see rule_file)
+    def __init__(self, blacklist, whitelist, skip_moved_recurring, max_date,
+                 blacklist_rules=None, whitelist_rules=None):
+        self.blacklist = pattern_matcher.compile_blacklist(blacklist)
+        self.whitelist = pattern_matcher.compile_whitelist(whitelist)
+        self.blacklist_rules = blacklist_rules if blacklist_rules is not None else rule_file.RuleSet()
+        self.whitelist_rules = whitelist_rules if whitelist_rules is not None else rule_file.RuleSet()
+        self.skip_moved_recurring = skip_moved_recurring
+        self.max_date = max_date
+        self.max_dates = {}  # date_context -> max date, so it is calculated once per month
+
+    def max_date_of(self, date_context):
+        max_date = self.max_dates.get(date_context)
+        if (max_date is None):
+            max_date = self.max_date(date_context)
+            self.max_dates[date_context] = max_date
+        return max_date
+
+    def summary_passes_blacklist(self, summary):
+        if (self.blacklist.is_empty):
+            return True
+
+        return not self.blacklist.matches(summary)
+
+    def summary_passes_whitelist(self, summary):
+        if (self.whitelist.is_empty):
+            return True
+
+        return self.whitelist.matches(summary)
+
+    def passes_blacklists(self, event, summary):
+        return (self.summary_passes_blacklist(summary) and
+                not self.blacklist_rules.matches(event))
+
+    def passes_whitelists(self, event, summary):
+        # an event on any of the white lists passes
+        if (self.whitelist_rules.is_empty):
+            return self.summary_passes_whitelist(summary)
+        if (self.whitelist.is_empty):
+            return self.whitelist_rules.matches(event)
+
+        return self.whitelist.matches(summary) or self.whitelist_rules.matches(event)
+
+    def passes(self, event, date_context):
+        return self.passes_record(event_record.normalize(event), date_context)
+
+    def passes_record(self, record, date_context):
+        if (not record.has_start):
+            return False
+        summary = record.lowered_summary
+
+        return (record.has_start and  # else is multi-day event, which we skip
+                # note: not checking for 'recurringEventId' since if the event was manually moved, then it probably got forgotten, and SHOULD be moved to next month
+                not record.is_recurring and
+                (self.skip_moved_recurring or not record.is_moved_recurring) and
+                self.passes_blacklists(record.event, summary) and
+                self.passes_whitelists(record.event, summary) and
+                not record.is_multi_day and
+                not record.is_timed and  # not a timed event
+                # not in the next month (bug in http request?)
+                record.is_all_day and record.start_date.month == date_context.source_month_index and
+                # is before the max date [occurs with *manually moved* recurring events] (bug in http request?)
+                record.start_date < self.max_date_of(date_context)
+                )
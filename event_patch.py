@@ -0,0 +1,34 @@
+"""
+Update events with a minimal patch, instead of sending the whole event back.
+
+Only the fields that actually changed are sent, so descriptions, attendees and attachments
+are not uploaded again when only the dates change. If nothing changed, nothing is sent.
+
+The patch is sent with the ETag of the fetched event (If-Match), so if the event was edited
+elsewhere in the meantime, the server rejects the patch (412) instead of overwriting that edit.
+"""
+
+import api_errors
+
+PRECONDITION_FAILED = 412
+
+
+def compute_patch(original, changes):
+    """
+    Returns the fields of changes that differ from the original event.
+    """
+    return {field: value for field, value in changes.items() if original.get(field) != value}
+
+
+def build_patch_request(service, event, patch, calendar_id='primary'):
+    request = service.events().patch(calendarId=calendar_id,
+                                     eventId=event['id'],
+                                     body=patch
+                                     )
+    if ('etag' in event):
+        request.headers['If-Match'] = event['etag']
+    return request
+
+
+def is_conflict(exception):
+    return api_errors.status_of(exception) == PRECONDITION_FAILED
@@ -0,0 +1,56 @@
+"""
+Normalize each event once, into a compact record that the filter, the sort and the commands all read.
+
+Parsing the dates of an event is the main cost per event, so it is done once here,
+instead of in each of the filter rules, the sort key, the printing and the move.
+
+The original event is kept, since the updates are computed against it.
+"""
+
+from datetime import date
+
+PINNED_PREFIXES = ('[p]', '[pinned]')
+
+
+class EventRecord:
+    __slots__ = ('event', 'summary', 'lowered_summary', 'start_date', 'end_date',
+                 'has_start', 'is_all_day', 'is_timed', 'is_multi_day',
+                 'is_recurring', 'is_moved_recurring', 'is_pinned_to_day')
+
+    def __init__(self, event):
+        self.event = event
+        self.summary = event.get('summary', '')
+        self.lowered_summary = self.summary.lower()
+
+        start = event.get('start')
+        end = event.get('end', {})
+        self.has_start = start is not None
+        start = start or {}
+        self.is_all_day = 'date' in start
+        self.is_timed = 'dateTime' in start
+        # Only all-day events are processed, so only their dates are parsed
+        self.start_date = date.fromisoformat(
+            start['date']) if self.is_all_day else None
+        self.end_date = date.fromisoformat(
+            end['date']) if self.is_all_day and 'date' in end else None
+        # A whole-day event actually ends on the next day!
+        self.is_multi_day = (self.end_date is not None and
+                             (self.end_date - self.start_date).days > 1)
+
+        self.is_recurring = 'recurrence' in event
+        self.is_moved_recurring = 'recurringEventId' in event
+        self.is_pinned_to_day = self.summary.startswith(PINNED_PREFIXES)
+
+
+def normalize(event):
+    return EventRecord(event)
+
+
+def normalize_all(events):
+    for event in events:
+        yield EventRecord(event)
+
+
+def start_date_of(record):
+    """The sort key of records"""
+    return record.start_date
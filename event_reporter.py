@@ -0,0 +1,141 @@
+"""
+Report what is done to each event: as text for a person (the default), or as JSON Lines for other tools (--output jsonl).
+
+The output goes through a buffered writer, instead of a print per line, since printing was a large share of the time
+of a dry run over a large calendar (especially when piped). The buffer is flushed after each month, and at the end.
+
+With --output jsonl, stdout has one compact record per event, and the other messages go to stderr:
+    {"calendar":"primary","id":"abc","date":"2021-03-04","action":"move","target":"2021-04-04"}
+    {"calendar":"primary","id":"def","date":"2021-03-05","action":"clean","diff_size":42}
+    {"calendar":"primary","id":"ghi","date":"2021-03-06","action":"none"}
+
+diff_size is the number of characters removed from the description.
+An update that fails adds a record with the action 'failed' (or 'conflict' if the event was changed elsewhere).
+"""
+
+import json
+import sys
+import threading
+
+OUTPUT_FORMATS = ['text', 'jsonl']
+MAX_BUFFERED_CHARS = 64 * 1024
+
+
+class BufferedWriter:
+    """
+    Collects lines, and writes them in one go when the buffer is full, or when flushed.
+
+    The stream is looked up when writing, so that output captured per thread (see thread_output.py) goes to the right place.
+    Lines can be written from several threads (like the failures reported by the updaters).
+    """
+
+    def __init__(self, get_stream=lambda: sys.stdout, max_buffered_chars=MAX_BUFFERED_CHARS):
+        self.get_stream = get_stream
+        self.max_buffered_chars = max_buffered_chars
+        self.parts = []
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def write_line(self, line):
+        with self.lock:
+            self.parts.append(line + '\n')
+            self.size += len(line) + 1
+            if (self.size >= self.max_buffered_chars):
+                self._flush()
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def _flush(self):
+        if (len(self.parts) == 0):
+            return
+        stream = self.get_stream()
+        stream.write(''.join(self.parts))
+        stream.flush()
+        self.parts = []
+        self.size = 0
+
+
+class TextReporter:
+    def __init__(self, calendar_id, format_date, writer):
+        self.calendar_id = calendar_id
+        self.format_date = format_date
+        self.writer = writer
+
+    def message(self, text):
+        self.writer.write_line(text)
+
+    def event(self, record, summary):
+        self.writer.write_line(self.format_date(record.start_date) + ' ' + summary)
+
+    def moved(self, record, target_date, pinned_day_name):
+        prefix = ""
+        if (pinned_day_name is not None):
+            prefix = f" [pinned to {pinned_day_name}]"
+        self.writer.write_line("--> " + self.format_date(target_date) + prefix)
+
+    def cleaned(self, record, clean_desc):
+        self.writer.write_line('\n'.join([">>-- FROM --<<",
+                                          record.event['description'],
+                                          ">>--  TO  --<<",
+                                          clean_desc,
+                                          ">>-- ---- --<<",
+                                          ""]))
+
+    def unchanged(self, record):
+        pass
+
+    def update_failed(self, event, exception, is_conflict):
+        summary = event.get('summary', '')  # an event without a title has no summary
+        if (is_conflict):
+            self.writer.write_line(
+                f"!! Skipped event '{summary}': it was changed elsewhere since it was fetched")
+            return
+        self.writer.write_line(f"!! Failed to update event '{summary}': {exception}")
+
+    def flush(self):
+        self.writer.flush()
+
+
+class JsonLinesReporter:
+    def __init__(self, calendar_id, writer, messages=lambda: sys.stderr):
+        self.calendar_id = calendar_id
+        self.writer = writer
+        self.messages = messages
+
+    def write_record(self, record, action, **fields):
+        self.write({'calendar': self.calendar_id, 'id': record.event.get('id'),
+                    'date': record.start_date.isoformat(), 'action': action, **fields})
+
+    def write(self, fields):
+        self.writer.write_line(json.dumps(fields, separators=(',', ':'), ensure_ascii=False))
+
+    def message(self, text):
+        print(text, file=self.messages())
+
+    def event(self, record, summary):
+        pass  # the record is written once the action is known
+
+    def moved(self, record, target_date, pinned_day_name):
+        self.write_record(record, 'move', target=target_date.isoformat())
+
+    def cleaned(self, record, clean_desc):
+        self.write_record(record, 'clean',
+                          diff_size=len(record.event['description']) - len(clean_desc))
+
+    def unchanged(self, record):
+        self.write_record(record, 'none')
+
+    def update_failed(self, event, exception, is_conflict):
+        self.write({'calendar': self.calendar_id, 'id': event.get('id'),
+                    'action': 'conflict' if is_conflict else 'failed', 'error': str(exception)})
+
+    def flush(self):
+        self.writer.flush()
+
+
+def create_reporter(output_format, calendar_id, format_date):
+    if (output_format == 'jsonl'):
+        return JsonLinesReporter(calendar_id, BufferedWriter())
+    return TextReporter(calendar_id, format_date, BufferedWriter())
@@ -0,0 +1,140 @@
+"""
+A fake Calendar service, that serves events from a fixture file and records the writes instead of sending them.
+
+Used via the option --source, to replay a recorded (or synthetic) calendar entirely offline, and by the benchmarks.
+
+The fixture file is JSON Lines: one event per line, as returned by the Calendar API.
+Its errors are FixtureHttpError, not the HttpError of googleapiclient, which is slow to import;
+both are told apart by their status, via api_errors.
+"""
+
+import json
+
+import api_errors
+
+FIXTURE_SYNC_TOKEN = 'fixture'
+
+
+class FixtureHttpError(Exception):
+    def __init__(self, status, content):
+        super().__init__(f"HTTP {status}: {content.decode('utf-8')}")
+        self.status = status
+        self.content = content  # bytes, as for HttpError
+
+
+def load_events(path):
+    events = []
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            if (any(line.strip())):
+                events.append(json.loads(line))
+    return events
+
+
+def save_events(path, events):
+    with open(path, 'w', encoding='utf-8') as file:
+        for event in events:
+            file.write(json.dumps(event, separators=(',', ':')) + '\n')
+
+
+def start_of_event(event):
+    start = event.get('start', {})
+    if ('date' in start):
+        return start['date']
+    return start.get('dateTime', '')[:10]
+
+
+class FixtureRequest:
+    def __init__(self, execute):
+        self._execute = execute
+        self.headers = {}
+
+    def execute(self, http=None):
+        return self._execute(self.headers)
+
+
+class FixtureBatch:
+    def __init__(self, callback):
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self, http=None):
+        for (request_id, request) in self.requests:
+            try:
+                response = request.execute()
+            except Exception as exception:
+                if (api_errors.status_of(exception) is None):
+                    raise
+                self.callback(request_id, None, exception)
+                continue
+            self.callback(request_id, response, None)
+
+
+class FixtureEvents:
+    def __init__(self, service):
+        self.service = service
+
+    def list(self, calendarId='primary', maxResults=250, timeMin=None, timeMax=None,
+             pageToken=None, syncToken=None, **kwargs):
+        return FixtureRequest(lambda headers: self.service.list_page(
+            maxResults, timeMin, timeMax, pageToken, syncToken))
+
+    def patch(self, calendarId, eventId, body):
+        return FixtureRequest(lambda headers: self.service.patch_event(eventId, body, headers.get('If-Match')))
+
+
+class FixtureService:
+    """
+    Behaves like the service object of googleapiclient, for the calls made by gcal_move_it.
+    Events are selected by their start date. Each patch is applied and recorded in writes.
+    """
+
+    def __init__(self, events):
+        self.fixture_events = events
+        self.events_by_id = {event['id']: event for event in events}
+        self.writes = []  # list of (event id, patch)
+
+    @staticmethod
+    def load(path):
+        return FixtureService(load_events(path))
+
+    def events(self):
+        return FixtureEvents(self)
+
+    def new_batch_http_request(self, callback):
+        return FixtureBatch(callback)
+
+    def list_page(self, max_results, time_min, time_max, page_token, sync_token):
+        if (sync_token is not None):
+            # the fixture does not change by itself
+            return {'items': [], 'nextSyncToken': FIXTURE_SYNC_TOKEN}
+
+        min_date = time_min[:10] if time_min else ''
+        max_date = time_max[:10] if time_max else '9999'
+        matching = [e for e in self.fixture_events
+                    if min_date <= start_of_event(e) < max_date]
+
+        offset = int(page_token or 0)
+        # copies, so that patches applied here do not change the events held by the caller
+        page = {'items': [dict(e) for e in matching[offset:offset + int(max_results)]]}
+        if (offset + int(max_results) < len(matching)):
+            page['nextPageToken'] = str(offset + int(max_results))
+        elif (time_min is None and time_max is None):
+            page['nextSyncToken'] = FIXTURE_SYNC_TOKEN
+        return page
+
+    def patch_event(self, event_id, patch, if_match):
+        event = self.events_by_id.get(event_id)
+        if (event is None):
+            raise FixtureHttpError(404, b'Not Found')
+        if (if_match is not None and event.get('etag') != if_match):
+            raise FixtureHttpError(412, b'Precondition Failed')
+
+        self.writes.append((event_id, patch))
+        event.update(patch)
+        if ('etag' in event):
+            event['etag'] = '"fixture-' + str(len(self.writes)) + '"'
+        return event
@@ -9,21 +9,53 @@ Uses the Google Calendar API to bulk process events:
 # clean:
 - clean descriptions that have doubled-up URLs or email addresses
 
-Usage: gcal_move_it.py clean <month 1..12> [options]
+Usage: gcal_move_it.py clean <month 1..12 | range of months> [options]
 
 # move:
 - Move non-recurring events from one month to the next month. (exception: a recurring event that was manually moved IS included)
 - Only events that occurred before today are moved.
 
-Usage: gcal_move_it.py move <source month 1..12> [options]
+Usage: gcal_move_it.py move <source month 1..12 | range of source months> [options]
+
+# apply:
+- Apply a plan of moves, that was written by 'move --plan-out plan.json' (see move_plan.py).
+- The calendar is not listed again: exactly the moves of the plan are sent. Events that were edited since the plan was made are skipped.
+
+Usage: gcal_move_it.py apply <plan file> [options]
+
+A range of months can be:
+- 2024-03 (one month, with its year)
+- 1-12 (if the range wraps, like 11-2, then it continues into the following year)
+- 2024-03..2024-09
+- omitted, if the options --from and --to are given
+
+All of the months in the range are fetched in one go.
 
 The options are:
 [-b --blacklist - Specify a blacklist to exclude some events]
+[--blacklist-file - Exclude the events that match any of the rules in this file (see rule_file.py for the format)]
+[--cache - Keep a local cache of the events in this SQLite file, and only fetch the changes since the last run]
+[--calendars - Process these calendars, concurrently: a ; separated list of calendar ids (each optionally =token file of its account), or a JSON file (see calendar_accounts.py)]
+[--clean-cache - Remember the descriptions that are clean in this SQLite file, so they are not cleaned again on later runs]
+[-c --concurrency - Send updates from this many worker threads, one request per event (instead of in batches)]
 [-d --dryrun - Perform a dry run, without actually modifying the calendar]
+[-e --engine - 'sync' (the default) or 'async' (needs aiohttp) - the async engine sends the requests concurrently]
+[--from - Process the events from this date (instead of a range of months). Format: yyyy-mm-dd]
 [-h --help]
+[--journal - Record the updates of a live run in this file, so the run can be resumed (default is .cache/journal.jsonl, or none with --source)]
+[--locale - The locale of the printed dates, like en_GB or nl (default is en)]
+[-o --output - 'text' (the default) or 'jsonl' - jsonl writes one JSON record per event to stdout, and the other messages to stderr (see event_reporter.py)]
+[--plan-out - (move) Write the moves to this plan file, to be applied later via 'apply', instead of modifying the calendar]
+[-p --processes - Clean the descriptions in this many worker processes (for large calendars with long descriptions)]
+[--resume - Resume a live run that stopped halfway: skip the events that the journal has as already updated]
+[-q --qps - Maximum number of calls per second to the Calendar API (default is 10)]
+[--burst - Number of calls that can be made at once, before the qps limit applies (default is 10)]
+[--source - Read the events from this JSON Lines file, instead of from Google Calendar. Updates are recorded, not sent]
 [-s --skipMovedRecurring] - Skip events that are recurring but were manually moved
 [-t --targetdate - Specify an exact target date (instead of the default which is 'one month later')]
+[--to - Process the events up to and including this date (instead of a range of months). Format: yyyy-mm-dd]
 [-w --whitelist - Specify a whitelist to include only some events]
+[--whitelist-file - Include only the events that match one of the rules in this file]
 
 Examples:
 gcal_move_it.py clean 1
@@ -31,27 +63,48 @@ gcal_move_it.py move 1
 gcal_move_it.py move 1 -w urgent;important
 gcal_move_it.py move 1 -b "cancelled;^done" -d -w urgent;important
 gcal_move_it.py move 1 -w subject_1;subject_2 -t 2021-01-13
+gcal_move_it.py move 1 --blacklist-file blacklist.txt
+gcal_move_it.py move 1 --calendars "primary;team@group.calendar.google.com=tokens/bob.pickle"
+gcal_move_it.py move 1 -d --output jsonl > moves.jsonl
+gcal_move_it.py move 1 --plan-out plan.json
+gcal_move_it.py apply plan.json
+gcal_move_it.py move 1 --resume
+gcal_move_it.py clean 1-12
+gcal_move_it.py clean 2024-03..2024-09
+gcal_move_it.py clean --from 2024-03-15 --to 2024-05-10
 """
 
 from __future__ import print_function
-from babel.dates import format_date
 from optparse import OptionParser
-from functools import reduce
-from time import sleep
+from functools import partial, reduce
 
 import calendar
-import getopt
 import datetime
 import pickle
 import os.path
 import sys
 
-from googleapiclient.discovery import build
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-
+# The Google client libraries, Babel and the async engine are slow to import, so they are imported only where they are used.
+# That keeps --help, errors in the arguments and runs from a fixture file quick to start.
+import batch_updater
+import calendar_accounts
+import clean_cache
+import concurrent_updater
+import date_format
 import date_utils
 import description_cleaner
+import event_cache
+import event_fetcher
+import event_filter
+import event_patch
+import event_record
+import event_reporter
+import fixture_service
+import month_range
+import move_plan
+import rate_limiter
+import rule_file
+import run_journal
 import target_date_calculator
 import todays
 
@@ -69,128 +122,186 @@ def split_exlude_empty(text, separator):
     return list(filter(None, text.split(separator)))
 
 
-# optparse - parse the args
-parser = OptionParser(
-    usage='%prog <source month 1..12> [options]')
-parser.add_option('-b', '--blacklist', dest='blacklist', default="",
-                  help="Blacklist: pass only events that do not match any of these ; separated texts. ^ means 'starts with', '=x' means 'exactly matches x'")
-parser.add_option('-d', '--dryrun', dest='is_dry_run', action='store_const',
-                  const=True, default=False,
-                  help='Perform a dry run: do not modify the calendar')
-parser.add_option('-s', '--skipMovedRecurring', dest='skip_moved_recurring', action='store_const', const=True, default=False,
-                  help='Skip events that are recurring but were manually moved')
-parser.add_option('-t', '--targetdate', dest='target_date', default='',
-                  help='Move to this date (instead of adding 1 month). Format: yyyy-mm-dd')
-parser.add_option('-w', '--whitelist', dest='whitelist', default="",
-                  help='Whitelist: pass any events that contain one of these ; separated texts.')
-
-(options, args) = parser.parse_args()
-if (len(args) != 2):
-    usage()
-    sys.exit(2)
-
-blacklist = split_exlude_empty(options.blacklist, ';')
-is_dry_run = options.is_dry_run
-skip_moved_recurring = options.skip_moved_recurring
-command = args[0]
-source_month_index = int(args[1])
-target_date_option = None
-if any(options.target_date):
-    target_date_option = date_utils.parse_year_month_day(options.target_date)
-whitelist = split_exlude_empty(options.whitelist, ';')
-
-today = todays.TodayAuto()
-date_context = date_utils.DateContext(today, source_month_index)
-is_move = command == 'move'
-
-
-def is_multi_day(event):
-    if ('date' in event['start'] and
-            'date' in event['end']
-        ):
-        start_date = date_utils.event_start_date(event)
-        end_date = date_utils.parse_year_month_day(event['end']['date'])
-        delta = end_date - start_date
-        return delta.days > 1  # A whole-day event actually ends on the next day!
-
-    return False
-
-
-def is_in_source_month(event):
-    if ('date' in event['start']):
-        start_date = date_utils.event_start_date(event)
-        return start_date.month == source_month_index
-
-    return False
-
-
-def is_before_max_date(event, date_context):
-    max_date = date_utils.calculate_max_date(date_context, is_move)
-    start_date = date_utils.event_start_date(event)
-
-    return start_date < max_date
-
-
-def matches_blacklist_entry(summary, black):
-    if(black.startswith('^')):
-        return summary.startswith(black[1:])
-    if(black.startswith('=')):
-        return summary == black[1:]
-    return black in summary
-
-
-def summary_passes_blacklist(summary):
-    if (not any(blacklist)):
-        return True
-
-    return all(not matches_blacklist_entry(summary, b) for b in blacklist)
-
-
-def summary_passes_whitelist(summary):
-    if (not any(whitelist)):
-        return True
-
-    return any(w in summary for w in whitelist)
-
-
-def filter_event(event):
+def create_option_parser():
+    parser = OptionParser(
+        usage='%prog <command> <source month 1..12 | range of source months> [options]')
+    parser.add_option('-b', '--blacklist', dest='blacklist', default="",
+                      help="Blacklist: pass only events that do not match any of these ; separated texts. ^ means 'starts with', '=x' means 'exactly matches x'")
+    parser.add_option('--blacklist-file', dest='blacklist_file', default='',
+                      help='Pass only events that do not match any of the rules in this file')
+    parser.add_option('--cache', dest='cache_path', default='',
+                      help='Keep a local cache of the events in this SQLite file, and only fetch the changes since the last run')
+    parser.add_option('--calendars', dest='calendars', default='',
+                      help='Process these calendars, concurrently: a ; separated list of calendar ids (each optionally =token file of its account), or a JSON file')
+    parser.add_option('--clean-cache', dest='clean_cache_path', default='',
+                      help='Remember the descriptions that are clean in this SQLite file, so they are not cleaned again on later runs')
+    parser.add_option('-c', '--concurrency', dest='concurrency', type='int', default=0,
+                      help='Send updates from this many worker threads, one request per event (instead of in batches)')
+    parser.add_option('-d', '--dryrun', dest='is_dry_run', action='store_const',
+                      const=True, default=False,
+                      help='Perform a dry run: do not modify the calendar')
+    parser.add_option('-e', '--engine', dest='engine', type='choice', choices=['sync', 'async'], default='sync',
+                      help="'sync' or 'async' (needs aiohttp) - the async engine sends the requests concurrently")
+    parser.add_option('--from', dest='from_date', default='',
+                      help='Process the events from this date (instead of a range of months). Format: yyyy-mm-dd')
+    parser.add_option('--journal', dest='journal_path', default='',
+                      help='Record the updates of a live run in this file, so the run can be resumed (default is .cache/journal.jsonl, or none with --source)')
+    parser.add_option('--locale', dest='locale', default=date_format.DEFAULT_LOCALE,
+                      help='The locale of the printed dates, like en_GB or nl')
+    parser.add_option('-o', '--output', dest='output_format', type='choice', choices=event_reporter.OUTPUT_FORMATS,
+                      default='text',
+                      help="'text' or 'jsonl' - jsonl writes one JSON record per event to stdout, and the other messages to stderr")
+    parser.add_option('--plan-out', dest='plan_out_path', default='',
+                      help="(move) Write the moves to this plan file, to be applied later via 'apply', instead of modifying the calendar")
+    parser.add_option('-p', '--processes', dest='processes', type='int', default=0,
+                      help='Clean the descriptions in this many worker processes (for large calendars with long descriptions)')
+    parser.add_option('--resume', dest='is_resume', action='store_const', const=True, default=False,
+                      help='Resume a live run that stopped halfway: skip the events that the journal has as already updated')
+    parser.add_option('-q', '--qps', dest='qps', type='float', default=rate_limiter.DEFAULT_QPS,
+                      help='Maximum number of calls per second to the Calendar API')
+    parser.add_option('--burst', dest='burst', type='int', default=rate_limiter.DEFAULT_BURST,
+                      help='Number of calls that can be made at once, before the qps limit applies')
+    parser.add_option('--source', dest='source_path', default='',
+                      help='Read the events from this JSON Lines file, instead of from Google Calendar. Updates are recorded, not sent')
+    parser.add_option('-s', '--skipMovedRecurring', dest='skip_moved_recurring', action='store_const', const=True, default=False,
+                      help='Skip events that are recurring but were manually moved')
+    parser.add_option('-t', '--targetdate', dest='target_date', default='',
+                      help='Move to this date (instead of adding 1 month). Format: yyyy-mm-dd')
+    parser.add_option('--to', dest='to_date', default='',
+                      help='Process the events up to and including this date (instead of a range of months). Format: yyyy-mm-dd')
+    parser.add_option('-w', '--whitelist', dest='whitelist', default="",
+                      help='Whitelist: pass any events that contain one of these ; separated texts.')
+    parser.add_option('--whitelist-file', dest='whitelist_file', default='',
+                      help='Pass any events that match one of the rules in this file')
+    return parser
+
+
+def load_rules_option(parser, path):
+    if (not any(path)):
+        return None
+    try:
+        return rule_file.load_rules(path)
+    except (OSError, ValueError) as error:
+        parser.error(f"Could not load the rules from {path}: {error}")
+
+
+class Settings:
     """
-    # Filter the events:
-    # - following white and black lists
-    # - all-day, for 1 day
-    # - not a timed event (is all-day)
-    # - not recurring (unless was manually moved)
+    The settings of this run, parsed from the command line by configure().
     """
-    if (not 'start' in event):
-        return False
-    summary = event['summary'].lower()
-
-    return (('start' in event) and  # else is multi-day event, which we skip
-            # note: not checking for 'recurringEventId' since if the event was manually moved, then it probably got forgotten, and SHOULD be moved to next month
-            not ('recurrence' in event) and
-            (skip_moved_recurring or not(is_moved_recurring_event(event))) and
-            summary_passes_blacklist(summary) and
-            summary_passes_whitelist(summary) and
-            not is_multi_day(event) and
-            not 'dateTime' in event['start'] and  # not a timed event
-            # not in the next month (bug in http request?)
-            is_in_source_month(event) and
-            # is before the max date [occurs with *manually moved* recurring events] (bug in http request?)
-            is_before_max_date(event, date_context)
-            )
-
-
-def date_to_string(date):
-    return format_date(date, locale='en')
 
+    def __init__(self, options, command):
+        self.command = command
+        self.cache_path = options.cache_path
+        self.clean_cache_path = options.clean_cache_path
+        self.concurrency = options.concurrency
+        self.is_async = options.engine == 'async'
+        self.plan_out_path = options.plan_out_path
+        # the moves are written to the plan, and applied later
+        self.is_dry_run = options.is_dry_run or any(self.plan_out_path)
+        self.is_resume = options.is_resume
+        self.output_format = options.output_format
+        self.processes = options.processes
+        self.qps = options.qps
+        self.burst = options.burst
+        self.source_path = options.source_path
+        # set by configure(), which reports the errors in them
+        self.journal_path = ''
+        self.target_date = None
+        self.date_formatter = None
+        self.source_months = None
+        self.planned_moves = None
+        self.accounts = None
+        self.events_filter = None
+
+    @property
+    def is_move(self):
+        return self.command == 'move'
+
+    @property
+    def journal_command(self):
+        # apply sends moves, so it resumes (and is resumed by) move
+        return 'clean' if self.command == 'clean' else 'move'
+
+
+def configure(argv):
+    """
+    Parses the command line into the Settings of this run.
+    """
+    parser = create_option_parser()
+    (options, args) = parser.parse_args(argv)
+    is_date_range = any(options.from_date) and any(options.to_date)
+    if (len(args) != 2 and not (len(args) == 1 and is_date_range)):
+        usage()
+        sys.exit(2)
+    if (any(options.from_date) != any(options.to_date)):
+        parser.error('The options --from and --to must be given together')
+    if (is_date_range and args[0] == 'apply'):
+        parser.error('The options --from and --to cannot be used with apply')
+    if (is_date_range and len(args) == 2):
+        parser.error(f"Give either the months '{args[1]}' or the options --from and --to, not both")
+
+    settings = Settings(options, args[0])
+    if (any(settings.source_path) and settings.is_async):
+        parser.error('The option --source cannot be used with --engine async')
+    if (any(settings.plan_out_path) and settings.command != 'move'):
+        parser.error('The option --plan-out can only be used with move')
+    # The updates of a fixture are not persisted, so by default they are not journaled
+    settings.journal_path = options.journal_path or ('' if any(settings.source_path) else run_journal.DEFAULT_PATH)
+    if (settings.is_dry_run):
+        settings.journal_path = ''
+    if (settings.is_resume and not any(settings.journal_path)):
+        parser.error('The option --resume needs the journal of a live run (not a dry run, and --journal with --source)')
+    if any(options.target_date):
+        settings.target_date = date_utils.parse_year_month_day(options.target_date)
+    try:
+        settings.date_formatter = date_format.DateFormatter(options.locale)
+    except ValueError as error:
+        parser.error(str(error))
+
+    today = todays.TodayAuto()
+    try:
+        if (settings.command == 'apply'):
+            settings.planned_moves = move_plan.load_plan(args[1])
+        elif (is_date_range):
+            settings.source_months = month_range.date_range(date_utils.parse_year_month_day(options.from_date),
+                                                            date_utils.parse_year_month_day(options.to_date), today)
+        else:
+            settings.source_months = month_range.parse_month_range(args[1], today)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+    settings.accounts = calendar_accounts.default_accounts()
+    if (settings.planned_moves is not None and any(settings.planned_moves)):
+        # the calendars of the plan, with the default account (unless --calendars says otherwise)
+        settings.accounts = [calendar_accounts.Account(calendar_accounts.DEFAULT_TOKEN_PATH,
+                                                       list(move_plan.moves_by_calendar(settings.planned_moves).keys()))]
+    if any(options.calendars):
+        try:
+            settings.accounts = calendar_accounts.parse_calendars_option(options.calendars)
+        except (OSError, ValueError) as error:
+            parser.error(f"Could not read the calendars '{options.calendars}': {error}")
+
+    source_months = settings.source_months
+    settings.events_filter = event_filter.EventFilter(split_exlude_empty(options.blacklist, ';'),
+                                                      split_exlude_empty(options.whitelist, ';'),
+                                                      options.skip_moved_recurring,
+                                                      lambda date_context: source_months.max_date(date_context,
+                                                                                                  settings.is_move),
+                                                      load_rules_option(parser, options.blacklist_file),
+                                                      load_rules_option(parser, options.whitelist_file))
+    return settings
+
+
+def load_credentials(token_path=calendar_accounts.DEFAULT_TOKEN_PATH):
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    from google.auth.transport.requests import Request
 
-def connect_to_calendar_service():
     creds = None
     # The file token.pickle stores the user's access and refresh tokens, and is
     # created automatically when the authorization flow completes for the first
     # time.
-    if os.path.exists('token.pickle'):
-        with open('token.pickle', 'rb') as token:
+    if os.path.exists(token_path):
+        with open(token_path, 'rb') as token:
             creds = pickle.load(token)
     # If there are no (valid) credentials available, let the user log in.
     if not creds or not creds.valid:
@@ -201,86 +312,175 @@ def connect_to_calendar_service():
                 'credentials.json', SCOPES)
             creds = flow.run_local_server(port=0)
         # Save the credentials for the next run
-        with open('token.pickle', 'wb') as token:
+        with open(token_path, 'wb') as token:
             pickle.dump(creds, token)
 
-    return build('calendar', 'v3', credentials=creds)
+    return creds
+
 
+def create_limiter(settings, account):
+    if any(settings.source_path):
+        # a fixture file has no quota
+        return rate_limiter.RateLimiter(qps=1e9, burst=1e9)
+    return rate_limiter.RateLimiter(settings.qps if account.qps is None else account.qps,
+                                    settings.burst if account.burst is None else account.burst)
 
-def get_events_from_service(service, startOfMonth, maxDate):
+
+def connect_to_calendar_service(settings, creds, limiter, calendar_id):
+    if (settings.is_async):
+        import gcal_move_it_async
+
+        return gcal_move_it_async.AsyncEngine(creds, limiter,
+                                              settings.concurrency or gcal_move_it_async.DEFAULT_CONCURRENCY,
+                                              calendar_id)
+    import discovery_cache
+
+    # Avoid fetching the discovery document on every run
+    return discovery_cache.build_service(creds, name=calendar_id)
+
+
+def connect_to_calendars(settings):
+    """
+    Returns a CalendarConnection for each calendar. The calendars of an account share its credentials and rate limiter.
+    """
+    connections = []
+    for account in settings.accounts:
+        limiter = create_limiter(settings, account)
+        creds = None  # the events are from a fixture file
+        if (not any(settings.source_path)):
+            creds = load_credentials(account.token_path)
+        for calendar_id in account.calendar_ids:
+            if any(settings.source_path):
+                service = fixture_service.FixtureService.load(settings.source_path)
+            else:
+                service = connect_to_calendar_service(
+                    settings, creds, limiter, calendar_id)
+            connections.append(calendar_accounts.CalendarConnection(
+                calendar_id, service, creds, limiter))
+    return connections
+
+
+def get_events_from_service(settings, connection, startOfMonth, maxDate):
     # 'Z' indicates UTC time
     timeMin = datetime.datetime.combine(
         startOfMonth, datetime.time()).isoformat() + 'Z'
     timeMax = datetime.datetime.combine(
         maxDate, datetime.time()).isoformat() + 'Z'
 
-    events_result = service.events().list(calendarId='primary',
-                                          maxResults=1000,
-                                          timeMin=timeMin, timeMax=timeMax,
-                                          timeZone='utc'
-                                          # orderBy='startTime'
-                                          ).execute()
-    events = events_result.get('items', [])
-    return events
+    list_args = dict(calendarId=connection.calendar_id,
+                     maxResults=event_fetcher.PAGE_SIZE,
+                     timeMin=timeMin, timeMax=timeMax,
+                     timeZone='utc'
+                     # orderBy='startTime'
+                     )
+
+    if (settings.is_async):
+        return connection.service.iterate_events(**list_args)
+    return event_fetcher.iterate_events(connection.service, connection.limiter, **list_args)
+
+
+def iterate_pages_from_service(settings, connection, **list_args):
+    if (settings.is_async):
+        return connection.service.iterate_pages(**list_args)
+    return event_fetcher.iterate_pages(connection.service, connection.limiter, **list_args)
+
 
+def get_events_from_cache(settings, cache, connection, startOfMonth, maxDate, reporter):
+    changed = cache.sync(
+        lambda **list_args: iterate_pages_from_service(settings, connection, **list_args), connection.calendar_id)
+    reporter.message(f"Synced the cache at '{settings.cache_path}': {changed} events changed")
 
-def get_events(service, maxDate):
+    return cache.iterate_events(connection.calendar_id, startOfMonth, maxDate)
+
+
+def get_events(settings, connection, maxDate, cache, reporter):
     # Call the Calendar API
     #
-    # Get the events for the source month, that could be moved
+    # Get the events for all of the source months, that could be moved
 
-    startOfMonth = date_utils.start_of_source_month(date_context)
+    startOfMonth = settings.source_months.start_date()
 
-    print('Getting events in range: ' +
-          date_to_string(startOfMonth) + ' - ' + date_to_string(maxDate))
+    date_to_string = settings.date_formatter.format_date
+    reporter.message('Getting events in range: ' +
+                     date_to_string(startOfMonth) + ' - ' + date_to_string(maxDate))
+    reporter.flush()
 
-    return get_events_from_service(service, startOfMonth, maxDate)
+    if (cache is not None):
+        return get_events_from_cache(settings, cache, connection, startOfMonth, maxDate, reporter)
+    return get_events_from_service(settings, connection, startOfMonth, maxDate)
 
 
 def date_to_wire_format(target_date):
     return target_date.strftime('%Y-%m-%d')
 
 
-def update_event_via_service(event, service):
-    service.events().update(calendarId='primary',
-                            eventId=event['id'],
-                            body=event
-                            ).execute()
+def update_event_via_service(event, changes, updater, reporter):
+    # Only send the fields that changed
+    patch = event_patch.compute_patch(event, changes)
+    if (not any(patch)):
+        reporter.message("(unchanged, so not updated)")
+        return
 
+    updater.add(event, patch)
 
-def move_event_to_via_service(event, target_date, service):
-    startDate = {'date': date_to_wire_format(target_date)}
-    endDate = {'date': date_to_wire_format(
-        target_date + datetime.timedelta(days=1))}
 
-    event['start'] = startDate
-    event['end'] = endDate
+def report_update_failure(reporter, event, exception):
+    reporter.update_failed(event, exception, event_patch.is_conflict(exception))
 
-    update_event_via_service(event, service)
 
+def record_update(journal, calendar_id, command, event):
+    journal.record(calendar_id, command, event['id'])
 
-def move_event_to(event, target_date, service, is_pinned_to_day):
-    prefix = ""
-    if (is_pinned_to_day):
-        target_day_of_week = calendar.weekday(
-            target_date.year, target_date.month, target_date.day)
-        prefix = f" [pinned to {calendar.day_name[target_day_of_week]}]"
 
-    print("--> " + date_to_string(target_date) + prefix)
-    if not is_dry_run:
-        move_event_to_via_service(event, target_date, service)
+def create_updater(settings, connection, reporter, journal):
+    report_update_failure_to_reporter = partial(report_update_failure, reporter)
+    record_update_in_journal = batch_updater.ignore_success
+    if (journal is not None):
+        record_update_in_journal = partial(record_update, journal, connection.calendar_id, settings.journal_command)
+    if (settings.is_async):
+        return connection.service.create_updater(on_failure=report_update_failure_to_reporter,
+                                                 on_updated=record_update_in_journal)
+
+    build_request = partial(event_patch.build_patch_request,
+                            calendar_id=connection.calendar_id)
+    if (settings.concurrency > 0):
+        # httplib2 is not thread-safe, so each worker has its own authorized http
+        def make_http():
+            if (connection.creds is None):
+                return None  # the events are from a fixture file
+            from google_auth_httplib2 import AuthorizedHttp
+            import httplib2
+
+            return AuthorizedHttp(connection.creds, http=httplib2.Http())
 
+        return concurrent_updater.ConcurrentUpdater(connection.service, connection.limiter, make_http, settings.concurrency,
+                                                    build_request, on_failure=report_update_failure_to_reporter,
+                                                    on_updated=record_update_in_journal)
 
-def move_event(event, date_context, target_date_option, service):
-    source_date = date_utils.event_start_date(event)
+    return batch_updater.BatchUpdater(connection.service, connection.limiter, build_request,
+                                      on_failure=report_update_failure_to_reporter,
+                                      on_updated=record_update_in_journal)
 
-    is_pinned_to_day = (event['summary'].startswith(
-        '[p]') or event['summary'].startswith('[pinned]'))
 
-    target_date = target_date_calculator.calculate_target_date(
-        date_context, source_date, is_pinned_to_day, target_date_option)
+def move_event_to_via_service(event, target_date, updater, reporter):
+    startDate = {'date': date_to_wire_format(target_date)}
+    endDate = {'date': date_to_wire_format(
+        target_date + datetime.timedelta(days=1))}
 
-    move_event_to(event, target_date, service, is_pinned_to_day)
+    update_event_via_service(
+        event, {'start': startDate, 'end': endDate}, updater, reporter)
+
+
+def move_event(settings, record, target_date, updater, reporter):
+    pinned_day_name = None
+    if (record.is_pinned_to_day):
+        target_day_of_week = calendar.weekday(
+            target_date.year, target_date.month, target_date.day)
+        pinned_day_name = settings.date_formatter.day_name(target_day_of_week)
+
+    reporter.moved(record, target_date, pinned_day_name)
+    if not settings.is_dry_run:
+        move_event_to_via_service(record.event, target_date, updater, reporter)
 
 
 def ilen(iterable):
@@ -291,111 +491,345 @@ def list_size_as_text(events):
     return str(ilen(events))
 
 
-def set_event_summary_via_service(event, clean_desc, service):
-    event['description'] = clean_desc
-    update_event_via_service(event, service)
+def set_event_summary_via_service(event, clean_desc, updater, reporter):
+    update_event_via_service(event, {'description': clean_desc}, updater, reporter)
 
 
-def dump_desc(original_description, clean_desc):
-    print(">>-- FROM --<<")
-    print(original_description)
-    print(">>--  TO  --<<")
-    print(clean_desc)
-    print(">>-- ---- --<<")
-    print()
+def needs_cleaning(record, descriptions_cache):
+    if (not 'description' in record.event):
+        return False
+    return descriptions_cache is None or not descriptions_cache.is_clean(record.event['description'])
 
 
-def clean_event(event, service):
+def clean_descriptions(filtered_records, descriptions_cache, processes, pool):
+    """
+    Yields (record, clean description) - the clean description is None if the event has no description.
+    Descriptions that the cache knows to be clean are not cleaned again.
+    With processes, the descriptions are cleaned in the pool of worker processes of the run.
+    """
+    to_clean = [needs_cleaning(record, descriptions_cache)
+                for record in filtered_records]
+    items = ((record.event['id'], record.event['description'])
+             for (record, is_to_clean) in zip(filtered_records, to_clean) if is_to_clean)
+    if (processes > 0):
+        import parallel_cleaner  # multiprocessing is slow to import
+
+        cleaned = parallel_cleaner.clean_in_processes(items, processes, pool=pool)
+    else:
+        cleaned = ((event_id, description_cleaner.clean_description(description))
+                   for (event_id, description) in items)
+
+    for (record, is_to_clean) in zip(filtered_records, to_clean):
+        if (not 'description' in record.event):
+            yield (record, None)
+            continue
+        if (not is_to_clean):
+            yield (record, record.event['description'])
+            continue
+        (event_id, clean_desc) = next(cleaned)
+        # the worker processes only send back the descriptions that changed
+        if (clean_desc is None):
+            clean_desc = record.event['description']
+        if (descriptions_cache is not None):
+            descriptions_cache.mark_clean(clean_desc)
+        yield (record, clean_desc)
+
+
+def clean_event(settings, record, clean_desc, updater, reporter):
+    event = record.event
     if(not('description' in event)):
+        reporter.unchanged(record)
         return False
 
     original_description = event['description']
-    clean_desc = description_cleaner.clean_description(original_description)
     if(clean_desc != original_description):
-        dump_desc(original_description, clean_desc)
-        if not is_dry_run:
-            set_event_summary_via_service(event, clean_desc, service)
+        reporter.cleaned(record, clean_desc)
+        if not settings.is_dry_run:
+            set_event_summary_via_service(event, clean_desc, updater, reporter)
         return True
+    reporter.unchanged(record)
     return False
 
 
-def process_events_clean(filtered_events, service):
+def process_events_clean(settings, filtered_records, updater, descriptions_cache, pool, reporter):
     events_cleaned = 0
-    for event in filtered_events:
+    for (record, clean_desc) in clean_descriptions(filtered_records, descriptions_cache, settings.processes, pool):
         # To debug, uncomment here:
         # import pdb
         # pdb.set_trace()
         #
-        print(date_to_string(date_utils.event_start_date(event)),
-              event['summary'])
-        if (clean_event(event, service)):
+        reporter.event(record, record.summary)
+        if (clean_event(settings, record, clean_desc, updater, reporter)):
             events_cleaned += 1
-        delay_to_avoid_rate_limit()
+    return events_cleaned
 
-    print(f"{events_cleaned} events have a 'dirty' description")
-
-    if is_dry_run:
-        print("(dry run) No events were modified")
-    else:
-        print(f"{events_cleaned} events were updated to have a clean description")
 
+def report_events_clean(settings, events_cleaned, updater, descriptions_cache, limiter, reporter):
+    reporter.message(f"{events_cleaned} events have a 'dirty' description")
+    if (descriptions_cache is not None):
+        reporter.message("Clean cache: " + descriptions_cache.stats_as_text())
 
-def is_moved_recurring_event(event):
-    return ('recurringEventId' in event)
+    if settings.is_dry_run:
+        reporter.message("(dry run) No events were modified")
+    else:
+        reporter.message(f"{updater.succeeded} events were updated to have a clean description")
+    report_rate_limiter_stats(limiter, reporter)
 
 
-def summarize_event(event):
-    summary = event['summary']
-    if is_moved_recurring_event(event):
+def summarize_event(record):
+    summary = record.summary
+    if record.is_moved_recurring:
         summary += ' (recurring, but moved)'
     return summary
 
-def delay_to_avoid_rate_limit():
-    if not is_dry_run:
-        sleep(0.1) # in seconds
 
-def process_events_move(filtered_events, service):
-    for event in filtered_events:
+def report_rate_limiter_stats(limiter, reporter):
+    reporter.message("Rate limiter: " + limiter.stats_as_text())
+
+
+def process_events_move(settings, filtered_records, updater, date_context, reporter, plan):
+    target_dates = target_date_calculator.calculate_target_dates(date_context,
+                                                                 [r.start_date for r in filtered_records],
+                                                                 [r.is_pinned_to_day for r in filtered_records],
+                                                                 settings.target_date)
+    for (record, target_date) in zip(filtered_records, target_dates):
         # To debug, uncomment here:
         # import pdb
         # pdb.set_trace()
         #
-        print(date_to_string(date_utils.event_start_date(event)),
-              summarize_event(event))
-        move_event(event, date_context, target_date_option, service)
-        delay_to_avoid_rate_limit()
+        reporter.event(record, summarize_event(record))
+        move_event(settings, record, target_date, updater, reporter)
+        if (plan is not None):
+            plan.add(record, target_date)
 
-    if is_dry_run:
-        print("(dry run) No events were modified")
+
+def report_events_move(settings, updater, limiter, reporter):
+    if settings.is_dry_run:
+        reporter.message("(dry run) No events were modified")
     else:
-        print(list_size_as_text(filtered_events) + " events were modified")
+        reporter.message(f"{updater.succeeded} events were modified")
+    report_rate_limiter_stats(limiter, reporter)
+
+
+def partition_by_month(settings, events):
+    """
+    Partition the events by source month, keeping only the events that pass the filter for that month.
+    Each event is normalized once, into a record that the rest of the pipeline reads.
+    """
+    events_by_month = {}
+    for record in event_record.normalize_all(events):
+        if (not record.is_all_day):
+            continue  # not an all-day event, so would not pass the filter
+
+        month_context = settings.source_months.context_for_date(record.start_date)
+        if (month_context != None and settings.events_filter.passes_record(record, month_context)):
+            events_by_month.setdefault(month_context, []).append(record)
 
+    return events_by_month
 
-def main():
-    service = connect_to_calendar_service()
 
-    events = get_events(
-        service, date_utils.calculate_max_date(date_context, is_move))
+def month_as_text(date_context):
+    return date_utils.start_of_source_month(date_context).strftime('%B %Y')
 
-    if not events:
-        print('No upcoming events found.')
 
-    filtered_events = list(filter(filter_event, events))
+def create_reporter(settings, calendar_id):
+    return event_reporter.create_reporter(settings.output_format, calendar_id, settings.date_formatter.format_date)
 
-    sorted_and_filtered = sorted(
-        filtered_events, key=lambda event: date_utils.event_start_date(event))
 
-    print("Processing total of " + list_size_as_text(events) +
-          " events filtered down to " + list_size_as_text(filtered_events) + "...")
+def report_fixture_writes(settings, connection, reporter):
+    if any(settings.source_path):
+        reporter.message(f"(fixture) {len(connection.service.writes)} updates were recorded")
 
-    if (command == "clean"):
-        process_events_clean(sorted_and_filtered, service)
-    elif (command == "move"):
-        process_events_move(sorted_and_filtered, service)
+
+def not_done(settings, records, calendar_id, journal):
+    """
+    Returns the records of the events that the journal does not have as already updated.
+    """
+    if (journal is None or journal.resumed_count == 0):
+        return records
+    return [record for record in records
+            if not journal.is_done(calendar_id, settings.journal_command, record.event['id'])]
+
+
+def process_calendar(settings, connection, cache, descriptions_cache, pool, reporter, plan, journal):
+    """
+    Returns the CalendarSummary of the calendar. The moves are added to the plan, if any.
+    The descriptions are cleaned in the pool of worker processes, if any.
+    The events that the journal has as already updated (by the run that is resumed) are skipped.
+    """
+    source_months = settings.source_months
+    events = event_fetcher.CountingIterator(get_events(
+        settings, connection, source_months.window_max_date(settings.is_move), cache, reporter))
+
+    # Events are filtered as each page arrives, so only the filtered events are kept
+    events_by_month = partition_by_month(settings, events)
+    filtered_count = sum(len(month_events)
+                         for month_events in events_by_month.values())
+    events_by_month = {month_context: not_done(settings, records, connection.calendar_id, journal)
+                       for (month_context, records) in events_by_month.items()}
+    done_count = filtered_count - sum(len(month_events)
+                                      for month_events in events_by_month.values())
+
+    if events.count == 0:
+        reporter.message('No upcoming events found.')
+
+    reporter.message("Processing total of " + str(events.count) +
+                     " events filtered down to " + str(filtered_count) + "...")
+    if (done_count > 0):
+        reporter.message(f"(resume) {done_count} of these events were already updated, so are skipped")
+
+    updater = create_updater(settings, connection, reporter, journal)
+    events_changed = 0
+    try:
+        for month_context in source_months.date_contexts:
+            sorted_and_filtered = sorted(events_by_month.get(month_context, []),
+                                         key=event_record.start_date_of)
+            if (len(source_months.date_contexts) > 1):
+                reporter.message(f"== {month_as_text(month_context)}: " +
+                                 list_size_as_text(sorted_and_filtered) + " events ==")
+
+            if (settings.command == "clean"):
+                events_changed += process_events_clean(
+                    settings, sorted_and_filtered, updater, descriptions_cache, pool, reporter)
+            else:
+                process_events_move(settings, sorted_and_filtered, updater, month_context, reporter, plan)
+                events_changed += len(sorted_and_filtered)
+            reporter.flush()
+        updater.flush()
+    finally:
+        # also when stopped halfway, so that the updates in flight are still journaled
+        updater.close()
+
+    if (settings.command == "clean"):
+        report_events_clean(settings, events_changed, updater,
+                            descriptions_cache, connection.limiter, reporter)
     else:
+        report_events_move(settings, updater, connection.limiter, reporter)
+    report_fixture_writes(settings, connection, reporter)
+
+    return calendar_accounts.CalendarSummary(connection.calendar_id, events.count, filtered_count, events_changed,
+                                             updater.succeeded, updater.failed)
+
+
+def apply_plan(settings, connection, moves, reporter, journal):
+    """
+    Sends the moves of the plan, without listing the calendar. Returns the CalendarSummary of the calendar.
+    """
+    reporter.message(f"Applying the plan: {len(moves)} events to move")
+    records = not_done(settings, [event_record.normalize(move_plan.event_of(move)) for move in moves],
+                       connection.calendar_id, journal)
+    target_dates = {move['id']: move_plan.target_date_of(move) for move in moves}
+    if (len(records) < len(moves)):
+        reporter.message(f"(resume) {len(moves) - len(records)} of these events were already moved, so are skipped")
+
+    updater = create_updater(settings, connection, reporter, journal)
+    try:
+        for record in records:
+            reporter.event(record, record.summary)
+            move_event(settings, record, target_dates[record.event['id']], updater, reporter)
+        updater.flush()
+    finally:
+        updater.close()
+
+    report_events_move(settings, updater, connection.limiter, reporter)
+    report_fixture_writes(settings, connection, reporter)
+
+    return calendar_accounts.CalendarSummary(connection.calendar_id, 0, len(moves), len(moves),
+                                             updater.succeeded, updater.failed)
+
+
+def process_calendar_reporting_errors(settings, connection, process):
+    # One calendar failing (like a calendar that is not shared with the account) does not stop the others
+    reporter = create_reporter(settings, connection.calendar_id)
+    reporter.message(f"=== Calendar {connection.calendar_id} ===")
+    try:
+        return process(connection, reporter)
+    except Exception as error:
+        reporter.message(f"!! Could not process the calendar {connection.calendar_id}: {error}")
+        return calendar_accounts.CalendarSummary(connection.calendar_id, error=str(error))
+    finally:
+        reporter.flush()
+
+
+def main(argv=None):
+    settings = configure(sys.argv[1:] if argv is None else argv)
+    command = settings.command
+    if (command not in ["apply", "clean", "move"]):
         print(f"Unknown command '{command}'")
         usage()
-
+        sys.exit(2)
+
+    connections = connect_to_calendars(settings)
+
+    cache = None
+    if any(settings.cache_path):
+        cache = event_cache.EventCache(settings.cache_path)
+    descriptions_cache = None
+    if (command == "clean" and any(settings.clean_cache_path)):
+        descriptions_cache = clean_cache.CleanCache(settings.clean_cache_path)
+    pool = None
+    if (command == "clean" and settings.processes > 0):
+        import parallel_cleaner  # multiprocessing is slow to import
+
+        pool = parallel_cleaner.create_pool(settings.processes)
+
+    plans = {}
+    if any(settings.plan_out_path):
+        plans = {connection: move_plan.CalendarPlan(connection.calendar_id)
+                 for connection in connections}
+    moves_by_calendar = {}
+    if (command == "apply"):
+        moves_by_calendar = move_plan.moves_by_calendar(settings.planned_moves)
+
+    journal = None
+    if any(settings.journal_path):
+        journal = run_journal.Journal(settings.journal_path, settings.is_resume)
+
+    def process(connection, reporter):
+        if (command == "apply"):
+            return apply_plan(settings, connection, moves_by_calendar.get(connection.calendar_id, []), reporter,
+                              journal)
+        return process_calendar(settings, connection, cache, descriptions_cache, pool, reporter,
+                                plans.get(connection), journal)
+
+    reporter = create_reporter(settings, None)
+    try:
+        if (len(connections) == 1):
+            calendar_reporter = create_reporter(settings, connections[0].calendar_id)
+            try:
+                process(connections[0], calendar_reporter)
+            finally:
+                calendar_reporter.flush()
+        else:
+            summaries = calendar_accounts.fan_out(connections,
+                                                  lambda connection: process_calendar_reporting_errors(
+                                                      settings, connection, process))
+            reporter.message(calendar_accounts.summary_as_text(summaries, settings.is_dry_run))
+    finally:
+        # also when stopped halfway (like by Ctrl-C), so that the run can be resumed.
+        # The updaters were closed by then; the async engines are closed before the journal, since their updates
+        # are journaled on the thread of the event loop.
+        if (settings.is_async):
+            for connection in connections:
+                connection.service.close()
+        if (journal is not None):
+            journal.close()
+        if (cache is not None):
+            cache.close()
+        if (descriptions_cache is not None):
+            descriptions_cache.close()
+        if (pool is not None):
+            pool.shutdown(cancel_futures=True)
+
+    for calendar_id in moves_by_calendar.keys() - {connection.calendar_id for connection in connections}:
+        reporter.message(f"!! The plan has {len(moves_by_calendar[calendar_id])} moves for the calendar {calendar_id}, "
+                         "which is not in --calendars, so they were not applied")
+    plan_out_path = settings.plan_out_path
+    if any(plan_out_path):
+        moves = [move for connection in connections for move in plans[connection].moves]
+        move_plan.save_plan(plan_out_path, moves)
+        reporter.message(f"Wrote the plan of {len(moves)} moves to '{plan_out_path}' (to send them: apply {plan_out_path})")
+    reporter.flush()
 
 if __name__ == '__main__':
     main()
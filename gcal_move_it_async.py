@@ -0,0 +1,204 @@
+"""
+An asyncio engine for fetching and updating events, used via the option --engine async.
+
+The list calls and the event updates are sent with an async HTTP client (aiohttp),
+with a semaphore limiting how many requests are in flight at once.
+The event loop runs in a background thread, behind the same interfaces as the synchronous engine
+(an iterator of events, and an updater with add() and flush()), so the filtering, the target dates
+and the cleaning of descriptions are done by exactly the same code.
+
+While the caller filters one page of events, the next page is already being fetched.
+
+aiohttp is an optional dependency:
+poetry install -E async
+"""
+
+import asyncio
+import concurrent.futures
+import json
+import threading
+
+from urllib.parse import quote
+
+import batch_updater
+import concurrent_updater
+import rate_limiter
+
+EVENTS_URL = 'https://www.googleapis.com/calendar/v3/calendars/{calendar_id}/events'
+DEFAULT_CONCURRENCY = 10
+
+
+class AsyncHttpError(Exception):
+    def __init__(self, status, content):
+        super().__init__(f"HTTP {status}: {content}")
+        self.status = status
+        self.content = content
+
+    def reason(self):
+        try:
+            return json.loads(self.content)['error']['errors'][0]['reason']
+        except (ValueError, KeyError, IndexError, TypeError):
+            return None
+
+
+class CredentialsToken:
+    """
+    Provides the access token of the credentials, refreshing it when it has expired.
+    """
+
+    def __init__(self, creds):
+        self.creds = creds
+        self.lock = asyncio.Lock()
+
+    async def get(self):
+        if (not self.creds.valid):
+            async with self.lock:
+                if (not self.creds.valid):
+                    from google.auth.transport.requests import Request
+                    await asyncio.to_thread(self.creds.refresh, Request())
+        return self.creds.token
+
+
+class AsyncCalendarClient:
+    def __init__(self, session, get_token, limiter, concurrency, calendar_id='primary'):
+        self.session = session
+        self.get_token = get_token
+        self.limiter = limiter
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.events_url = EVENTS_URL.format(calendar_id=quote(calendar_id))
+
+    async def _request(self, method, url, params=None, body=None, headers={}):
+        attempt = 0
+        while True:
+            async with self.semaphore:
+                # the token bucket can block, so wait for it on a worker thread
+                await asyncio.to_thread(self.limiter.acquire)
+                headers = dict(headers)
+                headers['Authorization'] = 'Bearer ' + await self.get_token()
+                async with self.session.request(method, url, params=params, json=body, headers=headers) as response:
+                    status = response.status
+                    content = await response.text()
+
+            if (status < 300):
+                return json.loads(content) if content else {}
+
+            error = AsyncHttpError(status, content)
+            if (not rate_limiter.is_quota_status(status, error.reason()) or attempt >= self.limiter.max_retries):
+                raise error
+            await asyncio.to_thread(self.limiter.back_off, attempt)
+            attempt += 1
+
+    async def list_events(self, page_token=None, **params):
+        if (page_token is not None):
+            params['pageToken'] = page_token
+        return await self._request('GET', self.events_url, params=params)
+
+    async def patch_event(self, event, patch):
+        url = self.events_url + '/' + quote(event['id'])
+        headers = {}
+        if ('etag' in event):
+            headers['If-Match'] = event['etag']
+        return await self._request('PATCH', url, body=patch, headers=headers)
+
+
+def _to_query_params(list_args):
+    # the Calendar REST API expects strings for the query parameters
+    return {key: str(value) for key, value in list_args.items() if key != 'calendarId'}
+
+
+class AsyncUpdater:
+    """
+    Has the same interface as BatchUpdater: add() each update, then flush() at the end, and close().
+    The updates run concurrently on the event loop; results are reported in the order added, at flush().
+    on_updated(event) is called on the thread of the event loop, as soon as each update succeeds.
+    """
+
+    def __init__(self, engine, on_success=batch_updater.ignore_success, on_failure=batch_updater.ignore_failure,
+                 on_updated=batch_updater.ignore_success):
+        self.engine = engine
+        self.results = concurrent_updater.OrderedResults(on_success, on_failure, on_updated)
+
+    @property
+    def succeeded(self):
+        return self.results.succeeded
+
+    @property
+    def failed(self):
+        return self.results.failed
+
+    def add(self, event, patch):
+        future = self.engine.submit(
+            self.engine.client.patch_event(event, patch))
+        self.results.add(event, future)
+
+    def flush(self):
+        self.results.flush()
+
+    def close(self):
+        """
+        Waits for the updates in flight, and for their on_updated. Also when the run is stopped halfway.
+        """
+        concurrent.futures.wait([future for (event, future) in self.results.pending])
+        # on_updated runs on the event loop, just after the future is done: anything submitted now runs after it
+        self.engine.submit(asyncio.sleep(0)).result()
+
+
+class AsyncEngine:
+    """
+    Runs an asyncio event loop in a background thread, with one aiohttp session.
+    """
+
+    def __init__(self, creds, limiter, concurrency=DEFAULT_CONCURRENCY, calendar_id='primary',
+                 create_session=None):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(
+            target=self.loop.run_forever, name='async-engine', daemon=True)
+        self.thread.start()
+
+        async def create_client():
+            session = (create_session or _create_aiohttp_session)()
+            token = CredentialsToken(creds)
+            return AsyncCalendarClient(session, token.get, limiter, concurrency, calendar_id)
+
+        self.client = self.submit(create_client()).result()
+
+    def submit(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def iterate_pages(self, **list_args):
+        """
+        Yields the pages of events. The next page is requested before the current page is yielded.
+        """
+        params = _to_query_params(list_args)
+        next_page = self.submit(self.client.list_events(**params))
+        while (next_page is not None):
+            page = next_page.result()
+            page_token = page.get('nextPageToken')
+            next_page = None
+            if (page_token is not None):
+                next_page = self.submit(
+                    self.client.list_events(page_token, **params))
+            yield page
+
+    def iterate_events(self, **list_args):
+        for page in self.iterate_pages(**list_args):
+            yield from page.get('items', [])
+
+    def create_updater(self, on_success=batch_updater.ignore_success, on_failure=batch_updater.ignore_failure,
+                       on_updated=batch_updater.ignore_success):
+        return AsyncUpdater(self, on_success, on_failure, on_updated)
+
+    def close(self):
+        self.submit(self.client.session.close()).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+def _create_aiohttp_session():
+    try:
+        import aiohttp
+    except ImportError:
+        raise ImportError(
+            "The async engine needs aiohttp. To install it: poetry install -E async")
+    return aiohttp.ClientSession()
@@ -0,0 +1,109 @@
+"""
+Parse the range of source months to process in one run.
+
+The range can be:
+- one month: '3', or with the year: '2024-03'
+- a range of months: '1-12' (if the range wraps, like '11-2', then it continues into the following year)
+- a range of months with years: '2024-03..2024-09'
+- a range of dates: --from 2024-03-15 --to 2024-05-10
+"""
+
+import datetime
+
+import date_utils
+
+
+class MonthRange:
+    """
+    The source months to process, each with its own DateContext.
+    Optionally limited to the dates from_date ... to_date (inclusive).
+    """
+
+    def __init__(self, date_contexts, from_date=None, to_date=None):
+        self.date_contexts = date_contexts
+        self.from_date = from_date
+        self.to_date = to_date
+        self.contexts_by_month = {
+            (date_utils.source_year(c), c.source_month_index): c for c in date_contexts}
+
+    def start_date(self):
+        start = date_utils.start_of_source_month(self.date_contexts[0])
+        if (self.from_date != None):
+            return max(start, self.from_date)
+        return start
+
+    def max_date(self, date_context, is_move):
+        max_date = date_utils.calculate_max_date(date_context, is_move)
+        if (self.to_date != None):
+            return min(max_date, self.to_date + datetime.timedelta(days=1))
+        return max_date
+
+    def window_max_date(self, is_move):
+        return max(self.max_date(c, is_move) for c in self.date_contexts)
+
+    def context_for_date(self, event_date):
+        """
+        Returns the DateContext of the month that contains this date, or None if outside of the range.
+        """
+        if (self.from_date != None and event_date < self.from_date):
+            return None
+        return self.contexts_by_month.get((event_date.year, event_date.month))
+
+
+def parse_month_index(text):
+    try:
+        month_index = int(text)
+    except ValueError:
+        raise ValueError(f"Invalid month '{text}': expected 1..12")
+    if (month_index < 1 or month_index > 12):
+        raise ValueError(f"Invalid month '{text}': expected 1..12")
+    return month_index
+
+
+def parse_year_month(text):
+    parts = text.split('-')
+    if (len(parts) != 2 or not parts[0].isdigit()):
+        raise ValueError(f"Invalid month '{text}': expected yyyy-mm")
+    return (int(parts[0]), parse_month_index(parts[1]))
+
+
+def contexts_between(today, first_year, first_month, last_year, last_month):
+    if ((last_year, last_month) < (first_year, first_month)):
+        raise ValueError("Invalid range: the end is before the start")
+
+    contexts = []
+    (year, month) = (first_year, first_month)
+    while ((year, month) <= (last_year, last_month)):
+        contexts.append(date_utils.DateContext(today, month, year))
+        (year, month) = (year + month // 12, month % 12 + 1)
+    return contexts
+
+
+def parse_month_range(text, today):
+    if ('..' in text):
+        (first, last) = text.split('..', 1)
+        return MonthRange(contexts_between(today, *parse_year_month(first), *parse_year_month(last)))
+
+    if ('-' in text):
+        (first, last) = text.split('-', 1)
+        if (len(first) == 4):
+            # one month with its year, like 2024-03
+            (year, month) = parse_year_month(text)
+            return MonthRange(contexts_between(today, year, month, year, month))
+        first_month = parse_month_index(first)
+        last_month = parse_month_index(last)
+        # The year of the first month follows the same rule as for a single month
+        first_year = date_utils.source_year(
+            date_utils.DateContext(today, first_month))
+        last_year = first_year if last_month >= first_month else first_year + 1
+        return MonthRange(contexts_between(today, first_year, first_month, last_year, last_month))
+
+    return MonthRange([date_utils.DateContext(today, parse_month_index(text))])
+
+
+def date_range(from_date, to_date, today):
+    if (to_date < from_date):
+        raise ValueError(f"Invalid range: --to {to_date.isoformat()} is before --from {from_date.isoformat()}")
+    contexts = contexts_between(
+        today, from_date.year, from_date.month, to_date.year, to_date.month)
+    return MonthRange(contexts, from_date, to_date)
@@ -0,0 +1,98 @@
+"""
+A plan of the moves, written by 'move --plan-out plan.json' and carried out later by 'apply plan.json'.
+
+The calendar is fetched and filtered, and the target dates are calculated, only once (by 'move').
+The plan can then be reviewed, and 'apply' sends exactly those moves, without listing the calendar again.
+
+Each move has the ETag of the event when the plan was made, and is sent with If-Match,
+so an event that was edited since then is skipped instead of being moved.
+
+The plan file is JSON:
+    {"format": 1, "checksum": "<sha256 of the moves>", "moves": [
+        {"calendar": "primary", "id": "abc", "etag": "\"3000\"", "summary": "dentist", "from": "2021-03-04", "to": "2021-04-04"}
+    ]}
+
+The checksum detects a plan that was truncated or edited by hand after it was written.
+"""
+
+import hashlib
+import json
+import os
+
+from datetime import date, timedelta
+
+FORMAT = 1
+
+
+class CalendarPlan:
+    """
+    Collects the moves of one calendar.
+    """
+
+    def __init__(self, calendar_id):
+        self.calendar_id = calendar_id
+        self.moves = []
+
+    def add(self, record, target_date):
+        move = {'calendar': self.calendar_id, 'id': record.event['id'], 'etag': record.event.get('etag'),
+                'summary': record.summary, 'from': record.start_date.isoformat(), 'to': target_date.isoformat()}
+        self.moves.append(move)
+
+
+def checksum_of(moves):
+    canonical = json.dumps(moves, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def save_plan(path, moves):
+    plan = {'format': FORMAT, 'checksum': checksum_of(moves), 'moves': moves}
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump(plan, file, separators=(',', ':'), ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def load_plan(path):
+    """
+    Returns the moves of the plan.
+
+    Raises ValueError if the file is not a plan, or if it was changed since it was written.
+    """
+    with open(path, 'r', encoding='utf-8') as file:
+        try:
+            plan = json.load(file)
+        except json.JSONDecodeError as error:
+            raise ValueError(f"Not a plan file: {error}")
+    if (not isinstance(plan, dict) or plan.get('format') != FORMAT or not isinstance(plan.get('moves'), list)):
+        raise ValueError(f"Not a plan file (of format {FORMAT})")
+    moves = plan['moves']
+    if (checksum_of(moves) != plan.get('checksum')):
+        raise ValueError("The plan was changed since it was written (the checksum does not match)")
+    return moves
+
+
+def event_of(move):
+    """
+    Returns the event as it was when the plan was made: just the fields that are needed to move it.
+    """
+    from_date = date.fromisoformat(move['from'])
+    event = {'id': move['id'], 'summary': move['summary'],
+             'start': {'date': from_date.isoformat()},
+             'end': {'date': (from_date + timedelta(days=1)).isoformat()}}
+    if (move['etag'] is not None):
+        event['etag'] = move['etag']
+    return event
+
+
+def target_date_of(move):
+    return date.fromisoformat(move['to'])
+
+
+def moves_by_calendar(moves):
+    """
+    Returns the moves grouped by calendar, in the order that each calendar is first mentioned.
+    """
+    grouped = {}
+    for move in moves:
+        grouped.setdefault(move['calendar'], []).append(move)
+    return grouped
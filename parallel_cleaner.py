@@ -0,0 +1,80 @@
+"""
+Clean descriptions in a pool of worker processes, used via the option --processes.
+
+Cleaning long descriptions is CPU-bound, so for large calendars it is spread over several processes.
+Only the event id and the description are sent to the workers, in chunks,
+and only the descriptions that changed are sent back.
+
+The results are yielded in the order of the input, as soon as each chunk is done,
+so the updates can be sent while the later chunks are still being cleaned.
+A run creates one pool, for all its months and calendars, since starting the worker processes is slow.
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import description_cleaner
+
+CHUNK_SIZE = 100
+MAX_CHUNKS_IN_FLIGHT_PER_PROCESS = 2
+
+
+def clean_chunk(items):
+    """
+    items is a list of (event id, description).
+
+    Returns a list of (event id, clean description), with None as the description if it was already clean.
+    """
+    cleaned = []
+    for (event_id, description) in items:
+        clean_desc = description_cleaner.clean_description(description)
+        cleaned.append((event_id, clean_desc if clean_desc != description else None))
+    return cleaned
+
+
+def chunks(items, chunk_size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if (len(chunk) == chunk_size):
+            yield chunk
+            chunk = []
+    if (any(chunk)):
+        yield chunk
+
+
+def create_pool(processes):
+    """
+    Returns a pool of worker processes, to clean the descriptions of all the months and calendars of a run.
+    The caller shuts it down.
+    """
+    return ProcessPoolExecutor(max_workers=processes)
+
+
+def clean_in_processes(items, processes, chunk_size=CHUNK_SIZE, create_executor=ProcessPoolExecutor, pool=None):
+    """
+    items is an iterable of (event id, description).
+
+    Yields (event id, clean description) in the same order, with None as the description if it was already clean.
+    The descriptions are cleaned in the pool, if any (which is left open), else in a pool for just these items.
+    """
+    if (pool is not None):
+        yield from clean_in_pool(items, pool, processes, chunk_size)
+        return
+    with create_executor(max_workers=processes) as executor:
+        yield from clean_in_pool(items, executor, processes, chunk_size)
+
+
+def clean_in_pool(items, executor, processes, chunk_size):
+    # bound the chunks in flight, so memory use does not grow with the number of events
+    max_in_flight = processes * MAX_CHUNKS_IN_FLIGHT_PER_PROCESS
+    pending = deque()
+    for chunk in chunks(items, chunk_size):
+        pending.append(executor.submit(clean_chunk, chunk))
+        if (len(pending) >= max_in_flight):
+            yield from pending.popleft().result()
+        while (any(pending) and pending[0].done()):
+            yield from pending.popleft().result()
+
+    while (any(pending)):
+        yield from pending.popleft().result()
@@ -0,0 +1,88 @@
+"""
+Match the summary of an event against a blacklist or whitelist, compiled once at start-up.
+
+Blacklist entries:
+- 'x'  : the summary contains x
+- '^x' : the summary starts with x
+- '=x' : the summary exactly matches x
+
+Whitelist entries always mean 'the summary contains x'.
+
+The entries are compiled into:
+- a set, for the exact matches
+- a trie, for the 'starts with' entries
+- one combined regular expression, for the 'contains' entries
+so each summary is scanned once, instead of once per entry.
+"""
+
+import re
+
+
+class PrefixTrie:
+    _END = None  # key that marks the end of a prefix
+
+    def __init__(self, prefixes):
+        self.root = {}
+        for prefix in prefixes:
+            node = self.root
+            for char in prefix:
+                node = node.setdefault(char, {})
+            node[self._END] = True
+
+    def matches_start_of(self, text):
+        node = self.root
+        if (self._END in node):
+            return True
+        for char in text:
+            node = node.get(char)
+            if (node is None):
+                return False
+            if (self._END in node):
+                return True
+        return False
+
+
+def compile_contains(texts):
+    if (not any(texts)):
+        return None
+    # longest first, so that the regex engine does not stop at a shorter alternative
+    alternatives = sorted(set(texts), key=len, reverse=True)
+    return re.compile('|'.join(re.escape(text) for text in alternatives))
+
+
+class CompiledMatcher:
+    def __init__(self, entries, exact, prefixes, contains):
+        self.exact = set(exact)
+        self.prefix_trie = PrefixTrie(prefixes) if len(prefixes) > 0 else None
+        self.contains_always = '' in contains
+        self.contains_regex = compile_contains(
+            [c for c in contains if c != ''])
+        # an empty list does not filter anything out (like a list of only empty entries)
+        self.is_empty = not any(entries)
+
+    def matches(self, summary):
+        if (summary in self.exact):
+            return True
+        if (self.prefix_trie is not None and self.prefix_trie.matches_start_of(summary)):
+            return True
+        if (self.contains_always):
+            return True
+        return self.contains_regex is not None and self.contains_regex.search(summary) is not None
+
+
+def compile_blacklist(entries):
+    exact = []
+    prefixes = []
+    contains = []
+    for entry in entries:
+        if (entry.startswith('^')):
+            prefixes.append(entry[1:])
+        elif (entry.startswith('=')):
+            exact.append(entry[1:])
+        else:
+            contains.append(entry)
+    return CompiledMatcher(entries, exact, prefixes, contains)
+
+
+def compile_whitelist(entries):
+    return CompiledMatcher(entries, [], [], entries)
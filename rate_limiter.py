@@ -0,0 +1,163 @@
+"""
+Limit the rate of calls to the Calendar API.
+
+A token bucket spaces out the calls (qps = tokens added per second, burst = size of the bucket).
+If the API still reports a quota error (403 rateLimitExceeded or 429), the call is retried
+after an exponential backoff with jitter.
+"""
+
+import json
+import random
+import threading
+import time
+
+from collections import deque
+
+import api_errors
+
+DEFAULT_QPS = 10.0
+DEFAULT_BURST = 10
+MAX_RETRIES = 5
+BASE_BACKOFF = 1.0  # in seconds
+MAX_BACKOFF = 32.0  # in seconds
+RATE_WINDOW = 10.0  # in seconds - the window over which the current rate is measured
+
+QUOTA_REASONS = ['rateLimitExceeded', 'userRateLimitExceeded']
+
+
+def error_reason(exception):
+    try:
+        error = json.loads(exception.content.decode('utf-8'))['error']
+        return error['errors'][0]['reason']
+    except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+        return None
+
+
+def is_quota_status(status, reason):
+    if (status == 429):
+        return True
+    # 403 is also used for quota errors, but otherwise means 'forbidden'
+    return status == 403 and reason in QUOTA_REASONS
+
+
+def is_quota_error(exception):
+    status = api_errors.status_of(exception)
+    if (status is None):
+        return False
+    return is_quota_status(status, error_reason(exception))
+
+
+class SystemClock:
+    def now(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class TokenBucket:
+    def __init__(self, qps, burst, clock):
+        self.qps = qps
+        self.burst = burst
+        self.clock = clock
+        self.tokens = burst
+        self.last_refill = clock.now()
+
+    def _refill(self):
+        now = self.clock.now()
+        self.tokens = min(self.burst, self.tokens +
+                          (now - self.last_refill) * self.qps)
+        self.last_refill = now
+
+    def acquire(self, cost=1):
+        """
+        Wait until the bucket has enough tokens, then take them.
+        A cost larger than the bucket (like a big batch) leaves the bucket in debt, so later calls wait longer.
+
+        Returns the number of seconds waited.
+        """
+        self._refill()
+        needed = min(cost, self.burst)
+        waited = 0.0
+        if (self.tokens < needed):
+            waited = (needed - self.tokens) / self.qps
+            self.clock.sleep(waited)
+            self._refill()
+        self.tokens -= cost
+        return waited
+
+
+class RateLimiter:
+    """
+    Can be shared between threads.
+    """
+
+    def __init__(self, qps=DEFAULT_QPS, burst=DEFAULT_BURST, clock=None,
+                 max_retries=MAX_RETRIES, base_backoff=BASE_BACKOFF,
+                 max_backoff=MAX_BACKOFF, random=random.random):
+        self.clock = clock if clock is not None else SystemClock()
+        self.bucket = TokenBucket(qps, burst, self.clock)
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.random = random
+
+        self.calls = 0
+        self.retries = 0
+        self.throttled_seconds = 0.0
+        self.recent_calls = deque()  # (time, cost) within the last RATE_WINDOW
+        # held while waiting for tokens, so that waiting threads queue up in turn
+        self.lock = threading.Lock()
+
+    def acquire(self, cost=1):
+        with self.lock:
+            self.throttled_seconds += self.bucket.acquire(cost)
+
+            now = self.clock.now()
+            self.calls += cost
+            self.recent_calls.append((now, cost))
+            self._forget_old_calls(now)
+
+    def back_off(self, attempt):
+        # 'Equal jitter': wait at least half of the exponential delay
+        delay = min(self.max_backoff, self.base_backoff * (2 ** attempt))
+        delay = delay / 2 + self.random() * delay / 2
+
+        with self.lock:
+            self.retries += 1
+            self.throttled_seconds += delay
+        self.clock.sleep(delay)
+
+    def execute(self, request, cost=1, http=None):
+        attempt = 0
+        while True:
+            self.acquire(cost)
+            try:
+                return request.execute(http=http)
+            except Exception as exception:
+                if (not is_quota_error(exception) or attempt >= self.max_retries):
+                    raise
+                self.back_off(attempt)
+                attempt += 1
+
+    def _forget_old_calls(self, now):
+        while (any(self.recent_calls) and self.recent_calls[0][0] < now - RATE_WINDOW):
+            self.recent_calls.popleft()
+
+    def current_rate(self):
+        """Calls per second, over the last RATE_WINDOW seconds."""
+        with self.lock:
+            now = self.clock.now()
+            self._forget_old_calls(now)
+            if (not any(self.recent_calls)):
+                return 0.0
+            (first_time, first_cost) = self.recent_calls[0]
+            elapsed = now - first_time
+            if (elapsed <= 0):
+                return 0.0
+            # the first call marks the start of the measured interval
+            return (sum(cost for (_, cost) in self.recent_calls) - first_cost) / elapsed
+
+    def stats_as_text(self):
+        return (f"{self.calls} API calls at {self.current_rate():.1f} calls/s, "
+                f"{self.retries} retries, {self.throttled_seconds:.1f} s throttled")
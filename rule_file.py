@@ -0,0 +1,147 @@
+"""
+Load a blacklist or whitelist from a file of rules, via the options --blacklist-file and --whitelist-file.
+
+One rule per line. Empty lines and lines starting with # are ignored.
+
+A rule is matched against the summary, unless it starts with a field selector (summary:, description:, location: or colorId:).
+After the selector, a rule is like an entry of the --blacklist option:
+- 'x'       : the field contains x
+- '^x'      : the field starts with x
+- '=x'      : the field exactly matches x
+- '/regex/' : the field matches the regular expression (searched anywhere in the field)
+
+Rules from a file are not case sensitive.
+
+Example:
+    # done or no longer needed
+    ^done
+    n/a
+    /^\\[(k|ok)\\]/
+    location:=home
+    colorId:=11
+
+Parsing and compiling a big file takes time, so the compiled rules are cached (pickled) in CACHE_DIR,
+keyed by a hash of the file contents. An edited file gets a new hash, so is compiled again.
+(The regular expressions themselves are recompiled by the re module when loaded from the cache.)
+"""
+
+import hashlib
+import os
+import pickle
+import re
+
+import pattern_matcher
+
+FIELDS = ['summary', 'description', 'location', 'colorId']
+CACHE_DIR = os.path.join('.cache', 'rules')
+CACHE_FORMAT = 1  # increment when the cached objects change
+
+
+class FieldRules:
+    def __init__(self, field, entries, regexes):
+        self.field = field
+        self.matcher = pattern_matcher.compile_blacklist(entries)
+        self.has_entries = any(entries)
+        self.regexes = [re.compile(r, re.IGNORECASE) for r in regexes]
+
+    def matches(self, event):
+        value = event.get(self.field)
+        if (value is None):
+            return False
+        value = str(value).lower()
+        if (self.has_entries and self.matcher.matches(value)):
+            return True
+        return any(regex.search(value) for regex in self.regexes)
+
+
+class RuleSet:
+    def __init__(self, field_rules=[]):
+        self.field_rules = field_rules
+        self.is_empty = not any(field_rules)
+
+    def matches(self, event):
+        return any(rules.matches(event) for rules in self.field_rules)
+
+
+def parse_rule(line, line_number):
+    """
+    Returns (field, entry, is_regex).
+    """
+    field = 'summary'
+    (selector, separator, rest) = line.partition(':')
+    if (any(separator) and selector in FIELDS):
+        field = selector
+        line = rest
+
+    if (len(line) >= 2 and line.startswith('/') and line.endswith('/')):
+        pattern = line[1:-1]
+        try:
+            re.compile(pattern)
+        except re.error as error:
+            raise ValueError(
+                f"Line {line_number}: invalid regular expression '{pattern}': {error}")
+        return (field, pattern, True)
+
+    return (field, line.lower(), False)
+
+
+def parse_rules(text):
+    entries = {field: [] for field in FIELDS}
+    regexes = {field: [] for field in FIELDS}
+    line_number = 0
+    for line in text.splitlines():
+        line_number += 1
+        line = line.strip()
+        if (not any(line) or line.startswith('#')):
+            continue
+        (field, entry, is_regex) = parse_rule(line, line_number)
+        if (is_regex):
+            regexes[field].append(entry)
+        else:
+            entries[field].append(entry)
+
+    return RuleSet([FieldRules(field, entries[field], regexes[field])
+                    for field in FIELDS
+                    if any(entries[field]) or any(regexes[field])])
+
+
+def cache_path_for(content, cache_dir):
+    digest = hashlib.sha256(content).hexdigest()
+    return os.path.join(cache_dir, f"{digest}.v{CACHE_FORMAT}.pickle")
+
+
+def read_cached(path):
+    if (not os.path.exists(path)):
+        return None
+    try:
+        with open(path, 'rb') as file:
+            rules = pickle.load(file)
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, IndexError, KeyError, TypeError, ValueError, re.error):
+        return None
+    return rules if isinstance(rules, RuleSet) else None
+
+
+def write_cached(path, rules):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as file:
+        pickle.dump(rules, file)
+    os.replace(temp_path, path)
+
+
+def load_rules(path, cache_dir=CACHE_DIR):
+    """
+    Returns the compiled RuleSet of the file, from the cache if that file was already compiled.
+    """
+    with open(path, 'rb') as file:
+        content = file.read()
+
+    cached_path = cache_path_for(content, cache_dir)
+    rules = read_cached(cached_path)
+    if (rules is None):
+        rules = parse_rules(content.decode('utf-8'))
+        try:
+            write_cached(cached_path, rules)
+        except OSError:
+            pass  # the cache is only an optimisation
+    return rules
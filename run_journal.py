@@ -0,0 +1,87 @@
+"""
+A journal of the updates that were done by a live run, so that a run that stopped halfway (token expiry, quota, Ctrl-C)
+can be resumed via the option --resume, skipping the events that were already updated.
+
+The journal is an append-only JSON Lines file, with one line per event that was updated:
+    {"calendar":"primary","command":"move","id":"abc"}
+
+Each update is written as soon as it succeeds (by the updaters, from the thread that completed it),
+and the file is synced to disk (fsync) in batches: every SYNC_EVERY lines, or at the first line after
+SYNC_INTERVAL seconds, and when the journal is closed (also on Ctrl-C).
+So a crash of the process or the machine can lose the last batch, and a resumed run processes those events again.
+For clean that is harmless (a cleaned description is already clean), and so is it for a move of one month
+(a moved event is no longer in the source month). But with a range of months (like move 3-4),
+an event that was moved from March into April is still in the range, so it is moved once more, to May.
+
+A run without --resume starts a new journal.
+"""
+
+import json
+import os
+import threading
+import time
+
+DEFAULT_PATH = os.path.join('.cache', 'journal.jsonl')
+SYNC_EVERY = 50
+SYNC_INTERVAL = 1.0
+
+
+def read_done(path):
+    """
+    Returns the set of (calendar id, command, event id) of the updates in the journal.
+    """
+    done = set()
+    if (not os.path.exists(path)):
+        return done
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            try:
+                entry = json.loads(line)
+                done.add((entry['calendar'], entry['command'], entry['id']))
+            except (ValueError, KeyError, TypeError):
+                pass  # the last line can be cut short by a crash
+    return done
+
+
+class Journal:
+    def __init__(self, path=DEFAULT_PATH, resume=False, sync_every=SYNC_EVERY, sync_interval=SYNC_INTERVAL,
+                 clock=time.monotonic):
+        self.path = path
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.clock = clock
+        self.done = read_done(path) if resume else set()
+        self.resumed_count = len(self.done)
+
+        if (any(os.path.dirname(path))):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.file = open(path, 'a' if resume else 'w', encoding='utf-8')
+        self.lock = threading.Lock()  # updates succeed on the threads of the updaters, too
+        self.unsynced = 0
+        self.last_sync = self.clock()
+
+    def is_done(self, calendar_id, command, event_id):
+        return (calendar_id, command, event_id) in self.done
+
+    def record(self, calendar_id, command, event_id):
+        line = json.dumps({'calendar': calendar_id, 'command': command, 'id': event_id},
+                          separators=(',', ':'), ensure_ascii=False)
+        with self.lock:
+            self.file.write(line + '\n')
+            self.done.add((calendar_id, command, event_id))
+            self.unsynced += 1
+            if (self.unsynced >= self.sync_every or self.clock() - self.last_sync >= self.sync_interval):
+                self._sync()
+
+    def _sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.unsynced = 0
+        self.last_sync = self.clock()
+
+    def close(self):
+        with self.lock:
+            if (self.file.closed):
+                return
+            self._sync()
+            self.file.close()
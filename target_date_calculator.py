@@ -2,9 +2,9 @@
 For a given event, calculate the target day of month, for the target month and year.
 """
 
-from calendar import weekday
 from datetime import date
 
+import calendar_tables
 import date_utils
 
 
@@ -21,7 +21,7 @@ def calculate_day_of_month_for_source_date(source_date, target_year, target_mont
 
 def adjust_target_to_pinned_day_first_of_month(target_date, source_day_of_week):
     target_day = 1
-    day_of_week_target_month_1st = weekday(
+    day_of_week_target_month_1st = calendar_tables.weekday(
         target_date.year, target_date.month, target_day)
 
     if (source_day_of_week >= day_of_week_target_month_1st):
@@ -33,18 +33,15 @@ def adjust_target_to_pinned_day_first_of_month(target_date, source_day_of_week):
 
 
 def adjust_target_to_pinned_day_last_of_month(target_date, source_day_of_week):
-    days_in_target_month = date_utils.days_in_month(
-        target_date.year, target_date.month)
-    target_day = days_in_target_month
-    while (weekday(target_date.year, target_date.month, target_day) != source_day_of_week):
-        target_day += -1
+    target_day = calendar_tables.last_day_of_weekday(
+        target_date.year, target_date.month, source_day_of_week)
     return date(target_date.year, target_date.month, target_day)
 
 
 def adjust_target_to_pinned_day_handling_month_bounds(target_date, source_day_of_week):
     days_in_target_month = date_utils.days_in_month(
         target_date.year, target_date.month)
-    target_day_of_week = weekday(
+    target_day_of_week = calendar_tables.weekday(
         target_date.year, target_date.month, target_date.day)
     diff = target_day_of_week - source_day_of_week
     target_day = target_date.day
@@ -65,10 +62,10 @@ def adjust_target_to_pinned_day_handling_month_bounds(target_date, source_day_of
 
 def adjust_target_to_pinned_day(target_date, source_date):
     # 0-6 ~ Mon-Sun
-    source_day_of_week = weekday(
+    source_day_of_week = calendar_tables.weekday(
         source_date.year, source_date.month, source_date.day)
 
-    target_day_of_week = weekday(
+    target_day_of_week = calendar_tables.weekday(
         target_date.year, target_date.month, target_date.day)
 
     if (target_day_of_week == source_day_of_week):
@@ -104,3 +101,30 @@ def calculate_target_date(date_context, source_date, is_pinned_to_day, target_da
         return adjust_target_to_pinned_day(target_date, source_date)
 
     return target_date
+
+
+def calculate_target_dates(date_context, source_dates, pinned_flags, target_date_option):
+    """
+    Like calculate_target_date, for many events of the same source month at once.
+    Returns the list of target dates, in the same order as source_dates.
+
+    The target date only depends on the source date and whether it is pinned,
+    so each distinct (source date, pinned) is calculated once, however many events there are.
+    """
+    if (len(source_dates) != len(pinned_flags)):
+        raise ValueError(
+            f"Expected a pinned flag for each of the {len(source_dates)} source dates, not {len(pinned_flags)}")
+
+    if (target_date_option != None):
+        return [target_date_option] * len(source_dates)
+
+    targets = {}  # (source date, is pinned) -> target date
+    target_dates = []
+    for key in zip(source_dates, pinned_flags):
+        target_date = targets.get(key)
+        if (target_date is None):
+            target_date = calculate_target_date(
+                date_context, key[0], key[1], None)
+            targets[key] = target_date
+        target_dates.append(target_date)
+    return target_dates
@@ -0,0 +1,29 @@
+import unittest
+
+import httplib2
+
+from googleapiclient.errors import HttpError
+from parameterized import parameterized
+
+import api_errors
+from fixture_service import FixtureHttpError
+from gcal_move_it_async import AsyncHttpError
+
+
+class TestApiErrors(unittest.TestCase):
+
+    @parameterized.expand([
+        ('http_error', HttpError(httplib2.Response({'status': 412}), b''), 412),
+        ('async_error', AsyncHttpError(410, ''), 410),
+        ('fixture_error', FixtureHttpError(404, b'Not Found'), 404),
+        ('other_error', OSError('offline'), None),
+    ])
+    def test_status_of(self, name, exception, expected):
+        # Act
+        actual = api_errors.status_of(exception)
+
+        self.assertEqual(expected, actual)
+
+
+if __name__ == '__main__':
+    unittest.main()
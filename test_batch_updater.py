@@ -0,0 +1,182 @@
+import json
+import unittest
+
+from googleapiclient.discovery import build_from_document
+from googleapiclient.http import HttpMockSequence
+
+import batch_updater
+import rate_limiter
+from test_rate_limiter import FakeClock
+
+# A minimal discovery document, with just the methods used by gcal_move_it:
+DISCOVERY = {
+    'kind': 'discovery#restDescription',
+    'discoveryVersion': 'v1',
+    'id': 'calendar:v3',
+    'name': 'calendar',
+    'version': 'v3',
+    'rootUrl': 'https://www.googleapis.com/',
+    'servicePath': 'calendar/v3/',
+    'batchPath': 'batch/calendar/v3',
+    'protocol': 'rest',
+    'parameters': {},
+    'schemas': {
+        'Event': {'id': 'Event', 'type': 'object'},
+    },
+    'resources': {
+        'events': {
+            'methods': {
+                'update': {
+                    'id': 'calendar.events.update',
+                    'path': 'calendars/{calendarId}/events/{eventId}',
+                    'httpMethod': 'PUT',
+                    'parameters': {
+                        'calendarId': {'type': 'string', 'required': True, 'location': 'path'},
+                        'eventId': {'type': 'string', 'required': True, 'location': 'path'},
+                    },
+                    'parameterOrder': ['calendarId', 'eventId'],
+                    'request': {'$ref': 'Event'},
+                    'response': {'$ref': 'Event'},
+                },
+                'patch': {
+                    'id': 'calendar.events.patch',
+                    'path': 'calendars/{calendarId}/events/{eventId}',
+                    'httpMethod': 'PATCH',
+                    'parameters': {
+                        'calendarId': {'type': 'string', 'required': True, 'location': 'path'},
+                        'eventId': {'type': 'string', 'required': True, 'location': 'path'},
+                    },
+                    'parameterOrder': ['calendarId', 'eventId'],
+                    'request': {'$ref': 'Event'},
+                    'response': {'$ref': 'Event'},
+                },
+            },
+        },
+    },
+}
+
+BOUNDARY = 'batch_boundary'
+
+
+def batch_response(statuses):
+    """Build a multipart batch response, with one part per (request_id, status)."""
+    parts = []
+    for (request_id, status) in statuses:
+        if (status == 200):
+            content = json.dumps({'id': 'event_' + request_id})
+        else:
+            content = json.dumps({'error': {'code': status, 'errors': [
+                {'reason': 'rateLimitExceeded' if status == 403 else 'backendError'}]}})
+        parts.append(
+            '--' + BOUNDARY + '\r\n'
+            'Content-Type: application/http\r\n'
+            'Content-ID: <response-x + ' + request_id + '>\r\n\r\n'
+            'HTTP/1.1 ' + str(status) + ' Status\r\n'
+            'Content-Type: application/json\r\n\r\n' +
+            content + '\r\n')
+    body = ''.join(parts) + '--' + BOUNDARY + '--'
+    return ({'status': '200', 'content-type': 'multipart/mixed; boundary="' + BOUNDARY + '"'}, body)
+
+
+def make_events(count):
+    return [{'id': 'event_' + str(i), 'summary': 'event ' + str(i)} for i in range(count)]
+
+
+class TestBatchUpdater(unittest.TestCase):
+
+    def create_updater(self, responses, batch_size=batch_updater.MAX_BATCH_SIZE):
+        http = HttpMockSequence(responses)
+        service = build_from_document(DISCOVERY, http=http)
+
+        self.succeeded = []
+        self.failed = []
+        self.clock = FakeClock()
+        self.limiter = rate_limiter.RateLimiter(
+            qps=1000, burst=1000, clock=self.clock, random=lambda: 1.0)
+        updater = batch_updater.BatchUpdater(
+            service,
+            self.limiter,
+            on_success=lambda event: self.succeeded.append(event['id']),
+            on_failure=lambda event, exception: self.failed.append(
+                event['id']),
+            batch_size=batch_size)
+        return (updater, http)
+
+    def test_sends_one_request_per_batch(self):
+        updater, http = self.create_updater([
+            batch_response([(str(i), 200) for i in range(2)]),
+            batch_response([(str(i), 200) for i in range(2)]),
+            batch_response([('0', 200)]),
+        ], batch_size=2)
+
+        # Act
+        for event in make_events(5):
+            updater.add(event, event)
+        updater.flush()
+
+        self.assertEqual(5, updater.succeeded)
+        self.assertEqual(0, updater.failed)
+        self.assertEqual(3, updater.batches_sent)
+        self.assertEqual(['event_0', 'event_1', 'event_2', 'event_3', 'event_4'],
+                         sorted(self.succeeded))
+        self.assertEqual([], self.clock.sleeps)
+        self.assertEqual(5, self.limiter.calls)
+
+    def test_batch_size_is_capped_at_api_limit(self):
+        updater, http = self.create_updater([], batch_size=1000)
+
+        self.assertEqual(batch_updater.MAX_BATCH_SIZE, updater.batch_size)
+
+    def test_retries_only_the_failed_requests(self):
+        updater, http = self.create_updater([
+            batch_response([('0', 200), ('1', 503), ('2', 200), ('3', 403)]),
+            batch_response([('0', 200), ('1', 200)]),
+        ])
+
+        # Act
+        for event in make_events(4):
+            updater.add(event, event)
+        updater.flush()
+
+        self.assertEqual(4, updater.succeeded)
+        self.assertEqual(2, updater.batches_sent)
+        self.assertEqual([rate_limiter.BASE_BACKOFF], self.clock.sleeps)
+        self.assertEqual(1, self.limiter.retries)
+        # the retry batch only contains the 2 failed events:
+        retry_request_body = http.request_sequence[1][2]
+        self.assertEqual(2, retry_request_body.count('PATCH /calendar/v3/'))
+        self.assertIn('event_1', retry_request_body)
+        self.assertIn('event_3', retry_request_body)
+        self.assertNotIn('event_2', retry_request_body)
+        self.assertEqual(['event_0', 'event_1', 'event_2', 'event_3'],
+                         sorted(self.succeeded))
+
+    def test_does_not_retry_permanent_failure(self):
+        updater, http = self.create_updater([
+            batch_response([('0', 200), ('1', 404)]),
+        ])
+
+        # Act
+        for event in make_events(2):
+            updater.add(event, event)
+        updater.flush()
+
+        self.assertEqual(1, updater.succeeded)
+        self.assertEqual(['event_1'], self.failed)
+        self.assertEqual(1, updater.batches_sent)
+
+    def test_gives_up_after_max_retries(self):
+        updater, http = self.create_updater(
+            [batch_response([('0', 503)])] * (batch_updater.MAX_RETRIES + 1))
+
+        # Act
+        updater.add(make_events(1)[0], {})
+        updater.flush()
+
+        self.assertEqual(0, updater.succeeded)
+        self.assertEqual(['event_0'], self.failed)
+        self.assertEqual(batch_updater.MAX_RETRIES + 1, updater.batches_sent)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from contextlib import redirect_stdout
+
+import calendar_accounts
+from calendar_accounts import CalendarSummary
+
+
+class TestCalendarAccounts(unittest.TestCase):
+
+    def test_parse_calendar_list(self):
+        # Act
+        accounts = calendar_accounts.parse_calendar_list(
+            "primary;team@group.calendar.google.com=tokens/bob.pickle;other")
+
+        self.assertEqual(['token.pickle', 'tokens/bob.pickle'],
+                         [account.token_path for account in accounts])
+        self.assertEqual([['primary', 'other'], ['team@group.calendar.google.com']],
+                         [account.calendar_ids for account in accounts])
+        self.assertIsNone(accounts[0].qps)
+
+    def test_parse_config(self):
+        config = {'accounts': [
+            {'calendars': ['primary']},
+            {'token': 'tokens/bob.pickle', 'qps': 5, 'burst': 2, 'calendars': ['team']}]}
+
+        # Act
+        accounts = calendar_accounts.parse_config(config)
+
+        self.assertEqual('token.pickle', accounts[0].token_path)
+        self.assertEqual(['team'], accounts[1].calendar_ids)
+        self.assertEqual((5, 2), (accounts[1].qps, accounts[1].burst))
+
+    def test_parse_config_without_calendars(self):
+        with self.assertRaises(ValueError):
+            calendar_accounts.parse_config({'accounts': [{'token': 'x'}]})
+
+    def test_parse_config_with_calendars_that_are_not_a_list(self):
+        with self.assertRaises(ValueError):
+            calendar_accounts.parse_config({'accounts': [{'calendars': 'primary'}]})
+
+    def test_parse_calendars_option_from_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'calendars.json')
+            with open(path, 'w', encoding='utf-8') as file:
+                json.dump({'accounts': [{'calendars': ['a', 'b']}]}, file)
+
+            # Act
+            accounts = calendar_accounts.parse_calendars_option(path)
+
+        self.assertEqual(['a', 'b'], accounts[0].calendar_ids)
+
+    def test_parse_calendars_option_without_calendars(self):
+        with self.assertRaises(ValueError):
+            calendar_accounts.parse_calendars_option(';')
+
+    def test_fan_out_keeps_the_order(self):
+        barrier = threading.Barrier(3)
+
+        def process(item):
+            print(f"start {item}")
+            barrier.wait(timeout=5)  # all items are processed at the same time
+            print(f"end {item}")
+            return item * 2
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            # Act
+            results = calendar_accounts.fan_out([1, 2, 3], process, max_workers=3)
+
+        self.assertEqual([2, 4, 6], results)
+        self.assertEqual("start 1\nend 1\nstart 2\nend 2\nstart 3\nend 3\n",
+                         output.getvalue())
+
+    def test_summary_as_text(self):
+        summaries = [CalendarSummary('a', fetched=10, filtered=4, changed=2, succeeded=2),
+                     CalendarSummary('b', fetched=5, filtered=1, changed=1, failed=1),
+                     CalendarSummary('c', error="HttpError 404")]
+
+        # Act
+        text = calendar_accounts.summary_as_text(summaries, is_dry_run=False)
+
+        self.assertEqual("== Summary of 3 calendars ==\n"
+                         "a: 10 events, 4 filtered, 2 to change, 2 updated, 0 failed\n"
+                         "b: 5 events, 1 filtered, 1 to change, 0 updated, 1 failed\n"
+                         "c: !! HttpError 404\n"
+                         "Total: 15 events, 5 filtered, 3 to change, 2 updated, 1 failed\n"
+                         "!! 1 calendars could not be processed", text)
+
+    def test_summary_as_text_dry_run(self):
+        # Act
+        text = calendar_accounts.summary_as_text(
+            [CalendarSummary('a', fetched=1)], is_dry_run=True)
+
+        self.assertEqual("== Summary of 1 calendars ==\n"
+                         "a: 1 events, 0 filtered, 0 to change\n"
+                         "Total: 1 events, 0 filtered, 0 to change", text)
+
+
+if __name__ == '__main__':
+    unittest.main()
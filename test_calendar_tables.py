@@ -0,0 +1,32 @@
+import calendar
+import unittest
+
+import calendar_tables
+
+
+class TestCalendarTables(unittest.TestCase):
+
+    def test_same_as_calendar_module(self):
+        for year in range(1900, 2101):
+            for month in range(1, 13):
+                days = calendar.monthrange(year, month)[1]
+
+                self.assertEqual(days, calendar_tables.days_in_month(year, month))
+                for day in range(1, days + 1):
+                    self.assertEqual(calendar.weekday(year, month, day),
+                                     calendar_tables.weekday(year, month, day), (year, month, day))
+
+    def test_last_day_of_weekday(self):
+        for year in range(1990, 2031):
+            for month in range(1, 13):
+                days = calendar.monthrange(year, month)[1]
+                for weekday in range(7):
+                    expected = max(day for day in range(1, days + 1)
+                                   if calendar.weekday(year, month, day) == weekday)
+
+                    self.assertEqual(expected, calendar_tables.last_day_of_weekday(year, month, weekday),
+                                     (year, month, weekday))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import clean_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        self.time += 1
+        return self.time
+
+
+class TestCleanCache(unittest.TestCase):
+
+    def create_cache(self, max_entries=clean_cache.MAX_ENTRIES, path=':memory:'):
+        return clean_cache.CleanCache(path, max_entries, FakeClock())
+
+    def test_unknown_description_is_not_clean(self):
+        cache = self.create_cache()
+
+        # Act
+        actual = cache.is_clean('some text')
+
+        self.assertFalse(actual)
+        self.assertEqual(0, cache.hits)
+        self.assertEqual(1, cache.lookups)
+        cache.close()
+
+    def test_marked_description_is_clean(self):
+        cache = self.create_cache()
+        cache.mark_clean('some text')
+
+        # Act
+        actual = cache.is_clean('some text')
+
+        self.assertTrue(actual)
+        self.assertFalse(cache.is_clean('some other text'))
+        self.assertEqual('1 of 2 descriptions were already known to be clean (50% hit rate)',
+                         cache.stats_as_text())
+        cache.close()
+
+    def test_persists_between_runs(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'clean.sqlite')
+            cache = self.create_cache(path=path)
+            cache.mark_clean('some text')
+            cache.close()
+
+            # Act
+            cache = self.create_cache(path=path)
+            actual = cache.is_clean('some text')
+            cache.close()
+
+            self.assertTrue(actual)
+
+    def test_commits_every_few_marks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'clean.sqlite')
+            cache = clean_cache.CleanCache(path, clock=FakeClock(), commit_every=2)
+            cache.mark_clean('text 1')
+            cache.mark_clean('text 2')
+            cache.mark_clean('text 3')
+
+            # Act
+            other = sqlite3.connect(path)
+            actual = other.execute('SELECT COUNT(*) FROM clean_descriptions').fetchone()[0]
+            other.close()
+            cache.close()
+
+            self.assertEqual(2, actual)
+
+    def test_evicts_least_recently_used(self):
+        cache = self.create_cache(max_entries=2)
+        cache.mark_clean('a')
+        cache.mark_clean('b')
+        cache.mark_clean('c')
+        cache.is_clean('a')  # now 'b' is the least recently used
+
+        # Act
+        cache.evict()
+
+        self.assertEqual(2, cache.size())
+        self.assertTrue(cache.is_clean('a'))
+        self.assertFalse(cache.is_clean('b'))
+        self.assertTrue(cache.is_clean('c'))
+        cache.close()
+
+    def test_key_depends_on_the_cleaner_version(self):
+        key = clean_cache.description_key('some text')
+
+        original_version = clean_cache.description_cleaner.VERSION
+        clean_cache.description_cleaner.VERSION = original_version + 1
+        self.addCleanup(setattr, clean_cache.description_cleaner,
+                        'VERSION', original_version)
+
+        self.assertNotEqual(key, clean_cache.description_key('some text'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import json
+import threading
+import time
+import unittest
+
+import httplib2
+from googleapiclient.discovery import build_from_document
+
+import concurrent_updater
+import rate_limiter
+from test_batch_updater import DISCOVERY, make_events
+from test_rate_limiter import FakeClock
+
+
+class FakeHttp:
+    """Fails the events whose id is in failing_ids. Records which thread used it."""
+
+    def __init__(self, failing_ids, requests, delay=0):
+        self.failing_ids = failing_ids
+        self.requests = requests
+        self.delay = delay
+        self.threads = set()
+
+    def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        event_id = uri.split('?')[0].split('/')[-1]
+        self.requests.append(event_id)
+        if (event_id in self.failing_ids):
+            return (httplib2.Response({'status': 404}), b'{"error": {"code": 404}}')
+        return (httplib2.Response({'status': 200}), json.dumps({'id': event_id}).encode('utf-8'))
+
+
+class TestConcurrentUpdater(unittest.TestCase):
+
+    def create_updater(self, workers, failing_ids=[], delay=0):
+        service = build_from_document(DISCOVERY, http=None)
+
+        self.https = []
+        self.requests = []
+        self.reported = []
+        self.updated = []
+        lock = threading.Lock()
+
+        def make_http():
+            http = FakeHttp(failing_ids, self.requests, delay)
+            with lock:
+                self.https.append(http)
+            return http
+
+        limiter = rate_limiter.RateLimiter(
+            qps=1000, burst=1000, clock=FakeClock())
+        return concurrent_updater.ConcurrentUpdater(
+            service, limiter, make_http, workers,
+            on_success=lambda event: self.reported.append(
+                ('ok', event['id'])),
+            on_failure=lambda event, exception: self.reported.append(('failed', event['id'])),
+            on_updated=lambda event: self.updated.append(event['id']))
+
+    def test_updates_all_events(self):
+        updater = self.create_updater(workers=4)
+
+        # Act
+        for event in make_events(20):
+            updater.add(event, event)
+        updater.flush()
+
+        self.assertEqual(20, updater.succeeded)
+        self.assertEqual(0, updater.failed)
+        self.assertEqual(sorted(e['id'] for e in make_events(20)),
+                         sorted(self.requests))
+
+    def test_reports_in_the_order_added(self):
+        updater = self.create_updater(
+            workers=4, failing_ids=['event_3', 'event_7'])
+
+        # Act
+        for event in make_events(10):
+            updater.add(event, event)
+        updater.flush()
+
+        expected = [('failed' if i in [3, 7] else 'ok', 'event_' + str(i))
+                    for i in range(10)]
+        self.assertEqual(expected, self.reported)
+        self.assertEqual(8, updater.succeeded)
+        self.assertEqual(2, updater.failed)
+
+    def test_calls_on_updated_as_each_update_succeeds(self):
+        updater = self.create_updater(workers=2, failing_ids=['event_1'])
+
+        # Act
+        for event in make_events(4):
+            updater.add(event, event)
+        updater.executor.shutdown(wait=True)  # also waits for the callbacks of the futures
+
+        self.assertEqual(['event_0', 'event_2', 'event_3'], sorted(self.updated))
+        self.assertEqual([], self.reported)  # the results are reported in order, at flush()
+        updater.flush()
+        self.assertEqual(4, len(self.reported))
+
+    def test_close_waits_for_the_updates_in_flight(self):
+        updater = self.create_updater(workers=2, delay=0.2)
+        events = make_events(2)
+        for event in events:
+            updater.add(event, event)
+
+        # Act
+        updater.close()  # as when the run is stopped before flush()
+
+        self.assertEqual(['event_0', 'event_1'], sorted(self.updated))
+
+    def test_each_thread_has_its_own_http(self):
+        updater = self.create_updater(workers=3)
+
+        # Act
+        for event in make_events(30):
+            updater.add(event, event)
+        updater.flush()
+
+        self.assertLessEqual(len(self.https), 3)
+        for http in self.https:
+            self.assertEqual(1, len(http.threads))
+
+
+if __name__ == '__main__':
+    unittest.main()
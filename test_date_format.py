@@ -0,0 +1,63 @@
+import unittest
+
+from datetime import date, timedelta
+
+from babel.dates import format_date
+from parameterized import parameterized
+
+import date_format
+
+
+class TestDateFormat(unittest.TestCase):
+
+    @parameterized.expand([
+        ('en',),
+        ('en_GB',),
+        ('de',),
+        ('nl',),
+        ('fr',),
+        ('ja',),
+    ])
+    def test_same_as_babel(self, locale):
+        formatter = date_format.DateFormatter(locale)
+        day = date(2019, 1, 1)
+        while (day < date(2022, 1, 1)):
+            # Act
+            actual = formatter.format_date(day)
+
+            self.assertEqual(format_date(day, locale=locale), actual)
+            day += timedelta(days=1)
+
+    def test_memoized(self):
+        formatter = date_format.DateFormatter()
+
+        # Act
+        for i in range(3):
+            actual = formatter.format_date(date(2021, 4, 4))
+
+        self.assertEqual('Apr 4, 2021', actual)
+        self.assertEqual((2, 1), (formatter.format_date.cache_info().hits,
+                                  formatter.format_date.cache_info().misses))
+
+    @parameterized.expand([
+        ('en', 0, 'Monday'),
+        ('en', 6, 'Sunday'),
+        ('nl', 2, 'woensdag'),
+    ])
+    def test_day_name(self, locale, weekday, expected):
+        # Act
+        actual = date_format.DateFormatter(locale).day_name(weekday)
+
+        self.assertEqual(expected, actual)
+
+    @parameterized.expand([
+        ('xx_YY',),
+        ('not a locale',),
+    ])
+    def test_unknown_locale(self, locale):
+        with self.assertRaises(ValueError):
+            date_format.DateFormatter(locale)
+
+
+if __name__ == '__main__':
+    unittest.main()
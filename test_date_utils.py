@@ -47,6 +47,41 @@ class TestDateUtils(unittest.TestCase):
         self.check_target_year(this_year, this_month,
                                source_month, expected_target_year)
 
+    def test_derived_values_are_calculated_once_per_context(self):
+        today = CountingToday(2021, 1)
+        context = date_utils.DateContext(today, 12)
+
+        # Act
+        first = date_utils.source_year(context)
+        second = date_utils.source_year(context)
+        date_utils.target_year(context)
+
+        self.assertEqual(2020, first)
+        self.assertEqual(2020, second)
+        self.assertEqual(1, today.calls)
+
+    def test_derived_values_are_per_context(self):
+        today = todays.TodayMock(2021, 1)
+
+        # Act
+        december = date_utils.start_of_source_month(
+            date_utils.DateContext(today, 12))
+        january = date_utils.start_of_source_month(
+            date_utils.DateContext(today, 1))
+
+        self.assertEqual((2020, 12), (december.year, december.month))
+        self.assertEqual((2021, 1), (january.year, january.month))
+
+
+class CountingToday(todays.TodayMock):
+    def __init__(self, year, month):
+        super().__init__(year, month)
+        self.calls = 0
+
+    def this_year(self):
+        self.calls += 1
+        return super().this_year()
+
 
 if __name__ == '__main__':
     unittest.main()
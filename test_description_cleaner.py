@@ -1,9 +1,68 @@
+import random
 import unittest
 import description_cleaner
 
 NEW_LINE = "\r\n"
 
 
+# The cleaner as it was before it was optimized, which removed one level of duplicates per call
+def reference_fix_line(line):
+    parts = line.split(" ")
+
+    line_fixed = ""
+
+    prev_part = None
+    did_replace = False
+    for part in parts:
+        if (prev_part != None):
+            with_braces = "(" + prev_part + ")"
+            if (with_braces in part):
+                part = part.replace(with_braces, "")
+                line_fixed += part
+                prev_part = None
+                did_replace = True
+                continue
+            with_braces = "(mailto:" + prev_part + ")"
+            if (with_braces in part):
+                part = part.replace(with_braces, " ")
+                line_fixed += part
+                prev_part = None
+                did_replace = True
+                continue
+
+        if (len(line_fixed) > 0):
+            line_fixed += " "
+
+        line_fixed += part
+        prev_part = part
+
+    if (did_replace):
+        return line_fixed
+
+    return line
+
+
+def reference_clean_description(desc):
+    return "\n".join(map(reference_fix_line, desc.split("\n")))
+
+
+def random_description(rng):
+    words = ['http://a.nl', 'x@y.nl', 'a', '', '?', '(', ')', 'mailto:', '\n', '\r']
+    tokens = []
+    for i in range(rng.randint(0, 12)):
+        word = rng.choice(words)
+        kind = rng.random()
+        if (kind < 0.3):
+            tokens.append(word + ' (' + word + ')' + rng.choice(['', '?', 'x']))
+        elif (kind < 0.45):
+            tokens.append(word + ' (mailto:' + word + ')' + rng.choice(['', 'Blah']))
+        elif (kind < 0.55):
+            tokens.append(word + '(' + word + ')(' + word + ')')
+        else:
+            tokens.append(word)
+    return rng.choice([' ', '  ', '']).join(tokens)
+
+
 class TestDescriptionCleaner(unittest.TestCase):
 
     def test_empty_text(self):
@@ -66,6 +125,64 @@ class TestDescriptionCleaner(unittest.TestCase):
             "E-mail: info@crossfitninjas.nl (mailto:info@crossfitninjas.nl)Blah blah2")
         self.assertEqual("E-mail: info@crossfitninjas.nl Blah blah2", actual)
 
+    def test_chain_of_duplicates(self):
+        actual = description_cleaner.clean_description(
+            "http://one.nl (http://one.nl) (http://one.nl)(http://one.nl) (http://one.nl)?")
+        self.assertEqual("http://one.nl?", actual)
+
+    def test_chain_of_duplicates_then_text(self):
+        actual = description_cleaner.clean_description(
+            "see http://one.nl (http://one.nl) (http://one.nl) for details")
+        self.assertEqual("see http://one.nl for details", actual)
+
+    def test_chain_of_email_duplicates(self):
+        actual = description_cleaner.clean_description(
+            "E-mail: info@crossfitninjas.nl (mailto:info@crossfitninjas.nl) (mailto:info@crossfitninjas.nl)")
+        self.assertEqual("E-mail: info@crossfitninjas.nl ", actual)
+
+    def test_chain_of_email_duplicates_then_text(self):
+        actual = description_cleaner.clean_description(
+            "E-mail: info@crossfitninjas.nl (mailto:info@crossfitninjas.nl)(mailto:info@crossfitninjas.nl)Blah blah2")
+        self.assertEqual("E-mail: info@crossfitninjas.nl Blah blah2", actual)
+
+    def test_duplicate_joined_to_a_link(self):
+        # removing the first duplicate joins 'b' to '(a)', which is then also a duplicate
+        actual = description_cleaner.clean_description("a b (b)(a)")
+        self.assertEqual("ab", actual)
+
+    def test_duplicates_joined_to_links(self):
+        # each duplicate removed joins the links before it to the next duplicate
+        actual = description_cleaner.clean_description("see a b c (c)(b)(a)x for details")
+        self.assertEqual("see abcx for details", actual)
+
+    def test_is_clean_after_one_call(self):
+        rng = random.Random(17)
+        for i in range(20000):
+            desc = random_description(rng)
+
+            # Act
+            actual = description_cleaner.clean_description(desc)
+
+            self.assertEqual(actual, description_cleaner.clean_description(actual), repr(desc))
+
+    def test_same_as_repeated_reference_cleaning(self):
+        # Without chains of email duplicates, or of empty texts '()', one call is the same as cleaning until clean
+        rng = random.Random(16)
+        compared = 0
+        for i in range(20000):
+            desc = random_description(rng)
+            if ("mailto:" in desc or "()" in desc):
+                continue
+            expected = desc
+            while (reference_clean_description(expected) != expected):
+                expected = reference_clean_description(expected)
+
+            # Act
+            actual = description_cleaner.clean_description(desc)
+
+            self.assertEqual(expected, actual, repr(desc))
+            compared += 1
+        self.assertGreater(compared, 1000)
 
 if __name__ == '__main__':
     unittest.main()
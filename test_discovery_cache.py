@@ -0,0 +1,152 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from datetime import date, datetime
+
+from google.oauth2.credentials import Credentials
+
+import discovery_cache
+
+
+def bundled_document():
+    with open(discovery_cache.BUNDLED_PATH, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def document_with_revision(revision):
+    document = bundled_document()
+    document['revision'] = revision
+    return document
+
+
+class TestDiscoveryCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.cache_path = os.path.join(self.directory, 'sub', 'calendar.json')
+        self.fetches = 0
+
+    def fetch(self, document):
+        def fetch():
+            self.fetches += 1
+            if (isinstance(document, Exception)):
+                raise document
+            return document
+        return fetch
+
+    def test_bundled_document_is_valid(self):
+        self.assertTrue(discovery_cache.is_valid_document(bundled_document()))
+
+    def set_written(self, path, day):
+        timestamp = time.mktime(datetime(day.year, day.month, day.day, 12).timetuple())
+        os.utime(path, (timestamp, timestamp))
+
+    def test_recent_document_is_used_without_fetching(self):
+        today = discovery_cache.written_date(discovery_cache.BUNDLED_PATH)
+
+        # Act
+        document = discovery_cache.load_document(
+            self.cache_path, self.fetch(None), today)
+
+        self.assertEqual(0, self.fetches)
+        self.assertEqual('calendar', document['name'])
+
+    def test_old_document_is_refreshed_and_persisted(self):
+        fetched = document_with_revision('20300101')
+
+        # Act
+        document = discovery_cache.load_document(
+            self.cache_path, self.fetch(fetched), date(2030, 1, 5))
+
+        self.assertEqual(1, self.fetches)
+        self.assertEqual('20300101', document['revision'])
+        # the next run uses the persisted copy
+        self.set_written(self.cache_path, date(2030, 1, 5))
+        document = discovery_cache.load_document(
+            self.cache_path, self.fetch(None), date(2030, 1, 6))
+        self.assertEqual(1, self.fetches)
+        self.assertEqual('20300101', document['revision'])
+
+    def test_refreshed_document_of_the_same_revision_is_not_fetched_again(self):
+        fetched = bundled_document()
+        discovery_cache.load_document(self.cache_path, self.fetch(fetched), date(2030, 1, 5))
+        self.set_written(self.cache_path, date(2030, 1, 5))
+
+        # Act
+        document = discovery_cache.load_document(
+            self.cache_path, self.fetch(None), date(2030, 2, 1))
+
+        self.assertEqual(1, self.fetches)
+        self.assertEqual(fetched['revision'], document['revision'])
+
+    def test_newer_revision_is_used_even_if_written_earlier(self):
+        os.makedirs(os.path.dirname(self.cache_path))
+        discovery_cache.write_document(self.cache_path, document_with_revision('20991231'))
+        bundled_written = discovery_cache.written_date(discovery_cache.BUNDLED_PATH)
+        self.set_written(self.cache_path, date.fromordinal(bundled_written.toordinal() - 10))
+
+        # Act
+        document = discovery_cache.load_document(
+            self.cache_path, self.fetch(None), bundled_written)
+
+        self.assertEqual(0, self.fetches)
+        self.assertEqual('20991231', document['revision'])
+
+    def test_offline_uses_old_document(self):
+        # Act
+        document = discovery_cache.load_document(
+            self.cache_path, self.fetch(OSError('offline')), date(2030, 1, 5))
+
+        self.assertEqual(1, self.fetches)
+        self.assertEqual(bundled_document()['revision'], document['revision'])
+        self.assertFalse(os.path.exists(self.cache_path))
+
+    def test_invalid_fetched_document_is_not_persisted(self):
+        # Act
+        document = discovery_cache.load_document(
+            self.cache_path, self.fetch({'name': 'other'}), date(2030, 1, 5))
+
+        self.assertEqual('calendar', document['name'])
+        self.assertFalse(os.path.exists(self.cache_path))
+
+    def test_invalid_persisted_document_is_ignored(self):
+        os.makedirs(os.path.dirname(self.cache_path))
+        with open(self.cache_path, 'w') as file:
+            file.write('{ not json')
+
+        # Act
+        document = discovery_cache.read_document(self.cache_path)
+
+        self.assertIsNone(document)
+
+    def test_service_is_built_once(self):
+        creds = Credentials(token='the_token')
+
+        # Act
+        service_1 = discovery_cache.build_service(creds, self.cache_path)
+        service_2 = discovery_cache.build_service(creds, self.cache_path)
+
+        self.assertIs(service_1, service_2)
+        self.assertTrue(hasattr(service_1.events(), 'patch'))
+
+    def test_service_per_name(self):
+        creds = Credentials(token='the_token')
+
+        # Act
+        service_1 = discovery_cache.build_service(
+            creds, self.cache_path, 'calendar_1')
+        service_2 = discovery_cache.build_service(
+            creds, self.cache_path, 'calendar_2')
+
+        self.assertIsNot(service_1, service_2)
+        self.assertIs(service_1, discovery_cache.build_service(
+            creds, self.cache_path, 'calendar_1'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+
+from datetime import date
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+import event_cache
+
+
+def all_day_event(event_id, start_date, summary='event'):
+    return {'id': event_id, 'summary': summary, 'start': {'date': start_date}, 'end': {'date': start_date}}
+
+
+class FakeCalendar:
+    """
+    Serves pages for events().list(). A full sync returns pages_full, an incremental sync returns
+    the changes registered for that sync token (or 410 if the token is in expired_tokens).
+    """
+
+    def __init__(self, pages_full):
+        self.pages_full = pages_full
+        self.changes = {}
+        self.expired_tokens = []
+        self.list_calls = []
+
+    def iterate_pages(self, **list_args):
+        self.list_calls.append(list_args)
+        sync_token = list_args.get('syncToken')
+        if (sync_token is None):
+            yield from self.pages_full
+            return
+        if (sync_token in self.expired_tokens):
+            raise HttpError(httplib2.Response({'status': 410}), b'Gone')
+        yield from self.changes[sync_token]
+
+
+class TestEventCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = event_cache.EventCache(':memory:')
+        self.addCleanup(self.cache.close)
+
+    def events_in_march(self):
+        return [e['id'] for e in self.cache.iterate_events('primary', date(2021, 3, 1), date(2021, 4, 1))]
+
+    def test_full_sync_then_read_range(self):
+        calendar = FakeCalendar([
+            {'items': [all_day_event('a', '2021-03-02'),
+                       all_day_event('b', '2021-02-28')],
+             'nextPageToken': 'p2'},
+            {'items': [all_day_event('c', '2021-03-31'),
+                       {'id': 'd', 'start': {'dateTime': '2021-03-01T10:00:00Z'}}],
+             'nextSyncToken': 'token_1'},
+        ])
+
+        # Act
+        changed = self.cache.sync(calendar.iterate_pages)
+
+        self.assertEqual(4, changed)
+        self.assertEqual(['d', 'a', 'c'], self.events_in_march())
+        self.assertEqual('token_1', self.cache.sync_token('primary'))
+        self.assertNotIn('timeMin', calendar.list_calls[0])
+
+    def test_incremental_sync_fetches_only_changes(self):
+        calendar = FakeCalendar([
+            {'items': [all_day_event('a', '2021-03-02'), all_day_event('b', '2021-03-03')],
+             'nextSyncToken': 'token_1'},
+        ])
+        calendar.changes['token_1'] = [
+            {'items': [all_day_event('a', '2021-04-02'),  # moved to April
+                       {'id': 'b', 'status': 'cancelled'},
+                       all_day_event('c', '2021-03-10')],
+             'nextSyncToken': 'token_2'},
+        ]
+        self.cache.sync(calendar.iterate_pages)
+
+        # Act
+        changed = self.cache.sync(calendar.iterate_pages)
+
+        self.assertEqual(3, changed)
+        self.assertEqual(['c'], self.events_in_march())
+        self.assertEqual('token_2', self.cache.sync_token('primary'))
+        self.assertEqual('token_1', calendar.list_calls[1]['syncToken'])
+
+    def test_expired_sync_token_does_full_sync(self):
+        calendar = FakeCalendar([
+            {'items': [all_day_event('a', '2021-03-02')], 'nextSyncToken': 'token_1'},
+        ])
+        self.cache.sync(calendar.iterate_pages)
+        calendar.expired_tokens.append('token_1')
+        calendar.pages_full = [
+            {'items': [all_day_event('b', '2021-03-05')], 'nextSyncToken': 'token_9'},
+        ]
+
+        # Act
+        self.cache.sync(calendar.iterate_pages)
+
+        self.assertEqual(['b'], self.events_in_march())
+        self.assertEqual('token_9', self.cache.sync_token('primary'))
+
+    def test_calendars_are_kept_apart(self):
+        calendar = FakeCalendar([
+            {'items': [all_day_event('a', '2021-03-02')], 'nextSyncToken': 'token_1'},
+        ])
+
+        # Act
+        self.cache.sync(calendar.iterate_pages, 'other')
+
+        self.assertEqual([], self.events_in_march())
+        self.assertIsNone(self.cache.sync_token('primary'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+
+import event_fetcher
+import rate_limiter
+from test_rate_limiter import FakeClock
+
+
+class FakeRequest:
+    def __init__(self, result):
+        self.result = result
+
+    def execute(self, http=None):
+        return self.result
+
+
+class FakeEvents:
+    def __init__(self, pages, list_calls):
+        self.pages = pages
+        self.list_calls = list_calls
+
+    def list(self, **kwargs):
+        self.list_calls.append(kwargs)
+        return FakeRequest(self.pages[kwargs['pageToken']])
+
+
+class FakeService:
+    """Serves pages keyed by page token (None for the first page)."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.list_calls = []
+
+    def events(self):
+        return FakeEvents(self.pages, self.list_calls)
+
+
+def make_pages(page_sizes):
+    pages = {}
+    event_index = 0
+    token = None
+    for page_index, size in enumerate(page_sizes):
+        items = [{'id': str(event_index + i)} for i in range(size)]
+        event_index += size
+        page = {'items': items}
+        if (page_index < len(page_sizes) - 1):
+            page['nextPageToken'] = 'page_' + str(page_index + 1)
+        pages[token] = page
+        token = page.get('nextPageToken')
+    return pages
+
+
+class TestEventFetcher(unittest.TestCase):
+
+    def setUp(self):
+        self.limiter = rate_limiter.RateLimiter(clock=FakeClock())
+
+    def test_follows_page_tokens(self):
+        service = FakeService(make_pages([3, 3, 1]))
+
+        # Act
+        events = list(event_fetcher.iterate_events(
+            service, self.limiter, calendarId='primary'))
+
+        self.assertEqual([str(i) for i in range(7)],
+                         [e['id'] for e in events])
+        self.assertEqual([None, 'page_1', 'page_2'],
+                         [c['pageToken'] for c in service.list_calls])
+        self.assertTrue(
+            all(c['calendarId'] == 'primary' for c in service.list_calls))
+        self.assertEqual(3, self.limiter.calls)
+
+    def test_page_without_items(self):
+        service = FakeService({None: {}})
+
+        # Act
+        events = list(event_fetcher.iterate_events(service, self.limiter))
+
+        self.assertEqual([], events)
+
+    def test_fetches_next_page_only_when_needed(self):
+        service = FakeService(make_pages([2, 2]))
+
+        # Act
+        events = event_fetcher.iterate_events(service, self.limiter)
+        next(events)
+        next(events)
+
+        self.assertEqual(1, len(service.list_calls))
+        next(events)
+        self.assertEqual(2, len(service.list_calls))
+
+    def test_counting_iterator(self):
+        counting = event_fetcher.CountingIterator(['a', 'b', 'c'])
+
+        # Act
+        filtered = list(filter(lambda x: x != 'b', counting))
+
+        self.assertEqual(['a', 'c'], filtered)
+        self.assertEqual(3, counting.count)
+
+
+if __name__ == '__main__':
+    unittest.main()
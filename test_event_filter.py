@@ -0,0 +1,100 @@
+from datetime import date
+from parameterized import parameterized
+
+import unittest
+
+import date_utils
+import event_filter
+import rule_file
+import todays
+
+
+def all_day_event(summary, start_date='2021-03-10', end_date='2021-03-11', **fields):
+    event = {'id': '1', 'summary': summary,
+             'start': {'date': start_date}, 'end': {'date': end_date}}
+    event.update(fields)
+    return event
+
+
+class TestEventFilter(unittest.TestCase):
+
+    def create_filter(self, blacklist=[], whitelist=[], skip_moved_recurring=False,
+                      blacklist_rules=None, whitelist_rules=None):
+        self.date_context = date_utils.DateContext(
+            todays.TodayMock(2021, 4), 3)
+        return event_filter.EventFilter(blacklist, whitelist, skip_moved_recurring,
+                                        lambda date_context: date(2021, 3, 20),
+                                        blacklist_rules, whitelist_rules)
+
+    @parameterized.expand([
+        ('plain', all_day_event('Call bob'), True),
+        ('multi-day', all_day_event('Trip', end_date='2021-03-14'), False),
+        ('timed', {'id': '1', 'summary': 'x', 'start': {'dateTime': '2021-03-10T10:00:00Z'},
+                   'end': {'dateTime': '2021-03-10T11:00:00Z'}}, False),
+        ('recurring', all_day_event('Gym', recurrence=['RRULE:FREQ=WEEKLY']), False),
+        ('moved recurring', all_day_event('Gym', recurringEventId='r1'), False),
+        ('other month', all_day_event('x', '2021-04-02', '2021-04-03'), False),
+        ('after max date', all_day_event('x', '2021-03-20', '2021-03-21'), False),
+        ('no start', {'id': '1', 'summary': 'x'}, False),
+    ])
+    def test_built_in_rules(self, name, event, expected):
+        events_filter = self.create_filter()
+
+        # Act
+        actual = events_filter.passes(event, self.date_context)
+
+        self.assertEqual(expected, actual)
+
+    @parameterized.expand([
+        ('contains', ['done'], 'Report done', False),
+        ('starts with', ['^done'], 'Done report', False),
+        ('starts with - not at start', ['^done'], 'Report done', True),
+        ('exact', ['=done'], 'Done', False),
+        ('exact - not exact', ['=done'], 'Done report', True),
+        ('no match', ['cancelled'], 'Report', True),
+    ])
+    def test_blacklist(self, name, blacklist, summary, expected):
+        events_filter = self.create_filter(blacklist=blacklist)
+
+        # Act
+        actual = events_filter.passes(
+            all_day_event(summary), self.date_context)
+
+        self.assertEqual(expected, actual)
+
+    @parameterized.expand([
+        ('match', ['urgent', 'important'], 'Important call', True),
+        ('no match', ['urgent', 'important'], 'Call', False),
+    ])
+    def test_whitelist(self, name, whitelist, summary, expected):
+        events_filter = self.create_filter(whitelist=whitelist)
+
+        # Act
+        actual = events_filter.passes(
+            all_day_event(summary), self.date_context)
+
+        self.assertEqual(expected, actual)
+
+    @parameterized.expand([
+        ('blacklist file', [], 'location:=home', [], '', 'Call', False),
+        ('blacklist file - no match', [], 'location:=office', [], '', 'Call', True),
+        ('both blacklists', ['call'], 'location:=office', [], '', 'Call', False),
+        ('whitelist file', [], '', [], 'location:=home', 'Call', True),
+        ('whitelist file - no match', [], '', [], 'location:=office', 'Call', False),
+        ('either whitelist', [], '', ['call'], 'location:=office', 'Call', True),
+        ('neither whitelist', [], '', ['meet'], 'location:=office', 'Call', False),
+    ])
+    def test_rule_files(self, name, blacklist, blacklist_rules, whitelist, whitelist_rules, summary, expected):
+        events_filter = self.create_filter(blacklist=blacklist, whitelist=whitelist,
+                                           blacklist_rules=rule_file.parse_rules(blacklist_rules),
+                                           whitelist_rules=rule_file.parse_rules(whitelist_rules))
+
+        # Act
+        actual = events_filter.passes(
+            all_day_event(summary, location='Home'), self.date_context)
+
+        self.assertEqual(expected, actual)
+
+
+if __name__ == '__main__':
+    unittest.main()
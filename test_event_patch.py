@@ -0,0 +1,78 @@
+import unittest
+
+import httplib2
+from googleapiclient.discovery import build_from_document
+from googleapiclient.errors import HttpError
+
+import event_patch
+from test_batch_updater import DISCOVERY
+
+
+class TestEventPatch(unittest.TestCase):
+
+    def test_compute_patch_only_changed_fields(self):
+        original = {'id': '1', 'summary': 'a', 'description': 'long text',
+                    'start': {'date': '2021-01-05'}, 'end': {'date': '2021-01-06'}}
+
+        # Act
+        patch = event_patch.compute_patch(original, {
+            'start': {'date': '2021-02-05'},
+            'end': {'date': '2021-01-06'},
+            'description': 'long text'})
+
+        self.assertEqual({'start': {'date': '2021-02-05'}}, patch)
+
+    def test_compute_patch_no_change(self):
+        original = {'id': '1', 'description': 'text'}
+
+        # Act
+        patch = event_patch.compute_patch(original, {'description': 'text'})
+
+        self.assertEqual({}, patch)
+
+    def test_compute_patch_new_field(self):
+        # Act
+        patch = event_patch.compute_patch({'id': '1'}, {'description': 'x'})
+
+        self.assertEqual({'description': 'x'}, patch)
+
+    def test_build_patch_request(self):
+        service = build_from_document(DISCOVERY, http=httplib2.Http())
+
+        # Act
+        request = event_patch.build_patch_request(
+            service, {'id': 'event_1', 'etag': '"abc"'}, {'description': 'x'})
+
+        self.assertEqual('PATCH', request.method)
+        self.assertTrue(request.uri.startswith(
+            'https://www.googleapis.com/calendar/v3/calendars/primary/events/event_1'))
+        self.assertEqual('{"description": "x"}', request.body)
+        self.assertEqual('"abc"', request.headers['If-Match'])
+
+    def test_build_patch_request_with_calendar_id(self):
+        service = build_from_document(DISCOVERY, http=httplib2.Http())
+
+        # Act
+        request = event_patch.build_patch_request(
+            service, {'id': 'event_1'}, {'description': 'x'}, calendar_id='team@group.calendar.google.com')
+
+        self.assertIn('/calendars/team%40group.calendar.google.com/events/event_1', request.uri)
+
+    def test_build_patch_request_without_etag(self):
+        service = build_from_document(DISCOVERY, http=httplib2.Http())
+
+        # Act
+        request = event_patch.build_patch_request(
+            service, {'id': 'event_1'}, {'description': 'x'})
+
+        self.assertNotIn('If-Match', request.headers)
+
+    def test_is_conflict(self):
+        self.assertTrue(event_patch.is_conflict(
+            HttpError(httplib2.Response({'status': 412}), b'')))
+        self.assertFalse(event_patch.is_conflict(
+            HttpError(httplib2.Response({'status': 404}), b'')))
+
+
+if __name__ == '__main__':
+    unittest.main()
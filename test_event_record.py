@@ -0,0 +1,91 @@
+from datetime import date
+from parameterized import parameterized
+
+import unittest
+
+import event_record
+
+
+def all_day_event(summary, start_date='2021-03-10', end_date='2021-03-11', **fields):
+    event = {'id': '1', 'summary': summary,
+             'start': {'date': start_date}, 'end': {'date': end_date}}
+    event.update(fields)
+    return event
+
+
+class TestEventRecord(unittest.TestCase):
+
+    def test_all_day_event(self):
+        event = all_day_event('Call Bob')
+
+        # Act
+        record = event_record.normalize(event)
+
+        self.assertIs(event, record.event)
+        self.assertEqual('Call Bob', record.summary)
+        self.assertEqual('call bob', record.lowered_summary)
+        self.assertEqual(date(2021, 3, 10), record.start_date)
+        self.assertEqual(date(2021, 3, 11), record.end_date)
+        self.assertTrue(record.has_start)
+        self.assertTrue(record.is_all_day)
+        self.assertFalse(record.is_timed)
+        self.assertFalse(record.is_multi_day)
+        self.assertFalse(record.is_recurring)
+        self.assertFalse(record.is_moved_recurring)
+        self.assertFalse(record.is_pinned_to_day)
+
+    def test_timed_event(self):
+        event = {'id': '1', 'summary': 'x', 'start': {'dateTime': '2021-03-10T10:00:00Z'},
+                 'end': {'dateTime': '2021-03-10T11:00:00Z'}}
+
+        # Act
+        record = event_record.normalize(event)
+
+        self.assertTrue(record.is_timed)
+        self.assertFalse(record.is_all_day)
+        self.assertIsNone(record.start_date)
+        self.assertFalse(record.is_multi_day)
+
+    def test_no_start_or_summary(self):
+        record = event_record.normalize({'id': '1'})
+
+        self.assertFalse(record.has_start)
+        self.assertFalse(record.is_all_day)
+        self.assertEqual('', record.summary)
+
+    @parameterized.expand([
+        ('1 day', '2021-03-11', False),
+        ('2 days', '2021-03-12', True),
+        ('over the end of the month', '2021-04-02', True),
+    ])
+    def test_is_multi_day(self, name, end_date, expected):
+        record = event_record.normalize(all_day_event('x', end_date=end_date))
+
+        self.assertEqual(expected, record.is_multi_day)
+
+    @parameterized.expand([
+        ('[p]', '[p] Gym', True),
+        ('[pinned]', '[pinned] Gym', True),
+        ('not at start', 'Gym [p]', False),
+        ('case sensitive', '[P] Gym', False),
+    ])
+    def test_is_pinned_to_day(self, name, summary, expected):
+        record = event_record.normalize(all_day_event(summary))
+
+        self.assertEqual(expected, record.is_pinned_to_day)
+
+    def test_recurring_flags(self):
+        record = event_record.normalize(all_day_event('x', recurrence=['RRULE:FREQ=WEEKLY'],
+                                                      recurringEventId='r1'))
+
+        self.assertTrue(record.is_recurring)
+        self.assertTrue(record.is_moved_recurring)
+
+    def test_has_no_instance_dict(self):
+        record = event_record.normalize(all_day_event('x'))
+
+        self.assertFalse(hasattr(record, '__dict__'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import io
+import json
+import unittest
+
+from datetime import date
+
+from parameterized import parameterized
+
+import event_record
+import event_reporter
+
+EVENT = {'id': 'event_1', 'summary': 'call', 'description': 'http://one.nl (http://one.nl)',
+         'start': {'date': '2021-03-04'}, 'end': {'date': '2021-03-05'}}
+
+
+def format_date(day):
+    return day.strftime('%d/%m/%Y')
+
+
+class TestEventReporter(unittest.TestCase):
+
+    def create_writer(self, max_buffered_chars=event_reporter.MAX_BUFFERED_CHARS):
+        self.output = io.StringIO()
+        return event_reporter.BufferedWriter(lambda: self.output, max_buffered_chars)
+
+    def test_buffered_writer_writes_when_flushed(self):
+        writer = self.create_writer()
+        writer.write_line('one')
+        writer.write_line('two')
+        self.assertEqual('', self.output.getvalue())
+
+        # Act
+        writer.flush()
+
+        self.assertEqual('one\ntwo\n', self.output.getvalue())
+
+    def test_buffered_writer_writes_when_full(self):
+        writer = self.create_writer(max_buffered_chars=8)
+
+        # Act
+        writer.write_line('one')
+        writer.write_line('two')
+        writer.write_line('three')
+
+        self.assertEqual('one\ntwo\n', self.output.getvalue())
+
+    def test_text_move(self):
+        reporter = event_reporter.TextReporter(
+            'primary', format_date, self.create_writer())
+        record = event_record.normalize(EVENT)
+
+        # Act
+        reporter.event(record, record.summary)
+        reporter.moved(record, date(2021, 4, 1), 'Thursday')
+        reporter.flush()
+
+        self.assertEqual('04/03/2021 call\n--> 01/04/2021 [pinned to Thursday]\n',
+                         self.output.getvalue())
+
+    def test_text_clean(self):
+        reporter = event_reporter.TextReporter(
+            'primary', format_date, self.create_writer())
+        record = event_record.normalize(EVENT)
+
+        # Act
+        reporter.cleaned(record, 'http://one.nl')
+        reporter.flush()
+
+        self.assertEqual(">>-- FROM --<<\nhttp://one.nl (http://one.nl)\n>>--  TO  --<<\nhttp://one.nl\n"
+                         ">>-- ---- --<<\n\n", self.output.getvalue())
+
+    @parameterized.expand([
+        (True, "!! Skipped event '': it was changed elsewhere since it was fetched\n"),
+        (False, "!! Failed to update event '': 500\n"),
+    ])
+    def test_text_update_failed_for_an_event_without_a_title(self, is_conflict, expected):
+        reporter = event_reporter.TextReporter(
+            'primary', format_date, self.create_writer())
+        event = {key: value for (key, value) in EVENT.items() if key != 'summary'}
+
+        # Act
+        reporter.update_failed(event, Exception('500'), is_conflict)
+        reporter.flush()
+
+        self.assertEqual(expected, self.output.getvalue())
+
+    def test_jsonl_records(self):
+        messages = io.StringIO()
+        reporter = event_reporter.JsonLinesReporter(
+            'primary', self.create_writer(), lambda: messages)
+        record = event_record.normalize(EVENT)
+
+        # Act
+        reporter.message('Getting events')
+        reporter.event(record, record.summary)
+        reporter.moved(record, date(2021, 4, 4), None)
+        reporter.cleaned(record, 'http://one.nl')
+        reporter.unchanged(record)
+        reporter.update_failed(EVENT, Exception('412'), is_conflict=True)
+        reporter.flush()
+
+        self.assertEqual('Getting events\n', messages.getvalue())
+        records = [json.loads(line)
+                   for line in self.output.getvalue().splitlines()]
+        self.assertEqual([
+            {'calendar': 'primary', 'id': 'event_1', 'date': '2021-03-04',
+             'action': 'move', 'target': '2021-04-04'},
+            {'calendar': 'primary', 'id': 'event_1', 'date': '2021-03-04',
+             'action': 'clean', 'diff_size': 16},
+            {'calendar': 'primary', 'id': 'event_1',
+             'date': '2021-03-04', 'action': 'none'},
+            {'calendar': 'primary', 'id': 'event_1', 'action': 'conflict', 'error': '412'}], records)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import event_patch
+import fixture_service
+
+
+def make_events():
+    return [
+        {'id': 'a', 'etag': '"1"', 'summary': 'a', 'start': {'date': '2021-02-28'}},
+        {'id': 'b', 'etag': '"2"', 'summary': 'b', 'start': {'date': '2021-03-01'}},
+        {'id': 'c', 'etag': '"3"', 'summary': 'c',
+            'start': {'dateTime': '2021-03-05T10:00:00Z'}},
+        {'id': 'd', 'etag': '"4"', 'summary': 'd', 'start': {'date': '2021-04-01'}},
+    ]
+
+
+class TestFixtureService(unittest.TestCase):
+
+    def test_list_by_range_with_pages(self):
+        service = fixture_service.FixtureService(make_events())
+
+        # Act
+        page_1 = service.events().list(maxResults=1, timeMin='2021-03-01T00:00:00Z',
+                                       timeMax='2021-04-01T00:00:00Z').execute()
+        page_2 = service.events().list(maxResults=1, timeMin='2021-03-01T00:00:00Z',
+                                       timeMax='2021-04-01T00:00:00Z', pageToken=page_1['nextPageToken']).execute()
+
+        self.assertEqual(['b'], [e['id'] for e in page_1['items']])
+        self.assertEqual(['c'], [e['id'] for e in page_2['items']])
+        self.assertNotIn('nextPageToken', page_2)
+
+    def test_full_list_has_sync_token(self):
+        service = fixture_service.FixtureService(make_events())
+
+        # Act
+        page = service.events().list(maxResults=10).execute()
+
+        self.assertEqual(4, len(page['items']))
+        self.assertEqual(fixture_service.FIXTURE_SYNC_TOKEN,
+                         page['nextSyncToken'])
+
+    def test_patch_is_recorded_and_checks_etag(self):
+        service = fixture_service.FixtureService(make_events())
+        event = service.events().list(maxResults=10).execute()['items'][1]
+
+        # Act
+        event_patch.build_patch_request(
+            service, event, {'summary': 'new'}).execute()
+
+        self.assertEqual([('b', {'summary': 'new'})], service.writes)
+        self.assertEqual('b', event['summary'])  # the caller's copy is unchanged
+        with self.assertRaises(fixture_service.FixtureHttpError) as context:
+            event_patch.build_patch_request(
+                service, event, {'summary': 'newer'}).execute()
+        self.assertTrue(event_patch.is_conflict(context.exception))
+
+    def test_batch(self):
+        service = fixture_service.FixtureService(make_events())
+        results = []
+        batch = service.new_batch_http_request(
+            callback=lambda request_id, response, exception: results.append((request_id, exception is None)))
+
+        # Act
+        batch.add(service.events().patch(calendarId='primary',
+                  eventId='a', body={}), request_id='0')
+        batch.add(service.events().patch(calendarId='primary',
+                  eventId='missing', body={}), request_id='1')
+        batch.execute()
+
+        self.assertEqual([('0', True), ('1', False)], results)
+
+    def test_save_and_load(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'fixture.jsonl')
+
+        # Act
+        fixture_service.save_events(path, make_events())
+        events = fixture_service.load_events(path)
+
+        self.assertEqual(make_events(), events)
+
+
+if __name__ == '__main__':
+    unittest.main()
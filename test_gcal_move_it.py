@@ -0,0 +1,265 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import mock
+
+from parameterized import parameterized
+
+import fixture_service
+import gcal_move_it
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Slow to import, so only imported on the code paths that need them
+HEAVY_MODULES = ['babel.dates', 'googleapiclient', 'googleapiclient.discovery', 'google_auth_oauthlib.flow',
+                 'google.auth.transport.requests', 'google_auth_httplib2', 'httplib2',
+                 'asyncio', 'multiprocessing']
+GOOGLE_MODULES = ['googleapiclient', 'googleapiclient.errors', 'google_auth_httplib2', 'httplib2']
+
+
+def imported_modules(args):
+    """
+    Runs python -X importtime with the args, and returns the modules that were imported
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    modules = set()
+    for line in result.stderr.splitlines():
+        if (line.startswith('import time:') and line.count('|') == 2):
+            modules.add(line.rsplit('|', 1)[1].strip())
+    return modules
+
+
+def write_fixture(directory, events):
+    path = os.path.join(directory, 'events.jsonl')
+    with open(path, 'w', encoding='utf-8') as file:
+        for event in events:
+            file.write(json.dumps(event) + '\n')
+    return path
+
+
+def all_day_event(event_id, day, summary, description=None):
+    event = {'id': event_id, 'summary': summary,
+             'start': {'date': day}, 'end': {'date': day[:-2] + '%02d' % (int(day[-2:]) + 1)}}
+    if (description is not None):
+        event['description'] = description
+    return event
+
+
+class TestGcalMoveIt(unittest.TestCase):
+
+    @parameterized.expand([
+        (['-c', 'import gcal_move_it'],),
+        (['gcal_move_it.py', '--help'],),
+        (['gcal_move_it.py', 'move'],),
+    ])
+    def test_startup_does_not_import_heavy_modules(self, args):
+        # Act
+        modules = imported_modules(args)
+
+        self.assertIn('optparse', modules)
+        self.assertEqual([], [module for module in HEAVY_MODULES if module in modules])
+
+    def test_run_from_fixture_does_not_import_google_modules(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = write_fixture(directory, [all_day_event('1', '2021-03-04', 'dentist'),
+                                             all_day_event('2', '2021-03-20', 'gym')])
+
+            # Act
+            modules = imported_modules(['gcal_move_it.py', 'move', '2021-03..2021-03', '--source', path])
+
+        # babel is imported to print the dates, but the Google client libraries are not needed offline
+        self.assertIn('fixture_service', modules)
+        self.assertEqual([], [module for module in GOOGLE_MODULES if module in modules])
+
+    def run_main(self, argv):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            gcal_move_it.main(argv)
+        return output.getvalue()
+
+    def test_main_move_from_fixture(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = write_fixture(directory, [all_day_event('1', '2021-03-04', 'dentist'),
+                                             all_day_event('2', '2021-03-20', 'gym')])
+
+            # Act
+            output = self.run_main(['move', '2021-03..2021-03', '--source', path])
+
+        self.assertIn('Processing total of 2 events filtered down to 2...', output)
+        self.assertIn('--> Apr 4, 2021', output)
+        self.assertIn('(fixture) 2 updates were recorded', output)
+
+    def test_main_move_with_locale(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = write_fixture(directory, [all_day_event('1', '2021-03-04', '[p] dentist')])
+
+            # Act
+            output = self.run_main(['move', '2021-03..2021-03', '--source', path, '-d', '--locale', 'nl'])
+
+        self.assertIn('4 mrt. 2021 [p] dentist', output)
+        self.assertIn('--> 1 apr. 2021 [pinned to donderdag]', output)
+
+    def test_main_clean_dry_run_from_fixture(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = write_fixture(directory, [all_day_event('1', '2021-03-04', 'call',
+                                                           'http://one.nl (http://one.nl)')])
+
+            # Act
+            output = self.run_main(['clean', '2021-03..2021-03', '--source', path, '-d'])
+
+        self.assertIn("1 events have a 'dirty' description", output)
+        self.assertIn('(dry run) No events were modified', output)
+
+    def test_main_clean_in_processes_creates_one_pool(self):
+        import parallel_cleaner
+        pools = []
+
+        def create_pool(processes):
+            pools.append(ThreadPoolExecutor(max_workers=processes))
+            return pools[-1]
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = write_fixture(directory, [all_day_event('1', '2021-03-04', 'call', 'http://one.nl (http://one.nl)'),
+                                             all_day_event('2', '2021-04-05', 'call', 'http://two.nl (http://two.nl)')])
+
+            # Act
+            with mock.patch.object(parallel_cleaner, 'create_pool', create_pool):
+                output = self.run_main(['clean', '2021-03..2021-04', '--source', path, '-d', '-p', '2'])
+
+        self.assertIn("2 events have a 'dirty' description", output)
+        self.assertEqual(1, len(pools))
+        self.assertTrue(pools[0]._shutdown)
+
+    def test_main_move_jsonl(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = write_fixture(directory, [all_day_event('1', '2021-03-04', 'dentist'),
+                                             all_day_event('2', '2021-03-20', 'gym')])
+
+            # Act
+            output = self.run_main(['move', '2021-03..2021-03', '--source', path, '-d', '--output', 'jsonl'])
+
+        self.assertEqual([{'calendar': 'primary', 'id': '1', 'date': '2021-03-04', 'action': 'move', 'target': '2021-04-04'},
+                          {'calendar': 'primary', 'id': '2', 'date': '2021-03-20', 'action': 'move', 'target': '2021-04-20'}],
+                         [json.loads(line) for line in output.splitlines()])
+
+    def test_main_plan_out_and_apply(self):
+        events = [all_day_event('1', '2021-03-04', 'dentist'),
+                  all_day_event('2', '2021-03-20', 'gym')]
+        for (i, event) in enumerate(events):
+            event['etag'] = f'"{i}"'
+        with tempfile.TemporaryDirectory() as directory:
+            path = write_fixture(directory, events)
+            plan_path = os.path.join(directory, 'plan.json')
+            plan_output = self.run_main(['move', '2021-03..2021-03', '--source', path, '--plan-out', plan_path])
+            # the event was edited after the plan was made
+            events[1]['etag'] = '"edited"'
+            write_fixture(directory, events)
+
+            # Act
+            output = self.run_main(['apply', plan_path, '--source', path])
+
+        self.assertIn('(fixture) 0 updates were recorded', plan_output)
+        self.assertIn("Wrote the plan of 2 moves", plan_output)
+        self.assertIn('--> Apr 4, 2021', output)
+        self.assertIn("!! Skipped event 'gym': it was changed elsewhere since it was fetched", output)
+        self.assertIn('(fixture) 1 updates were recorded', output)
+
+    def test_main_resume(self):
+        events = [all_day_event('1', '2021-03-04', 'dentist'),
+                  all_day_event('2', '2021-03-20', 'gym')]
+        with tempfile.TemporaryDirectory() as directory:
+            path = write_fixture(directory, events)
+            journal_path = os.path.join(directory, 'journal.jsonl')
+            # the first run stopped after moving one event
+            with open(journal_path, 'w', encoding='utf-8') as file:
+                file.write('{"calendar":"primary","command":"move","id":"1"}\n')
+
+            # Act
+            output = self.run_main(['move', '2021-03..2021-03', '--source', path,
+                                    '--journal', journal_path, '--resume'])
+
+            with open(journal_path, 'r', encoding='utf-8') as file:
+                journal_lines = file.read().splitlines()
+
+        self.assertIn('(resume) 1 of these events were already updated, so are skipped', output)
+        self.assertNotIn('--> Apr 4, 2021', output)
+        self.assertIn('(fixture) 1 updates were recorded', output)
+        self.assertEqual(2, len(journal_lines))
+
+    def test_main_interrupted_with_updates_in_flight(self):
+        events = [all_day_event('1', '2021-03-04', 'dentist'),
+                  all_day_event('2', '2021-03-20', 'gym')]
+        original_patch_event = fixture_service.FixtureService.patch_event
+        original_process_events_move = gcal_move_it.process_events_move
+
+        def slow_patch_event(service, *args):
+            time.sleep(0.2)
+            return original_patch_event(service, *args)
+
+        def interrupted_process_events_move(*args):
+            original_process_events_move(*args)
+            raise KeyboardInterrupt()  # before flush(), while the updates are still in flight
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = write_fixture(directory, events)
+            journal_path = os.path.join(directory, 'journal.jsonl')
+
+            # Act
+            with mock.patch.object(fixture_service.FixtureService, 'patch_event', slow_patch_event), \
+                    mock.patch.object(gcal_move_it, 'process_events_move', interrupted_process_events_move), \
+                    self.assertRaises(KeyboardInterrupt):
+                self.run_main(['move', '2021-03..2021-03', '--source', path, '--concurrency', '2',
+                               '--journal', journal_path])
+
+            with open(journal_path, 'r', encoding='utf-8') as file:
+                journal_ids = sorted(json.loads(line)['id'] for line in file)
+
+        self.assertEqual(['1', '2'], journal_ids)
+
+    @parameterized.expand([
+        ('from without to', ['move', '2021-03', '--from', '2021-03-20']),
+        ('to without from', ['move', '2021-03', '--to', '2021-03-20']),
+        ('months and dates', ['move', '2021-03', '--from', '2021-03-01', '--to', '2021-03-20']),
+        ('from after to', ['move', '--from', '2021-03-20', '--to', '2021-03-02']),
+        ('apply with dates', ['apply', '--from', '2021-03-01', '--to', '2021-03-20']),
+        ('month not a number', ['move', '3-x']),
+    ])
+    def test_main_invalid_range(self, name, argv):
+        errors = io.StringIO()
+
+        # Act
+        with redirect_stderr(errors), self.assertRaises(SystemExit):
+            self.run_main(argv + ['-d'])
+
+        self.assertIn('error:', errors.getvalue())
+        self.assertNotIn('invalid literal', errors.getvalue())
+
+    def test_main_resume_dry_run(self):
+        with self.assertRaises(SystemExit):
+            self.run_main(['move', '3', '-d', '--resume'])
+
+    def test_main_apply_changed_plan(self):
+        with tempfile.TemporaryDirectory() as directory:
+            plan_path = os.path.join(directory, 'plan.json')
+            with open(plan_path, 'w', encoding='utf-8') as file:
+                file.write('{"format": 1, "checksum": "x", "moves": []}')
+
+            with self.assertRaises(SystemExit):
+                self.run_main(['apply', plan_path])
+
+    def test_main_unknown_command(self):
+        with self.assertRaises(SystemExit):
+            self.run_main(['tidy', '3'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+import asyncio
+import json
+import unittest
+
+import gcal_move_it_async
+import rate_limiter
+from test_rate_limiter import FakeClock
+
+
+class FakeCreds:
+    valid = True
+    token = 'the_token'
+
+
+class FakeResponse:
+    def __init__(self, status, content):
+        self.status = status
+        self.content = content
+
+    async def text(self):
+        return self.content
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+class FakeSession:
+    """
+    Serves list pages keyed by page token, and updates, failing any event ids in failing_ids.
+    Records the maximum number of requests in flight.
+    """
+
+    def __init__(self, pages={}, failing_ids={}):
+        self.pages = pages
+        self.failing_ids = dict(failing_ids)  # id -> list of statuses to return
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def request(self, method, url, params=None, json=None, headers=None):
+        self.requests.append((method, url, params, json, headers))
+        return self._respond(method, url, params)
+
+    def _respond(self, method, url, params):
+        session = self
+
+        class Context:
+            async def __aenter__(self):
+                session.in_flight += 1
+                session.max_in_flight = max(
+                    session.max_in_flight, session.in_flight)
+                await asyncio.sleep(0.01)
+                session.in_flight -= 1
+                if (method == 'GET'):
+                    return FakeResponse(200, json.dumps(session.pages[params.get('pageToken')]))
+                event_id = url.split('/')[-1]
+                statuses = session.failing_ids.get(event_id, [])
+                if (any(statuses)):
+                    status = statuses.pop(0)
+                    return FakeResponse(status, json.dumps({'error': {'code': status, 'errors': [{'reason': 'rateLimitExceeded'}]}}))
+                return FakeResponse(200, json.dumps({'id': event_id}))
+
+            async def __aexit__(self, *args):
+                pass
+
+        return Context()
+
+    async def close(self):
+        pass
+
+
+def make_events(count):
+    return [{'id': 'event_' + str(i)} for i in range(count)]
+
+
+class TestAsyncEngine(unittest.TestCase):
+
+    def create_engine(self, session, concurrency=3):
+        self.clock = FakeClock()
+        limiter = rate_limiter.RateLimiter(
+            qps=1000, burst=1000, clock=self.clock, random=lambda: 1.0)
+        engine = gcal_move_it_async.AsyncEngine(
+            FakeCreds(), limiter, concurrency, create_session=lambda: session)
+        self.addCleanup(engine.close)
+        return engine
+
+    def test_iterates_all_pages(self):
+        session = FakeSession(pages={
+            None: {'items': make_events(2), 'nextPageToken': 'p2'},
+            'p2': {'items': make_events(1)},
+        })
+        engine = self.create_engine(session)
+
+        # Act
+        events = list(engine.iterate_events(
+            calendarId='primary', maxResults=1000, timeZone='utc'))
+
+        self.assertEqual(3, len(events))
+        self.assertEqual([None, 'p2'], [r[2].get('pageToken')
+                         for r in session.requests])
+        self.assertEqual('1000', session.requests[0][2]['maxResults'])
+        self.assertNotIn('calendarId', session.requests[0][2])
+        self.assertEqual('Bearer the_token',
+                         session.requests[0][4]['Authorization'])
+
+    def test_updates_concurrently_within_limit(self):
+        session = FakeSession()
+        engine = self.create_engine(session, concurrency=3)
+        reported = []
+        updater = engine.create_updater(
+            on_success=lambda event: reported.append(event['id']))
+
+        # Act
+        for event in make_events(10):
+            updater.add(event, event)
+        updater.flush()
+
+        self.assertEqual(10, updater.succeeded)
+        self.assertEqual([e['id'] for e in make_events(10)], reported)
+        self.assertEqual(3, session.max_in_flight)
+        self.assertTrue(all(r[0] == 'PATCH' for r in session.requests))
+
+    def test_patch_sends_etag(self):
+        session = FakeSession()
+        engine = self.create_engine(session)
+        updater = engine.create_updater()
+
+        # Act
+        updater.add({'id': 'event_1', 'etag': '"123"'}, {'description': 'x'})
+        updater.flush()
+
+        (method, url, params, body, headers) = session.requests[0]
+        self.assertEqual('PATCH', method)
+        self.assertTrue(url.endswith('/calendars/primary/events/event_1'))
+        self.assertEqual({'description': 'x'}, body)
+        self.assertEqual('"123"', headers['If-Match'])
+
+    def test_retries_quota_errors_and_reports_failures(self):
+        session = FakeSession(failing_ids={
+            'event_1': [429],
+            'event_2': [404],
+        })
+        engine = self.create_engine(session)
+        failed = []
+        updated = []
+        updater = engine.create_updater(
+            on_failure=lambda event, exception: failed.append((event['id'], exception.status)),
+            on_updated=lambda event: updated.append(event['id']))
+
+        # Act
+        for event in make_events(3):
+            updater.add(event, event)
+        updater.flush()
+        engine.submit(asyncio.sleep(0)).result()  # the callbacks of the futures ran before this
+
+        self.assertEqual(2, updater.succeeded)
+        self.assertEqual([('event_2', 404)], failed)
+        self.assertEqual(['event_0', 'event_1'], sorted(updated))
+        self.assertEqual([rate_limiter.BASE_BACKOFF], self.clock.sleeps)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+from datetime import date
+from parameterized import parameterized
+
+import unittest
+
+import date_utils
+import month_range
+import todays
+
+
+def months_of(range):
+    return [(date_utils.source_year(c), c.source_month_index) for c in range.date_contexts]
+
+
+class TestMonthRange(unittest.TestCase):
+
+    @parameterized.expand([
+        ('single month', '3', 2021, 5, [(2021, 3)]),
+        ('single month December', '12', 2021, 1, [(2020, 12)]),
+        ('range', '1-3', 2021, 5, [(2021, 1), (2021, 2), (2021, 3)]),
+        ('range wraps year', '11-2', 2021, 5,
+         [(2021, 11), (2021, 12), (2022, 1), (2022, 2)]),
+        ('range from December', '12-1', 2021, 1, [(2020, 12), (2021, 1)]),
+        ('full year', '1-12', 2021, 5, [(2021, m) for m in range(1, 13)]),
+        ('single month with year', '2021-03', 2022, 5, [(2021, 3)]),
+        ('with years', '2023-11..2024-02', 2021, 5,
+         [(2023, 11), (2023, 12), (2024, 1), (2024, 2)]),
+    ])
+    def test_parse_month_range(self, name, text, this_year, this_month, expected_months):
+        today = todays.TodayMock(this_year, this_month)
+
+        # Act
+        actual = month_range.parse_month_range(text, today)
+
+        self.assertEqual(expected_months, months_of(actual))
+
+    @parameterized.expand([
+        ('month out of range', '13'),
+        ('not a number', 'x'),
+        ('range end not a number', '3-x'),
+        ('year not a number', 'x-03'),
+        ('end before start', '2024-03..2023-09'),
+        ('bad year month', '2024..2024-09'),
+        ('month with year out of range', '2024-13'),
+    ])
+    def test_parse_month_range_invalid(self, name, text):
+        with self.assertRaises(ValueError):
+            month_range.parse_month_range(text, todays.TodayMock(2021, 5))
+
+    def test_date_range(self):
+        today = todays.TodayMock(2021, 5)
+
+        # Act
+        actual = month_range.date_range(
+            date(2020, 12, 15), date(2021, 2, 10), today)
+
+        self.assertEqual([(2020, 12), (2021, 1), (2021, 2)], months_of(actual))
+        self.assertEqual(date(2020, 12, 15), actual.start_date())
+        self.assertEqual(date(2021, 2, 11), actual.window_max_date(False))
+        self.assertIsNone(actual.context_for_date(date(2020, 12, 14)))
+        self.assertEqual(12, actual.context_for_date(
+            date(2020, 12, 15)).source_month_index)
+
+    def test_date_range_end_before_start(self):
+        with self.assertRaises(ValueError):
+            month_range.date_range(date(2021, 3, 20), date(2021, 3, 2), todays.TodayMock(2021, 5))
+
+    def test_window_of_month_range(self):
+        today = todays.TodayMock(2021, 5)
+
+        # Act
+        actual = month_range.parse_month_range('2020-01..2020-03', today)
+
+        self.assertEqual(date(2020, 1, 1), actual.start_date())
+        # for clean, the window ends at the very start of the day after the last month
+        self.assertEqual(date(2020, 4, 1), actual.window_max_date(False))
+        self.assertIsNone(actual.context_for_date(date(2020, 4, 1)))
+        self.assertEqual(2, actual.context_for_date(
+            date(2020, 2, 29)).source_month_index)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import json
+import os
+import tempfile
+import unittest
+
+from datetime import date
+
+import event_record
+import move_plan
+
+EVENT = {'id': 'event_1', 'etag': '"abc"', 'summary': '[p] dentist',
+         'start': {'date': '2021-03-04'}, 'end': {'date': '2021-03-05'}}
+
+
+def plan_of(*events):
+    plan = move_plan.CalendarPlan('primary')
+    for (event, target_date) in events:
+        plan.add(event_record.normalize(event), target_date)
+    return plan
+
+
+class TestMovePlan(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'plan.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_add(self):
+        # Act
+        plan = plan_of((EVENT, date(2021, 4, 1)))
+
+        self.assertEqual([{'calendar': 'primary', 'id': 'event_1', 'etag': '"abc"', 'summary': '[p] dentist',
+                           'from': '2021-03-04', 'to': '2021-04-01'}], plan.moves)
+
+    def test_save_and_load(self):
+        moves = plan_of((EVENT, date(2021, 4, 1))).moves
+        move_plan.save_plan(self.path, moves)
+
+        # Act
+        loaded = move_plan.load_plan(self.path)
+
+        self.assertEqual(moves, loaded)
+        self.assertFalse(os.path.exists(self.path + '.tmp'))
+
+    def test_load_changed_plan(self):
+        move_plan.save_plan(self.path, plan_of((EVENT, date(2021, 4, 1))).moves)
+        with open(self.path, 'r', encoding='utf-8') as file:
+            plan = json.load(file)
+        plan['moves'][0]['to'] = '2021-05-01'
+        with open(self.path, 'w', encoding='utf-8') as file:
+            json.dump(plan, file)
+
+        with self.assertRaises(ValueError):
+            move_plan.load_plan(self.path)
+
+    def test_load_not_a_plan(self):
+        for content in ['{"moves": []}', '[1, 2]', 'not json']:
+            with open(self.path, 'w', encoding='utf-8') as file:
+                file.write(content)
+
+            with self.assertRaises(ValueError):
+                move_plan.load_plan(self.path)
+
+    def test_event_of(self):
+        move = plan_of((EVENT, date(2021, 4, 1))).moves[0]
+
+        # Act
+        event = move_plan.event_of(move)
+
+        self.assertEqual(EVENT, event)
+        self.assertEqual(date(2021, 4, 1), move_plan.target_date_of(move))
+
+    def test_moves_by_calendar(self):
+        moves = [{'calendar': 'b', 'id': '1'}, {'calendar': 'a', 'id': '2'}, {'calendar': 'b', 'id': '3'}]
+
+        # Act
+        grouped = move_plan.moves_by_calendar(moves)
+
+        self.assertEqual(['b', 'a'], list(grouped.keys()))
+        self.assertEqual(['1', '3'], [move['id'] for move in grouped['b']])
+
+
+if __name__ == '__main__':
+    unittest.main()
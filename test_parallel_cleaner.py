@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import unittest
+
+import description_cleaner
+import parallel_cleaner
+
+DIRTY = "http://one.nl (http://one.nl)"
+CLEAN = "http://one.nl"
+
+
+class TestParallelCleaner(unittest.TestCase):
+
+    def test_clean_chunk_sends_back_only_changes(self):
+        # Act
+        actual = parallel_cleaner.clean_chunk([('1', DIRTY), ('2', CLEAN)])
+
+        self.assertEqual([('1', CLEAN), ('2', None)], actual)
+
+    def test_chunks(self):
+        # Act
+        actual = list(parallel_cleaner.chunks(range(5), 2))
+
+        self.assertEqual([[0, 1], [2, 3], [4]], actual)
+
+    def test_chunks_of_nothing(self):
+        self.assertEqual([], list(parallel_cleaner.chunks([], 2)))
+
+    def test_clean_in_processes_keeps_the_order(self):
+        items = [(str(i), DIRTY if i % 3 == 0 else f"text {i}")
+                 for i in range(50)]
+
+        # Act
+        actual = list(parallel_cleaner.clean_in_processes(
+            iter(items), 2, chunk_size=4, create_executor=ThreadPoolExecutor))
+
+        expected = [(event_id, CLEAN if description == DIRTY else None)
+                    for (event_id, description) in items]
+        self.assertEqual(expected, actual)
+
+    def test_clean_in_processes_leaves_the_pool_open(self):
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            # Act
+            first = list(parallel_cleaner.clean_in_processes([('1', DIRTY)], 2, pool=pool))
+            second = list(parallel_cleaner.clean_in_processes([('2', CLEAN)], 2, pool=pool))
+
+        self.assertEqual([('1', CLEAN)], first)
+        self.assertEqual([('2', None)], second)
+
+    def test_clean_in_processes_with_worker_processes(self):
+        items = [('1', DIRTY), ('2', "E-mail: a@b.nl (mailto:a@b.nl)"), ('3', CLEAN)]
+
+        # Act
+        actual = list(parallel_cleaner.clean_in_processes(
+            items, 2, chunk_size=1))
+
+        self.assertEqual([('1', CLEAN),
+                          ('2', description_cleaner.clean_description(items[1][1])),
+                          ('3', None)], actual)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+from parameterized import parameterized
+
+import random
+import unittest
+
+import pattern_matcher
+
+
+# The original, uncompiled matching - the compiled matchers must give the same results
+def matches_blacklist_entry(summary, black):
+    if(black.startswith('^')):
+        return summary.startswith(black[1:])
+    if(black.startswith('=')):
+        return summary == black[1:]
+    return black in summary
+
+
+def reference_blacklist_matches(summary, blacklist):
+    return any(matches_blacklist_entry(summary, b) for b in blacklist)
+
+
+def reference_whitelist_matches(summary, whitelist):
+    return any(w in summary for w in whitelist)
+
+
+def random_text(rng, alphabet, max_length):
+    return ''.join(rng.choice(alphabet) for i in range(rng.randint(0, max_length)))
+
+
+class TestPatternMatcher(unittest.TestCase):
+
+    @parameterized.expand([
+        ('contains', ['done'], 'report done today', True),
+        ('starts with', ['^done'], 'done report', True),
+        ('starts with - not at start', ['^done'], 'report done', False),
+        ('exact', ['=done'], 'done', True),
+        ('exact - not exact', ['=done'], 'done!', False),
+        ('empty prefix matches all', ['^'], 'anything', True),
+        ('empty exact', ['='], '', True),
+        ('regex characters are literal', ['a.c'], 'abc', False),
+        ('regex characters are literal 2', ['(x)'], 'a (x) b', True),
+        ('overlapping prefixes', ['^ab', '^abcd'], 'abc', True),
+        ('no entries', [], 'abc', False),
+    ])
+    def test_blacklist(self, name, blacklist, summary, expected):
+        matcher = pattern_matcher.compile_blacklist(blacklist)
+
+        # Act
+        actual = matcher.matches(summary)
+
+        self.assertEqual(expected, actual)
+
+    def test_whitelist_has_no_prefixes(self):
+        matcher = pattern_matcher.compile_whitelist(['^done'])
+
+        self.assertFalse(matcher.matches('done'))
+        self.assertTrue(matcher.matches('x ^done'))
+
+    def test_is_empty(self):
+        self.assertTrue(pattern_matcher.compile_blacklist([]).is_empty)
+        self.assertFalse(pattern_matcher.compile_blacklist(['=']).is_empty)
+
+    def test_same_as_reference_for_random_lists(self):
+        rng = random.Random(1)
+        alphabet = 'ab^= '
+        for i in range(300):
+            entries = [random_text(rng, alphabet, 4)
+                       for j in range(rng.randint(0, 8))]
+            entries = [e for e in entries if e != '']
+            blacklist = pattern_matcher.compile_blacklist(entries)
+            whitelist = pattern_matcher.compile_whitelist(entries)
+            for k in range(30):
+                summary = random_text(rng, alphabet, 8)
+
+                self.assertEqual(reference_blacklist_matches(summary, entries),
+                                 blacklist.matches(summary), (entries, summary))
+                self.assertEqual(reference_whitelist_matches(summary, entries),
+                                 whitelist.matches(summary), (entries, summary))
+
+
+if __name__ == '__main__':
+    unittest.main()
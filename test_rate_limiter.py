@@ -0,0 +1,144 @@
+import json
+import unittest
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+import rate_limiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.time = 0.0
+        self.sleeps = []
+
+    def now(self):
+        return self.time
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.time += seconds
+
+
+def make_http_error(status, reason):
+    content = json.dumps(
+        {'error': {'code': status, 'errors': [{'reason': reason}]}})
+    return HttpError(httplib2.Response({'status': status}), content.encode('utf-8'))
+
+
+class FakeRequest:
+    def __init__(self, errors):
+        self.errors = errors
+        self.executions = 0
+
+    def execute(self, http=None):
+        self.executions += 1
+        if (any(self.errors)):
+            raise self.errors.pop(0)
+        return 'ok'
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def create_limiter(self, qps=10, burst=2):
+        self.clock = FakeClock()
+        return rate_limiter.RateLimiter(qps=qps, burst=burst, clock=self.clock, random=lambda: 0.5)
+
+    def test_burst_is_not_throttled(self):
+        limiter = self.create_limiter(qps=10, burst=2)
+
+        # Act
+        limiter.acquire()
+        limiter.acquire()
+
+        self.assertEqual([], self.clock.sleeps)
+        self.assertEqual(0.0, limiter.throttled_seconds)
+
+    def test_throttles_to_qps_after_burst(self):
+        limiter = self.create_limiter(qps=10, burst=2)
+
+        # Act
+        for i in range(12):
+            limiter.acquire()
+
+        self.assertAlmostEqual(1.0, self.clock.time)
+        self.assertAlmostEqual(1.0, limiter.throttled_seconds)
+        self.assertEqual(12, limiter.calls)
+
+    def test_refills_while_idle(self):
+        limiter = self.create_limiter(qps=10, burst=2)
+        limiter.acquire()
+        limiter.acquire()
+
+        # Act
+        self.clock.time += 5
+        limiter.acquire()
+
+        self.assertEqual([], self.clock.sleeps)
+
+    def test_large_cost_leaves_bucket_in_debt(self):
+        limiter = self.create_limiter(qps=10, burst=2)
+
+        # Act
+        limiter.acquire(cost=12)
+        limiter.acquire()
+
+        # the 10 tokens above the burst, plus 1 token for the 2nd call
+        self.assertAlmostEqual(1.1, self.clock.time)
+
+    def test_current_rate(self):
+        limiter = self.create_limiter(qps=5, burst=1)
+
+        # Act
+        for i in range(21):
+            limiter.acquire()
+
+        self.assertAlmostEqual(5.0, limiter.current_rate())
+
+    def test_retries_quota_errors_with_backoff(self):
+        limiter = self.create_limiter(qps=1000, burst=1000)
+        request = FakeRequest([make_http_error(429, 'rateLimitExceeded'),
+                               make_http_error(403, 'userRateLimitExceeded')])
+
+        # Act
+        result = limiter.execute(request)
+
+        self.assertEqual('ok', result)
+        self.assertEqual(3, request.executions)
+        self.assertEqual(2, limiter.retries)
+        # jitter of 0.5 gives 3/4 of the exponential delay
+        self.assertEqual([0.75, 1.5], self.clock.sleeps)
+
+    def test_backoff_is_capped(self):
+        limiter = self.create_limiter()
+
+        # Act
+        limiter.back_off(20)
+
+        self.assertEqual([rate_limiter.MAX_BACKOFF * 0.75], self.clock.sleeps)
+
+    def test_does_not_retry_other_errors(self):
+        limiter = self.create_limiter()
+        request = FakeRequest([make_http_error(403, 'forbidden')])
+
+        # Act
+        with self.assertRaises(HttpError):
+            limiter.execute(request)
+
+        self.assertEqual(1, request.executions)
+        self.assertEqual(0, limiter.retries)
+
+    def test_gives_up_after_max_retries(self):
+        limiter = self.create_limiter()
+        request = FakeRequest(
+            [make_http_error(429, 'rateLimitExceeded')] * (rate_limiter.MAX_RETRIES + 1))
+
+        # Act
+        with self.assertRaises(HttpError):
+            limiter.execute(request)
+
+        self.assertEqual(rate_limiter.MAX_RETRIES + 1, request.executions)
+
+
+if __name__ == '__main__':
+    unittest.main()
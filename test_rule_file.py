@@ -0,0 +1,103 @@
+from parameterized import parameterized
+
+import os
+import tempfile
+import unittest
+
+import rule_file
+
+
+def event(summary='Report', **fields):
+    result = {'id': '1', 'summary': summary}
+    result.update(fields)
+    return result
+
+
+class TestRuleFile(unittest.TestCase):
+
+    @parameterized.expand([
+        ('contains', 'done', event('Report DONE'), True),
+        ('starts with', '^done', event('Done report'), True),
+        ('starts with - not at start', '^done', event('Report done'), False),
+        ('exact', '=done', event('Done'), True),
+        ('regex', '/^(k|ok) /', event('OK buy milk'), True),
+        ('regex - no match', '/^(k|ok) /', event('Booking'), False),
+        ('location', 'location:=home', event(location='Home'), True),
+        ('location - missing', 'location:=home', event(), False),
+        ('description regex', 'description:/zoom\\.us/', event(description='https://zoom.us/j/1'), True),
+        ('colorId', 'colorId:=11', event(colorId='11'), True),
+        ('unknown selector is part of the text', 'note:x', event('a note:x'), True),
+    ])
+    def test_rule(self, name, rule, event, expected):
+        rules = rule_file.parse_rules(rule)
+
+        # Act
+        actual = rules.matches(event)
+
+        self.assertEqual(expected, actual)
+
+    def test_comments_and_empty_lines_are_ignored(self):
+        rules = rule_file.parse_rules('# comment\n\n   \n')
+
+        self.assertTrue(rules.is_empty)
+        self.assertFalse(rules.matches(event('# comment')))
+
+    def test_invalid_regex(self):
+        with self.assertRaisesRegex(ValueError, 'Line 2'):
+            rule_file.parse_rules('done\n/(unclosed/')
+
+    def test_load_rules_uses_the_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'rules.txt')
+            cache_dir = os.path.join(directory, 'cache')
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write('^done\nlocation:/home|office/\n')
+
+            first = rule_file.load_rules(path, cache_dir)
+            cached_files = os.listdir(cache_dir)
+
+            # Act
+            second = rule_file.load_rules(path, cache_dir)
+
+            self.assertEqual(1, len(cached_files))
+            self.assertIsNot(first, second)
+            self.assertTrue(second.matches(event('Done it')))
+            self.assertTrue(second.matches(event(location='Office 2')))
+            self.assertFalse(second.matches(event('Report')))
+
+    def test_load_rules_after_the_file_changed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'rules.txt')
+            cache_dir = os.path.join(directory, 'cache')
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write('done\n')
+            rule_file.load_rules(path, cache_dir)
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write('cancelled\n')
+
+            # Act
+            rules = rule_file.load_rules(path, cache_dir)
+
+            self.assertEqual(2, len(os.listdir(cache_dir)))
+            self.assertTrue(rules.matches(event('Cancelled')))
+            self.assertFalse(rules.matches(event('Done')))
+
+    def test_corrupt_cache_is_ignored(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'rules.txt')
+            cache_dir = os.path.join(directory, 'cache')
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write('done\n')
+            rule_file.load_rules(path, cache_dir)
+            cached_path = os.path.join(cache_dir, os.listdir(cache_dir)[0])
+            with open(cached_path, 'wb') as file:
+                file.write(b'not a pickle')
+
+            # Act
+            rules = rule_file.load_rules(path, cache_dir)
+
+            self.assertTrue(rules.matches(event('Done')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+
+import run_journal
+from test_rate_limiter import FakeClock
+
+
+class TestRunJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'journal', 'journal.jsonl')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_resume(self):
+        journal = run_journal.Journal(self.path)
+        journal.record('primary', 'move', 'event_1')
+        journal.record('team', 'clean', 'event_2')
+        journal.close()
+
+        # Act
+        resumed = run_journal.Journal(self.path, resume=True)
+
+        self.assertEqual(2, resumed.resumed_count)
+        self.assertTrue(resumed.is_done('primary', 'move', 'event_1'))
+        self.assertFalse(resumed.is_done('primary', 'clean', 'event_1'))
+        self.assertFalse(resumed.is_done('primary', 'move', 'event_2'))
+        resumed.close()
+
+    def test_resume_appends(self):
+        journal = run_journal.Journal(self.path)
+        journal.record('primary', 'move', 'event_1')
+        journal.close()
+        resumed = run_journal.Journal(self.path, resume=True)
+        resumed.record('primary', 'move', 'event_2')
+        resumed.close()
+
+        # Act
+        done = run_journal.read_done(self.path)
+
+        self.assertEqual({('primary', 'move', 'event_1'), ('primary', 'move', 'event_2')}, done)
+
+    def test_new_run_starts_a_new_journal(self):
+        journal = run_journal.Journal(self.path)
+        journal.record('primary', 'move', 'event_1')
+        journal.close()
+
+        # Act
+        journal = run_journal.Journal(self.path)
+        journal.close()
+
+        self.assertEqual(set(), run_journal.read_done(self.path))
+
+    def test_last_line_cut_short(self):
+        journal = run_journal.Journal(self.path)
+        journal.record('primary', 'move', 'event_1')
+        journal.close()
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write('{"calendar":"primary","comm')
+
+        # Act
+        done = run_journal.read_done(self.path)
+
+        self.assertEqual({('primary', 'move', 'event_1')}, done)
+
+    def test_synced_in_batches(self):
+        clock = FakeClock()
+        journal = run_journal.Journal(self.path, sync_every=3, sync_interval=10, clock=clock.now)
+
+        # Act
+        journal.record('primary', 'move', 'event_1')
+        journal.record('primary', 'move', 'event_2')
+        unsynced_before_batch = journal.unsynced
+        journal.record('primary', 'move', 'event_3')
+
+        self.assertEqual(2, unsynced_before_batch)
+        self.assertEqual(0, journal.unsynced)
+        self.assertEqual(3, len(run_journal.read_done(self.path)))
+        journal.close()
+
+    def test_synced_after_the_interval(self):
+        clock = FakeClock()
+        journal = run_journal.Journal(self.path, sync_every=100, sync_interval=1.0, clock=clock.now)
+        journal.record('primary', 'move', 'event_1')
+
+        # Act
+        clock.sleep(1.5)
+        journal.record('primary', 'move', 'event_2')
+
+        self.assertEqual(0, journal.unsynced)
+        journal.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
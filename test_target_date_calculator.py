@@ -1,5 +1,6 @@
-from datetime import date
+from datetime import date, timedelta
 from parameterized import parameterized
+import random
 import unittest
 
 import date_utils
@@ -90,3 +91,41 @@ class TestTargetDateCalculator(unittest.TestCase):
         actual_target_date = target_date_calculator.calculate_target_date(
             date_context, source_date, is_pinned_to_day, target_date_option)
         self.assertEqual(expected_target_date, actual_target_date, msg)
+
+    def test_calculate_target_dates_same_as_calculate_target_date(self):
+        # Every day of every month, over years with and without leap days, pinned or not, in random order with repeats
+        rng = random.Random(14)
+        for year in range(2019, 2031):
+            for month in range(1, 13):
+                date_context = date_utils.DateContext(
+                    todays.TodayMock(year, month), month, year)
+                start = date(year, month, 1)
+                days = [start + timedelta(days=d)
+                        for d in range(date_utils.days_in_month(year, month))]
+                source_dates = [rng.choice(days) for i in range(80)] + days + days
+                pinned_flags = [rng.random() < 0.5 for d in source_dates[:-2 * len(days)]] + \
+                    [True] * len(days) + [False] * len(days)
+
+                # Act
+                actual = target_date_calculator.calculate_target_dates(
+                    date_context, source_dates, pinned_flags, None)
+
+                expected = [target_date_calculator.calculate_target_date(date_context, d, p, None)
+                            for (d, p) in zip(source_dates, pinned_flags)]
+                self.assertEqual(expected, actual, (year, month))
+
+    def test_calculate_target_dates_with_target_date_option(self):
+        date_context = date_utils.DateContext(todays.TodayMock(2021, 2), 1)
+
+        # Act
+        actual = target_date_calculator.calculate_target_dates(
+            date_context, [date(2021, 1, 5), date(2021, 1, 6)], [True, False], date(2021, 3, 1))
+
+        self.assertEqual([date(2021, 3, 1), date(2021, 3, 1)], actual)
+
+    def test_calculate_target_dates_needs_a_flag_per_date(self):
+        date_context = date_utils.DateContext(todays.TodayMock(2021, 2), 1)
+
+        with self.assertRaises(ValueError):
+            target_date_calculator.calculate_target_dates(
+                date_context, [date(2021, 1, 5)], [], None)
@@ -0,0 +1,47 @@
+"""
+Hold back what each worker thread prints, so the output of calendars processed at the same time is not interleaved.
+
+While installed, sys.stdout writes to the buffer of the current thread (if it is capturing), else to the real stdout.
+"""
+
+import io
+import sys
+import threading
+
+from contextlib import contextmanager
+
+
+class ThreadOutput:
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def _target(self):
+        return getattr(self.local, 'buffer', None) or self.stream
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    @contextmanager
+    def capture(self):
+        """
+        Yields the buffer that receives the output of this thread.
+        """
+        self.local.buffer = io.StringIO()
+        try:
+            yield self.local.buffer
+        finally:
+            self.local.buffer = None
+
+
+@contextmanager
+def installed():
+    output = ThreadOutput(sys.stdout)
+    sys.stdout = output
+    try:
+        yield output
+    finally:
+        sys.stdout = output.stream